@@ -1,5 +1,14 @@
 from django.contrib import admin
-from .models import Websites, NewsDetails, SentimentResults
+from .models import Websites, NewsDetails, SentimentResults, SentimentJob
+from .search import search_news
+
+
+class NewsSearchMixin:
+    """Admin search through search_news; news_search_prefix is the path to NewsDetails."""
+    news_search_prefix = ''
+
+    def get_search_results(self, request, queryset, search_term):
+        return search_news(queryset, search_term, prefix=self.news_search_prefix), False
 
 
 @admin.register(Websites)
@@ -10,9 +19,9 @@ class WebsitesAdmin(admin.ModelAdmin):
 
 
 @admin.register(NewsDetails)
-class NewsDetailsAdmin(admin.ModelAdmin):
+class NewsDetailsAdmin(NewsSearchMixin, admin.ModelAdmin):
     list_display = ('title', 'website_name', 'category', 'published_time')
-    search_fields = ('title', 'description', 'website_name', 'category')
+    search_fields = ('search_text',)
     list_filter = ('website_name', 'category', 'language')
     date_hierarchy = 'published_time'
     ordering = ('-published_time',)
@@ -21,10 +30,21 @@ class NewsDetailsAdmin(admin.ModelAdmin):
 
 
 @admin.register(SentimentResults)
-class SentimentResultsAdmin(admin.ModelAdmin):
+class SentimentResultsAdmin(NewsSearchMixin, admin.ModelAdmin):
     list_display = ('news', 'sentiment_label', 'sentiment_score', 'category', 'processed_at')
     list_filter = ('sentiment_label', 'category')
-    search_fields = ('news__title', 'sentiment_label')
+    search_fields = ('news__search_text',)
+    news_search_prefix = 'news__'
     ordering = ('-processed_at',)
     date_hierarchy = 'processed_at'
     list_per_page = 25
+
+
+@admin.register(SentimentJob)
+class SentimentJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'news', 'status', 'attempts', 'available_at', 'locked_by', 'finished_at')
+    list_filter = ('status',)
+    search_fields = ('news__title', 'last_error')
+    ordering = ('-created_at',)
+    raw_id_fields = ('news',)
+    list_per_page = 25
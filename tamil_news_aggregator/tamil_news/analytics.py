@@ -0,0 +1,220 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count, Exists, F, OuterRef, Sum
+from django.db.models.functions import TruncHour, TruncWeek
+from django.utils import timezone
+
+from tamil_news.models import SentimentDailyRollup, SentimentResults
+from tamil_news.rollups import score_sum
+from tamil_news.search import search_news
+
+BUCKET_STEPS = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+}
+MAX_SERIES_BUCKETS = 5000
+MAX_COMPARE_KEYWORDS = 100
+
+
+def _average(total, count):
+    return round(total / count, 4) if count else None
+
+
+def day_start(day):
+    """Aware midnight at the start of a local day."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def day_range(start, end):
+    """Whole local days covering the half-open datetime range [start, end)."""
+    start_day = timezone.localtime(start).date()
+    end_day = timezone.localtime(end - timedelta(microseconds=1)).date() + timedelta(days=1)
+    return start_day, end_day
+
+
+def series_buckets(bucket, start, end):
+    """Every bucket start in [start, end), aligned the way the database truncates."""
+    if bucket == 'hour':
+        current = timezone.localtime(start).replace(minute=0, second=0, microsecond=0)
+        last = end
+    else:
+        current, last = day_range(start, end)
+        if bucket == 'week':
+            current -= timedelta(days=current.weekday())
+
+    step = BUCKET_STEPS[bucket]
+    buckets = []
+    while current < last:
+        buckets.append(current)
+        current += step
+    return buckets
+
+
+def filter_news(news, website_id=None, category=None, sentiment_label=None, search=None,
+                start_day=None, end_day=None):
+    """
+    Apply the /news/ page filters to a NewsDetails queryset; a search ranks by relevance.
+
+    Dates become a half-open published_time range, so the published_time indexes apply
+    instead of a per-row date cast; categories come from a dropdown and match exactly,
+    ignoring case, which the UPPER(category) index serves.
+    """
+    if website_id:
+        news = news.filter(website_id=website_id)
+    if category:
+        news = news.filter(category__iexact=category)
+    if sentiment_label:
+        news = news.filter(Exists(
+            SentimentResults.objects.filter(news=OuterRef('pk'), sentiment_label=sentiment_label)
+        ))
+    if start_day and end_day:
+        news = news.filter(
+            published_time__gte=day_start(start_day),
+            published_time__lt=day_start(end_day + timedelta(days=1)),
+        )
+    if search:
+        news = search_news(news, search)
+    return news
+
+
+def keyword_rollups(keyword_id, start_date, website=None, category=None):
+    """A keyword's daily rollup rows from start_date on, filtered like the sentiment endpoint (AND logic)."""
+    rollups = SentimentDailyRollup.objects.filter(keyword_id=keyword_id, day__gte=start_date)
+    if website:
+        rollups = rollups.filter(website__name__iexact=website)
+    if category:
+        rollups = rollups.filter(category__iexact=category)
+    return rollups
+
+
+def sentiment_series_rows(keyword_id, bucket, start, end, website=None, category=None):
+    """
+    One grouped query for the per-bucket counts and score sums of a keyword.
+
+    Hour buckets read SentimentResults for [start, end); day and week buckets read the
+    daily rollups, so they cover whole days.
+    """
+    if bucket == 'hour':
+        results = SentimentResults.objects.filter(
+            keyword_id=keyword_id,
+            news__published_time__gte=start,
+            news__published_time__lt=end,
+        )
+        if website:
+            results = results.filter(news__website__name__iexact=website)
+        if category:
+            results = results.filter(news__category__iexact=category)
+        return (
+            results
+            .annotate(bucket=TruncHour('news__published_time'))
+            .values('bucket')
+            .annotate(
+                count=Count('id'),
+                positive=score_sum('positive_score'),
+                negative=score_sum('negative_score'),
+                neutral=score_sum('neutral_score'),
+            )
+            .order_by('bucket')
+        )
+
+    start_day, end_day = day_range(start, end)
+    rollups = SentimentDailyRollup.objects.filter(keyword_id=keyword_id, day__gte=start_day, day__lt=end_day)
+    if website:
+        rollups = rollups.filter(website__name__iexact=website)
+    if category:
+        rollups = rollups.filter(category__iexact=category)
+    return (
+        rollups
+        .annotate(bucket=TruncWeek('day') if bucket == 'week' else F('day'))
+        .values('bucket')
+        .annotate(
+            count=Sum('count'),
+            positive=Sum('positive_sum'),
+            negative=Sum('negative_sum'),
+            neutral=Sum('neutral_sum'),
+        )
+        .order_by('bucket')
+    )
+
+
+def sentiment_series(keyword_id, bucket, start, end, website=None, category=None):
+    """Per-bucket average scores and counts, with empty buckets included as zero counts."""
+    rows = {}
+    for row in sentiment_series_rows(keyword_id, bucket, start, end, website, category):
+        value = row['bucket']
+        if bucket == 'week' and hasattr(value, 'date'):
+            value = value.date()
+        rows[value] = row
+
+    series = []
+    for value in series_buckets(bucket, start, end):
+        row = rows.get(value, {})
+        count = row.get('count') or 0
+        series.append({
+            'bucket': value.isoformat(),
+            'count': count,
+            'avg_positive_score': _average(row.get('positive', 0), count),
+            'avg_negative_score': _average(row.get('negative', 0), count),
+            'avg_neutral_score': _average(row.get('neutral', 0), count),
+        })
+    return series
+
+
+def compare_keywords_rows(keyword_names, start_date, website=None, category=None, by_website=False):
+    rollups = SentimentDailyRollup.objects.filter(keyword__name__in=keyword_names, day__gte=start_date)
+    if website:
+        rollups = rollups.filter(website__name__iexact=website)
+    if category:
+        rollups = rollups.filter(category__iexact=category)
+
+    group_by = ['keyword__name', 'website__name'] if by_website else ['keyword__name']
+    return (
+        rollups
+        .values(*group_by)
+        .annotate(
+            count=Sum('count'),
+            positive=Sum('positive_sum'),
+            negative=Sum('negative_sum'),
+            neutral=Sum('neutral_sum'),
+        )
+        .order_by(*group_by)
+    )
+
+
+def compare_keywords(keyword_names, start_date, website=None, category=None, by_website=False):
+    """
+    Average scores and counts for several keywords from one GROUP BY over the daily rollups.
+
+    Every requested name gets an entry; one with no Keyword row or no results has count 0.
+    With by_website=True each entry also carries a per-website breakdown.
+    """
+    rows = compare_keywords_rows(keyword_names, start_date, website, category, by_website)
+
+    def scores(count, positive, negative, neutral):
+        return {
+            'avg_positive_score': _average(positive, count) or 0,
+            'avg_negative_score': _average(negative, count) or 0,
+            'avg_neutral_score': _average(neutral, count) or 0,
+            'match_count': count,
+        }
+
+    totals = {name: [0, 0.0, 0.0, 0.0] for name in keyword_names}
+    websites = {name: [] for name in keyword_names}
+    for row in rows:
+        total = totals[row['keyword__name']]
+        for index, field in enumerate(('count', 'positive', 'negative', 'neutral')):
+            total[index] += row[field] or 0
+        if by_website:
+            websites[row['keyword__name']].append({
+                'website': row['website__name'],
+                **scores(row['count'], row['positive'], row['negative'], row['neutral']),
+            })
+
+    results = []
+    for name in keyword_names:
+        entry = {'keyword': name, **scores(*totals[name])}
+        if by_website:
+            entry['websites'] = websites[name]
+        results.append(entry)
+    return results
@@ -0,0 +1,136 @@
+import multiprocessing
+import queue
+import threading
+
+from django.core.cache import caches
+from django.db import connection, connections
+from django.db.models import F
+
+# Plumbing for long re-scoring runs: shards of the table in forked worker processes, and
+# inside each worker a reader / inference / writer pipeline, so the model never waits on
+# the database and the database never waits on the model.
+
+_DONE = object()
+POLL_SECONDS = 0.1
+
+
+def parse_shard(value):
+    """'2/8' -> (2, 8): this process takes the rows whose id % 8 == 2."""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise ValueError(f"Shard must look like INDEX/COUNT, got '{value}'")
+    if not 0 <= index < count:
+        raise ValueError(f"Shard index must be between 0 and {count - 1}, got {index}")
+    return index, count
+
+
+def in_shard(queryset, shard, field='id'):
+    """Rows of queryset that belong to shard (index, count); all of them when shard is None."""
+    if shard is None or shard[1] == 1:
+        return queryset
+    index, count = shard
+    return queryset.annotate(shard=F(field) % count).filter(shard=index)
+
+
+def run_shards(count, target):
+    """
+    Call target((index, count)) in count forked processes; returns their exit codes.
+
+    Anything loaded before the call, a model's weights in particular, is shared with the
+    children copy-on-write. Open database and cache connections are closed first so no two
+    processes end up on the same socket.
+    """
+    connections.close_all()
+    caches.close_all()
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=_run_shard, args=(target, (index, count))) for index in range(count)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+    return [process.exitcode for process in processes]
+
+
+def _run_shard(target, shard):
+    try:
+        target(shard)
+    finally:
+        connections.close_all()
+
+
+def _put(channel, item, stop):
+    while not stop.is_set():
+        try:
+            channel.put(item, timeout=POLL_SECONDS)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _get(channel, stop):
+    while not stop.is_set():
+        try:
+            return channel.get(timeout=POLL_SECONDS)
+        except queue.Empty:
+            pass
+    return _DONE
+
+
+def pipeline(chunks, process, write, depth=2):
+    """
+    write(process(chunk)) for every chunk, with reading and writing moved off the calling thread.
+
+    chunks is iterated in a reader thread and write() runs in a writer thread, in order,
+    each on its own database connection; process() runs here. At most depth chunks wait
+    between stages, so memory stays flat. An exception in any stage stops the others and
+    is raised here.
+    """
+    stop = threading.Event()
+    errors = []
+    read_queue = queue.Queue(maxsize=depth)
+    write_queue = queue.Queue(maxsize=depth)
+
+    def stage(body):
+        def run():
+            try:
+                body()
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                connection.close()
+        return threading.Thread(target=run, daemon=True)
+
+    def read():
+        for chunk in chunks:
+            if not _put(read_queue, chunk, stop):
+                return
+        _put(read_queue, _DONE, stop)
+
+    def drain():
+        while (item := _get(write_queue, stop)) is not _DONE:
+            write(item)
+
+    reader, writer = stage(read), stage(drain)
+    reader.start()
+    writer.start()
+    try:
+        while (chunk := _get(read_queue, stop)) is not _DONE:
+            if not _put(write_queue, process(chunk), stop):
+                break
+        _put(write_queue, _DONE, stop)
+    except BaseException as e:
+        errors.append(e)
+        stop.set()
+    reader.join()
+    writer.join()
+    if errors:
+        raise errors[0]
@@ -0,0 +1,65 @@
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_TIMEOUT = None  # version counters never expire on their own
+
+
+def _version_key(scope):
+    return f'data-version:{scope}'
+
+
+def data_version(scope):
+    """Current version of a cached data scope, e.g. 'sentiment:<keyword id>'."""
+    version = cache.get(_version_key(scope))
+    if version is None:
+        cache.add(_version_key(scope), 1, VERSION_TIMEOUT)
+        version = cache.get(_version_key(scope), 1)
+    return version
+
+
+def data_versions(scopes):
+    """[data_version(scope) for scope in scopes], in one cache round trip when they all exist."""
+    found = cache.get_many([_version_key(scope) for scope in scopes])
+    return [found.get(_version_key(scope)) or data_version(scope) for scope in scopes]
+
+
+def _bump(scopes):
+    for scope in scopes:
+        try:
+            cache.incr(_version_key(scope))
+        except ValueError:
+            cache.set(_version_key(scope), 2, VERSION_TIMEOUT)
+
+
+def bump_data_version(*scopes):
+    """
+    Invalidate everything cached under these scopes; old entries simply stop being read.
+
+    Inside a transaction the bump waits for the commit, so a read in between can't cache
+    the old rows under the new version.
+    """
+    transaction.on_commit(lambda: _bump(scopes))
+
+
+def cache_key(prefix, params, scopes=()):
+    versions = [f'{scope}={version}' for scope, version in zip(scopes, data_versions(scopes))]
+    digest = hashlib.sha1(json.dumps([params, versions], sort_keys=True, default=str).encode()).hexdigest()
+    return f'{prefix}:{digest}'
+
+
+def get_or_compute(prefix, params, compute, timeout, scopes=()):
+    """
+    Cached result of compute() for these params.
+
+    The key includes the current version of every scope, so bump_data_version() on any of
+    them makes the next call recompute instead of serving a stale entry.
+    """
+    key = cache_key(prefix, params, scopes)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout)
+    return value
@@ -0,0 +1,89 @@
+import bisect
+import re
+
+from django.conf import settings
+
+from tamil_news.model_registry import MAX_TOKENS
+
+# Model inputs cut from one tokenization of the article: whole sentences packed up to the
+# model's token limit, placed around the keyword occurrences they are meant to score.
+
+# Room for <s> and </s>, plus a few tokens re-tokenizing a cut-out window can add at its edges
+WINDOW_TOKENS = getattr(settings, 'SENTIMENT_WINDOW_TOKENS', MAX_TOKENS - 8)
+
+SENTENCE_BREAK = re.compile(r'(?<=[.!?।])\s+|\s*\n\s*')
+
+
+def _is_initial(text, end):
+    # "மு.க. ஸ்டாலின்", "Dr. ...": a period after one or two letters usually isn't a full stop
+    if text[end - 1] != '.':
+        return False
+    word = text[max(0, end - 20):end].rsplit(None, 1)[-1].rstrip('.')
+    return len(word.rsplit('.', 1)[-1]) <= 2
+
+
+def sentence_spans(text):
+    """(start, end) of each sentence: breaks after . ! ? or । followed by whitespace, and at line breaks."""
+    spans = []
+    start = 0
+    for match in SENTENCE_BREAK.finditer(text):
+        if '\n' not in match.group() and _is_initial(text, match.start()):
+            continue
+        if match.start() > start:
+            spans.append((start, match.start()))
+        start = match.end()
+    if start < len(text):
+        spans.append((start, len(text)))
+    return spans
+
+
+def sentence_pieces(text, tokenizer, budget=WINDOW_TOKENS):
+    """
+    [(start, end, tokens)] for the sentences of text, from a single tokenization.
+
+    A sentence longer than budget tokens is cut at token boundaries into pieces that fit.
+    """
+    encoding = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+    token_starts = [start for start, _ in encoding['offset_mapping']]
+    token_ends = [end for _, end in encoding['offset_mapping']]
+
+    pieces = []
+    for start, end in sentence_spans(text):
+        first, last = bisect.bisect_left(token_starts, start), bisect.bisect_left(token_starts, end)
+        for piece in range(first, last, budget):
+            piece_start = start if piece == first else token_starts[piece]
+            piece_end = end if piece + budget >= last else token_ends[piece + budget - 1]
+            pieces.append((piece_start, piece_end, min(budget, last - piece)))
+        if first == last:
+            pieces.append((start, end, 0))
+    return pieces
+
+
+def pack_windows(pieces, focus, budget=WINDOW_TOKENS):
+    """
+    (start, end) character spans covering every piece index in focus with as few windows as possible.
+
+    Windows are runs of consecutive pieces of at most budget tokens: each starts at the first
+    uncovered focus piece and grows forward as far as it fits, then spends what room is
+    left on the pieces before it, so every window is as full as the text allows.
+    """
+    windows = []
+    pending = sorted(set(focus))
+    while pending:
+        first = last = pending[0]
+        tokens = pieces[first][2]
+        while last + 1 < len(pieces) and tokens + pieces[last + 1][2] <= budget:
+            last += 1
+            tokens += pieces[last][2]
+        while first > 0 and tokens + pieces[first - 1][2] <= budget:
+            first -= 1
+            tokens += pieces[first][2]
+        windows.append((pieces[first][0], pieces[last][1]))
+        pending = [index for index in pending if index > last]
+    return windows
+
+
+def piece_indexes(pieces, positions):
+    """Index of the piece holding each character position."""
+    starts = [start for start, _, _ in pieces]
+    return [max(0, bisect.bisect_right(starts, position) - 1) for position in positions]
@@ -0,0 +1,86 @@
+import asyncio
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+from django.conf import settings
+
+CRAWLER_CONCURRENCY = getattr(settings, 'CRAWLER_CONCURRENCY', 8)
+BLOCKED_RESOURCE_TYPES = {'image', 'font', 'media'}
+
+
+def is_first_party(url, first_party_domains):
+    host = urlparse(url).hostname or ''
+    return any(host == domain or host.endswith('.' + domain) for domain in first_party_domains)
+
+
+async def bounded_map(fetch, items, concurrency):
+    """
+    Run `await fetch(item)` for every item off an asyncio work queue, at most `concurrency` at a time.
+
+    Results come back in item order; an item whose fetch raised gets None.
+    """
+    queue = asyncio.Queue()
+    for index, item in enumerate(items):
+        queue.put_nowait((index, item))
+    results = [None] * len(items)
+
+    async def worker():
+        while True:
+            try:
+                index, item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                results[index] = await fetch(item)
+            except Exception as e:
+                print(f"❌ Error fetching {item}: {e}")
+
+    await asyncio.gather(*(worker() for _ in range(min(max(1, concurrency), len(items)))))
+    return results
+
+
+class PagePool:
+    """
+    A fixed set of reusable Playwright pages in one browser context.
+
+    Images, fonts, media and third-party scripts are aborted at the route level,
+    so article pages load only the HTML and the site's own scripts.
+    """
+
+    def __init__(self, browser, size=CRAWLER_CONCURRENCY, first_party_domains=()):
+        self.browser = browser
+        self.size = max(1, size)
+        self.first_party_domains = tuple(first_party_domains)
+        self.context = None
+        self._pages = asyncio.Queue()
+
+    async def __aenter__(self):
+        self.context = await self.browser.new_context()
+        await self.context.route("**/*", self._route)
+        for _ in range(self.size):
+            self._pages.put_nowait(await self.context.new_page())
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.context.close()
+
+    async def _route(self, route):
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        elif request.resource_type == 'script' and not is_first_party(request.url, self.first_party_domains):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def new_page(self):
+        # An extra page in the same context (and with the same blocking), e.g. for listing pages
+        return await self.context.new_page()
+
+    @asynccontextmanager
+    async def page(self):
+        page = await self._pages.get()
+        try:
+            yield page
+        finally:
+            self._pages.put_nowait(page)
@@ -0,0 +1,178 @@
+import hashlib
+import zlib
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from rest_framework.filters import BaseFilterBackend
+
+from tamil_news.models import NewsDetails, SentimentResults, StoryBand, StoryFingerprint
+from tamil_news.search import normalize_text
+
+# The same story crawled from several outlets: MinHash signatures over character shingles of
+# the normalized title and lead. Articles sharing an LSH band key (story_bands, btree on key)
+# are the candidates, so a whole batch is matched with two indexed queries.
+
+# 27 bands of 3 rows (the last of 2), tuned to the 0.5 threshold: pairs 0.5 alike share a band
+# 97.7% of the time, 0.6 alike 99.9%; at 0.3 only 55% become candidates, and those are
+# dropped again by the signature comparison. Changing the banding changes every band key,
+# so stored bands must be rebuilt (see migration 0015).
+DEDUP_NUM_PERM = getattr(settings, 'DEDUP_NUM_PERM', 80)
+DEDUP_BANDS = getattr(settings, 'DEDUP_BANDS', 27)
+DEDUP_THRESHOLD = getattr(settings, 'DEDUP_THRESHOLD', 0.5)
+DEDUP_WINDOW_HOURS = getattr(settings, 'DEDUP_WINDOW_HOURS', 72)
+DEDUP_REUSE_SENTIMENT = getattr(settings, 'DEDUP_REUSE_SENTIMENT', False)
+
+SHINGLE_SIZE = 5
+TEXT_CHARS = 1000  # title plus the lead; outlets diverge further down
+MIN_TEXT_CHARS = 50  # a bare title is too short to tell stories apart
+
+PRIME = (1 << 32) - 5
+_rng = np.random.default_rng(20251018)  # fixed: stored signatures must stay comparable
+_A = _rng.integers(1, PRIME, DEDUP_NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, PRIME, DEDUP_NUM_PERM, dtype=np.uint64)
+
+
+def story_text(article):
+    return normalize_text(f"{article.title or ''} {article.description or ''}")[:TEXT_CHARS]
+
+
+def minhash(text):
+    """DEDUP_NUM_PERM minimum hashes (uint32) of the text's character shingles, or None when too short."""
+    if len(text) < MIN_TEXT_CHARS:
+        return None
+    shingles = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    hashes = np.fromiter((zlib.crc32(shingle.encode()) for shingle in shingles), np.uint64, len(shingles)) % PRIME
+    # a * h + b < 2**64 for a, h, b < 2**32, so uint64 never wraps
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % PRIME).min(axis=1).astype(np.uint32)
+
+
+def band_keys(signature):
+    keys = []
+    for band, rows in enumerate(np.array_split(signature, DEDUP_BANDS)):
+        digest = hashlib.blake2b(rows.tobytes(), digest_size=8, salt=band.to_bytes(2, 'little')).digest()
+        keys.append(int.from_bytes(digest, 'little', signed=True))
+    return keys
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of the two texts' shingle sets."""
+    if len(signature) != len(other):
+        return 0.0
+    return float(np.count_nonzero(signature == other)) / len(signature)
+
+
+def _published(article):
+    return article.published_time or timezone.now()
+
+
+def assign_stories(articles):
+    """
+    Put freshly stored articles in stories; returns {news_id: story_id}.
+
+    An article joins the story of its most similar article published within
+    DEDUP_WINDOW_HOURS, earlier ones in this batch included, when they are at least
+    DEDUP_THRESHOLD alike; otherwise it starts a story with its own id. Articles too short
+    to fingerprint get a story of their own.
+    """
+    articles = sorted(articles, key=lambda article: (_published(article), article.id))
+    fingerprints = {}
+    for article in articles:
+        signature = minhash(story_text(article))
+        if signature is not None:
+            fingerprints[article.id] = (signature, band_keys(signature))
+
+    window = timedelta(hours=DEDUP_WINDOW_HOURS)
+    published = {article.id: _published(article) for article in articles}
+    index = {}  # band key -> [(news_id, story_id, signature, published)]
+    if fingerprints:
+        bands = (
+            StoryBand.objects
+            .filter(
+                key__in=sorted({key for _, keys in fingerprints.values() for key in keys}),
+                published_time__gte=_published(articles[0]) - window,
+                published_time__lte=_published(articles[-1]) + window,
+            )
+            .exclude(news_id__in=fingerprints)
+            .values_list('key', 'news_id', 'published_time')
+        )
+        matched = {}
+        for key, news_id, band_published in bands:
+            matched.setdefault(news_id, (band_published, []))[1].append(key)
+        known = StoryFingerprint.objects.filter(news_id__in=matched).values_list('news_id', 'news__story_id', 'signature')
+        for news_id, story_id, signature in known:
+            band_published, keys = matched[news_id]
+            entry = (news_id, story_id or news_id, np.frombuffer(signature, np.uint32), band_published)
+            for key in keys:
+                index.setdefault(key, []).append(entry)
+
+    stories = {}
+    for article in articles:
+        story_id = article.id
+        if article.id in fingerprints:
+            signature, keys = fingerprints[article.id]
+            candidates = {entry[0]: entry for key in keys for entry in index.get(key, ())}
+            best = max(
+                (
+                    (similarity(signature, other), -news_id, story)
+                    for news_id, story, other, other_published in candidates.values()
+                    if abs(published[article.id] - other_published) <= window
+                ),
+                default=None,
+            )
+            if best is not None and best[0] >= DEDUP_THRESHOLD:
+                story_id = best[2]
+            for key in keys:
+                index.setdefault(key, []).append((article.id, story_id, signature, published[article.id]))
+        article.story_id = stories[article.id] = story_id
+
+    StoryFingerprint.objects.bulk_create(
+        [StoryFingerprint(news_id=news_id, signature=signature.tobytes()) for news_id, (signature, _) in fingerprints.items()],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+    StoryBand.objects.bulk_create(
+        [
+            StoryBand(key=key, news_id=news_id, published_time=published[news_id])
+            for news_id, (_, keys) in fingerprints.items() for key in keys
+        ],
+        batch_size=2000,
+    )
+    NewsDetails.objects.bulk_update(
+        [NewsDetails(id=news_id, story_id=story_id) for news_id, story_id in stories.items()],
+        ['story_id'],
+        batch_size=500,
+    )
+    return stories
+
+
+def story_scores(news):
+    """{keyword name: scores} already computed for other articles of news's story."""
+    if news.story_id is None:
+        return {}
+    results = (
+        SentimentResults.objects
+        .filter(news__story_id=news.story_id, keyword__isnull=False)
+        .exclude(news_id=news.id)
+        .order_by('processed_at')
+        .values_list('keyword__name', 'negative_score', 'neutral_score', 'positive_score')
+    )
+    return {
+        name: {'negative': negative, 'neutral': neutral, 'positive': positive}
+        for name, negative, neutral, positive in results
+        if None not in (negative, neutral, positive)
+    }
+
+
+class StoryFilter(BaseFilterBackend):
+    """?distinct_stories=true keeps one article, the first, of every story."""
+
+    def filter_queryset(self, request, queryset, view):
+        if request.query_params.get('distinct_stories', '').lower() not in ('1', 'true', 'yes'):
+            return queryset
+        prefix = getattr(view, 'news_search_prefix', '')
+        return queryset.filter(
+            Q(**{f'{prefix}story_id__isnull': True}) | Q(**{f'{prefix}story_id': F(f'{prefix}id')})
+        )
@@ -0,0 +1,86 @@
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, OuterRef, Subquery
+
+from tamil_news.cache import data_versions, get_or_compute
+from tamil_news.models import NewsDetails, SentimentResults, Websites
+from tamil_news.query_plans import explain
+
+# What the /news/ page shows besides the articles themselves, cached until ingest bumps a
+# data version (see signals.py and persistence.py).
+
+NEWS_FACETS_CACHE_TTL = getattr(settings, 'NEWS_FACETS_CACHE_TTL', 3600)
+NEWS_COUNT_EXACT_LIMIT = getattr(settings, 'NEWS_COUNT_EXACT_LIMIT', 10000)
+
+
+@dataclass
+class NewsCount:
+    value: int
+    exact: bool = True
+
+
+def _facets():
+    articles_per_website = dict(
+        NewsDetails.objects.order_by().values_list('website_id').annotate(count=Count('id'))
+    )
+    return {
+        'websites': [
+            {'id': website_id, 'name': name, 'count': articles_per_website.get(website_id, 0)}
+            for website_id, name in Websites.objects.order_by('id').values_list('id', 'name')
+        ],
+        'categories': [
+            {'value': category, 'count': count}
+            for category, count in (
+                NewsDetails.objects.exclude(category__isnull=True).exclude(category='')
+                .order_by('category').values_list('category').annotate(count=Count('id'))
+            )
+        ],
+        'sentiments': [
+            {'value': label, 'count': count}
+            for label, count in (
+                SentimentResults.objects.order_by('sentiment_label')
+                .values_list('sentiment_label').annotate(count=Count('news_id', distinct=True))
+            )
+        ],
+    }
+
+
+def news_facets():
+    """Websites, categories and sentiment labels for the filter dropdowns, each with its article count."""
+    return get_or_compute('news-facets', [], _facets, NEWS_FACETS_CACHE_TTL, scopes=('news', 'websites', 'sentiment'))
+
+
+def _count(queryset):
+    queryset = queryset.order_by()
+    count = queryset[:NEWS_COUNT_EXACT_LIMIT + 1].count()
+    if count <= NEWS_COUNT_EXACT_LIMIT or connection.vendor != 'postgresql':
+        return NewsCount(count if count <= NEWS_COUNT_EXACT_LIMIT else queryset.count())
+    # Past the limit nobody reads the exact figure; the planner's row estimate costs nothing
+    return NewsCount(max(int(explain(queryset)['Plan Rows']), count), exact=False)
+
+
+def count_news(queryset, params):
+    """
+    How many articles match, exact up to NEWS_COUNT_EXACT_LIMIT and estimated beyond it.
+
+    params identify the filters that built queryset; they key the cached figure.
+    """
+    return get_or_compute(
+        'news-count', params, lambda: _count(queryset), NEWS_FACETS_CACHE_TTL, scopes=('news', 'sentiment'),
+    )
+
+
+def with_latest_sentiment(news):
+    """Annotate latest_sentiment: the label of each article's most recent sentiment result."""
+    latest = SentimentResults.objects.filter(news=OuterRef('pk')).order_by('-processed_at', '-id')
+    return news.annotate(latest_sentiment=Subquery(latest.values('sentiment_label')[:1]))
+
+
+def set_card_versions(articles):
+    """card_version on each article, bumped when it is saved; part of its cached card's key."""
+    versions = data_versions([f'news:{article.pk}' for article in articles])
+    for article, version in zip(articles, versions):
+        article.card_version = version
+    return articles
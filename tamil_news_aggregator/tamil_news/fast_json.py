@@ -0,0 +1,242 @@
+import math
+
+import orjson
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+from rest_framework import ISO_8601, relations, serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+# Byte-identical stand-ins for the serializers and DRF's JSONRenderer on hot read paths.
+# Anything they can't reproduce exactly falls back to the regular code.
+
+FAST_JSON = getattr(settings, 'API_FAST_JSON', False)
+
+PLAIN_FIELDS = (serializers.IntegerField, serializers.CharField, serializers.FloatField, serializers.BooleanField)
+
+
+def _json_float(value):
+    # orjson and float.__repr__ agree between 1e-4 and 1e16; outside it the stdlib writes
+    # exponents ("1e-05") that orjson spells differently, so those are passed through as text
+    if value == 0.0 or 1e-4 <= abs(value) < 1e16:
+        return value
+    if not math.isfinite(value):
+        raise ValueError("Out of range float values are not JSON compliant")
+    return orjson.Fragment(float.__repr__(value))
+
+
+def _prepare(value):
+    """
+    value with the floats orjson would format differently replaced.
+
+    Containers holding such a float are copied rather than changed, so the response data and
+    the JSONRenderer fallback see the original values; anything else is returned as is.
+    """
+    if isinstance(value, float):
+        return _json_float(value)
+    if isinstance(value, dict):
+        prepared = None
+        for key, item in value.items():
+            if isinstance(item, (float, dict, list, tuple)):
+                new = _prepare(item)
+                if new is not item:
+                    if prepared is None:
+                        prepared = dict(value)
+                    prepared[key] = new
+        return value if prepared is None else prepared
+    if isinstance(value, (list, tuple)):
+        prepared = None
+        for index, item in enumerate(value):
+            if isinstance(item, (float, dict, list, tuple)):
+                new = _prepare(item)
+                if new is not item:
+                    if prepared is None:
+                        prepared = list(value)
+                    prepared[index] = new
+        return value if prepared is None else prepared
+    return value
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer through orjson, producing the same bytes as the stdlib encoder.
+
+    Types orjson doesn't handle the same way (datetimes, Decimals, lazy strings, ...) go
+    through DRF's JSONEncoder.default; pretty-printed output and any encoding error fall
+    back to JSONRenderer.
+    """
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            not FAST_JSON or data is None or not self.compact or self.ensure_ascii or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        encoder = self.encoder_class()
+        try:
+            ret = orjson.dumps(_prepare(data), default=lambda value: _prepare(encoder.default(value)), option=self.options)
+        except (TypeError, ValueError):
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+def _convert(value, to_representation):
+    # The serializer renders None as null without calling the field
+    if value is None or to_representation is None:
+        return value
+    return to_representation(value)
+
+
+def _datetime_converter(field):
+    """DateTimeField.to_representation for ISO 8601 output, with the timezone looked up once."""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        if isinstance(value, str) or timezone.is_naive(value):
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def _column(field, key):
+    if isinstance(field, PLAIN_FIELDS):
+        return key, None
+    if isinstance(field, serializers.DateTimeField):
+        return key, _datetime_converter(field)
+    if isinstance(field, serializers.DateField):
+        return key, field.to_representation
+    return None
+
+
+def _nested_columns(serializer, prefix):
+    columns = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        column = _column(field, f'{prefix}__{field.source}') if '.' not in field.source else None
+        if column is None:
+            return None
+        columns.append((name, *column))
+    return columns
+
+
+class RowPlan:
+    """
+    Builds a ModelSerializer's output from values() rows: the keys and conversions per field,
+    one extra query per many-to-many field for a whole page.
+
+    for_serializer() returns None when some field needs the serializer itself.
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields  # [(name, kind, key, spec)]
+
+    @classmethod
+    def for_serializer(cls, serializer):
+        model = serializer.Meta.model
+        fields = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                return None
+
+            if model_field.many_to_many:
+                child = getattr(field, 'child', None) or getattr(field, 'child_relation', None)
+                if isinstance(child, serializers.Serializer):
+                    spec = _nested_columns(child, model_field.m2m_reverse_field_name())
+                elif isinstance(child, relations.PrimaryKeyRelatedField) and child.pk_field is None:
+                    spec = []
+                else:
+                    return None
+                if spec is None:
+                    return None
+                fields.append((name, 'many', model_field, spec))
+            elif model_field.many_to_one:
+                if isinstance(field, serializers.Serializer):
+                    spec = _nested_columns(field, field.source)
+                    if spec is None:
+                        return None
+                    fields.append((name, 'nested', model_field.attname, spec))
+                elif isinstance(field, relations.PrimaryKeyRelatedField) and field.pk_field is None:
+                    fields.append((name, 'column', model_field.attname, None))
+                else:
+                    return None
+            elif not model_field.is_relation:
+                column = _column(field, field.source)
+                if column is None:
+                    return None
+                fields.append((name, 'column', *column))
+            else:
+                return None
+        return cls(model, fields)
+
+    def values(self, queryset):
+        """queryset as values() rows carrying every key the plan and a keyset cursor read."""
+        keys = {'pk'}
+        keys.update(name.lstrip('-') for name in queryset.query.order_by)
+        for name, kind, key, spec in self.fields:
+            if kind == 'column':
+                keys.add(key)
+            elif kind == 'nested':
+                keys.add(key)
+                keys.update(column for _, column, _ in spec)
+        return queryset.select_related(None).prefetch_related(None).values(*keys)
+
+    def rows(self, records):
+        records = list(records)
+        related = {
+            name: self._many(model_field, spec, [record['pk'] for record in records])
+            for name, kind, model_field, spec in self.fields if kind == 'many'
+        }
+
+        rows = []
+        for record in records:
+            row = {}
+            for name, kind, key, spec in self.fields:
+                if kind == 'column':
+                    row[name] = _convert(record[key], spec)
+                elif kind == 'nested':
+                    row[name] = None if record[key] is None else {
+                        sub_name: _convert(record[column], to_representation)
+                        for sub_name, column, to_representation in spec
+                    }
+                else:
+                    row[name] = related[name].get(record['pk'], [])
+            rows.append(row)
+        return rows
+
+    def _many(self, model_field, spec, pks):
+        """{pk: [related id or nested dict]} in related-pk order, the order optimize_queryset prefetches in."""
+        through = model_field.remote_field.through
+        source, target = model_field.m2m_field_name(), model_field.m2m_reverse_field_name()
+        columns = [column for _, column, _ in spec] or [f'{target}_id']
+        links = (
+            through.objects
+            .filter(**{f'{source}_id__in': pks})
+            .order_by(f'{target}_id')
+            .values_list(f'{source}_id', *columns)
+        )
+        related = {}
+        for pk, *values in links:
+            if spec:
+                item = {
+                    sub_name: _convert(value, to_representation)
+                    for (sub_name, _, to_representation), value in zip(spec, values)
+                }
+            else:
+                item = values[0]
+            related.setdefault(pk, []).append(item)
+        return related
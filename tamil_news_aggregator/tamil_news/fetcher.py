@@ -0,0 +1,158 @@
+import asyncio
+
+from django.conf import settings
+import httpx
+from selectolax.lexbor import LexborHTMLParser
+
+from tamil_news.crawler_utils import CRAWLER_CONCURRENCY, PagePool, bounded_map, is_first_party
+
+# Sites whose listing pages only fill in after client-side rendering
+CRAWLER_JS_SITES = getattr(settings, 'CRAWLER_JS_SITES', ['puthiyathalaimurai.com'])
+HTTP_TIMEOUT = getattr(settings, 'CRAWLER_HTTP_TIMEOUT', 30)
+
+DEFAULT_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+        '(KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36'
+    ),
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'ta-IN,ta;q=0.9,en;q=0.8',
+}
+
+
+def select(node, selector):
+    # lexbor includes the node itself when it matches; Playwright's query_selector_all does not
+    return [match for match in node.css(selector) if match != node]
+
+
+def select_one(node, selector):
+    matches = select(node, selector)
+    return matches[0] if matches else None
+
+
+def text_of(node):
+    # Separate the text of child elements, as Playwright's inner_text did for block children
+    return ' '.join(node.text(separator=' ').split()) if node is not None else None
+
+
+def attr_of(node, name):
+    return node.attributes.get(name) if node is not None else None
+
+
+class SharedBrowser:
+    """One headless Chromium for any number of Fetchers, launched on first use."""
+
+    def __init__(self):
+        self._playwright = None
+        self._browser = None
+        self._lock = asyncio.Lock()
+
+    async def get(self):
+        async with self._lock:
+            if self._browser is None:
+                from playwright.async_api import async_playwright
+
+                print("🧭 Launching Chromium for JS-rendered pages")
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True)
+        return self._browser
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._browser = self._playwright = None
+
+
+class Fetcher:
+    """
+    Fetch pages over pooled HTTP/2 and parse them with lexbor.
+
+    Chromium is only started when a page needs it: sites listed in CRAWLER_JS_SITES,
+    pages fetched with needs_js=True, or an HTTP error such as a bot-protection 403.
+    Rendered pages are parsed the same way, so callers use one set of selectors.
+    Fetchers for different sites can share one SharedBrowser; each still gets its own
+    browser context, so third-party script blocking follows its own first-party domains.
+    """
+
+    def __init__(self, concurrency=CRAWLER_CONCURRENCY, first_party_domains=(), js_domains=None, browser=None):
+        self.concurrency = max(1, concurrency)
+        self.first_party_domains = tuple(first_party_domains)
+        self.js_domains = tuple(CRAWLER_JS_SITES if js_domains is None else js_domains)
+        self.client = None
+        self.http_fetches = 0
+        self.browser_fetches = 0
+        self.browser = browser or SharedBrowser()
+        self._owns_browser = browser is None
+        self._pool = None
+        self._pool_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        self.client = httpx.AsyncClient(
+            http2=True,
+            follow_redirects=True,
+            timeout=HTTP_TIMEOUT,
+            headers=DEFAULT_HEADERS,
+            limits=httpx.Limits(max_connections=self.concurrency * 2, max_keepalive_connections=self.concurrency),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+        if self._pool is not None:
+            await self._pool.__aexit__(*exc_info)
+        if self._owns_browser:
+            await self.browser.__aexit__(*exc_info)
+
+    def needs_js(self, url):
+        return is_first_party(url, self.js_domains)
+
+    async def page_pool(self):
+        """This fetcher's Playwright page pool, launching Chromium on first use."""
+        async with self._pool_lock:
+            if self._pool is None:
+                self._pool = await PagePool(
+                    await self.browser.get(), self.concurrency, first_party_domains=self.first_party_domains
+                ).__aenter__()
+        return self._pool
+
+    async def get_document(self, url, expect=None, needs_js=False):
+        """
+        Parsed page for `url`.
+
+        `expect` is the selector the caller is after: a rendered page waits for it, and plain
+        HTML without it is reported so a site that moved to client-side rendering gets noticed.
+        """
+        if not (needs_js or self.needs_js(url)):
+            try:
+                response = await self.client.get(url)
+                response.raise_for_status()
+                document = LexborHTMLParser(response.text)
+                self.http_fetches += 1
+                if expect and document.css_first(expect) is None:
+                    print(f"⚠️ No '{expect}' in the HTML of {url}")
+                return document
+            except httpx.HTTPError as e:
+                print(f"⚠️ HTTP fetch failed for {url} ({e}), rendering instead")
+
+        return LexborHTMLParser(await self.render(url, expect))
+
+    async def render(self, url, expect=None):
+        pool = await self.page_pool()
+        async with pool.page() as page:
+            await page.goto(url, timeout=60000, wait_until="domcontentloaded")
+            if expect:
+                try:
+                    await page.wait_for_selector(expect, timeout=15000)
+                except Exception:
+                    pass  # Let the caller see an empty result rather than fail the whole page
+            html = await page.content()
+        self.browser_fetches += 1
+        return html
+
+    async def map(self, fetch, items):
+        return await bounded_map(fetch, items, self.concurrency)
@@ -0,0 +1,102 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import timezone
+from django.utils.http import parse_etags
+
+from tamil_news.cache import cache_key
+
+# Rendered API responses, keyed by endpoint, normalized query and the data versions the
+# endpoint reads. Ingest bumps those versions (see signals.py), so entries never go stale;
+# the TTL only bounds how long unused ones stay around.
+
+API_CACHE_ALIAS = getattr(settings, 'API_CACHE_ALIAS', 'api')
+API_CACHE_TTL = getattr(settings, 'API_CACHE_TTL', 600)
+# Clients may keep a copy but must revalidate it; an unchanged answer is a bodiless 304
+API_CACHE_CONTROL = getattr(settings, 'API_CACHE_CONTROL', 'no-cache')
+
+CACHED_CONTENT_TYPES = ('application/json',)
+REPLAYED_HEADERS = ('Content-Type', 'Vary', 'Allow')
+
+
+def response_cache_key(request, scopes):
+    # Keys sorted, repeated values kept in order: ?keyword=a&keyword=b is not ?keyword=b&keyword=a
+    query = sorted((name, request.GET.getlist(name)) for name in request.GET)
+    params = [
+        request.get_host(),  # pagination links are absolute
+        request.path,
+        query,
+        request.META.get('HTTP_ACCEPT', ''),
+        timezone.localdate(),  # "today" ranges move at midnight
+    ]
+    return cache_key('http', params, scopes)
+
+
+def strong_etag(content):
+    return f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+def etag_matches(request, etag):
+    """If-None-Match uses the weak comparison (RFC 9110 13.1.2)."""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return '*' in etags or etag in (tag.removeprefix('W/') for tag in etags)
+
+
+def cache_entry(response):
+    """(etag, content, headers) for a response worth caching, or None."""
+    if response.status_code != 200 or response.streaming:
+        return None
+    if hasattr(response, 'render') and not response.is_rendered:
+        response.render()  # DRF sets the negotiated Content-Type while rendering
+    if response.get('Content-Type', '').split(';')[0] not in CACHED_CONTENT_TYPES:
+        return None
+    headers = {name: response[name] for name in REPLAYED_HEADERS if name in response}
+    return strong_etag(response.content), response.content, headers
+
+
+def _validated(request, response, etag):
+    if etag_matches(request, etag):
+        not_modified = HttpResponseNotModified()
+        if 'Vary' in response:
+            not_modified['Vary'] = response['Vary']
+        response = not_modified
+    response['ETag'] = etag
+    response['Cache-Control'] = API_CACHE_CONTROL
+    return response
+
+
+class CachedResponseMixin:
+    """
+    Serves GET and HEAD from the 'api' cache, with a strong ETag and 304 for If-None-Match.
+
+    cache_scopes names the data versions the view reads; a write bumping any of them makes
+    the next request render afresh. A hit skips authentication and permission checks, so
+    only use this on endpoints that answer every client the same.
+    """
+    cache_scopes = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or not API_CACHE_TTL:
+            return super().dispatch(request, *args, **kwargs)
+
+        response_cache = caches[API_CACHE_ALIAS]
+        key = response_cache_key(request, self.cache_scopes)
+        entry = response_cache.get(key)
+        if entry is not None:
+            etag, content, headers = entry
+            response = HttpResponse(content)
+            for name, value in headers.items():
+                response[name] = value
+            return _validated(request, response, etag)
+
+        response = super().dispatch(request, *args, **kwargs)
+        entry = cache_entry(response)
+        if entry is None:
+            return response
+        response_cache.set(key, entry, API_CACHE_TTL)
+        return _validated(request, response, entry[0])
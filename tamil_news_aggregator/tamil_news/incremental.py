@@ -0,0 +1,152 @@
+import hashlib
+import math
+import struct
+
+from django.conf import settings
+from django.utils import timezone
+
+from tamil_news.models import CrawlState, NewsDetails
+
+STOP_AFTER_KNOWN_PAGES = getattr(settings, 'CRAWLER_STOP_AFTER_KNOWN_PAGES', 2)
+SEEN_URLS_CAPACITY = getattr(settings, 'CRAWLER_SEEN_URLS_CAPACITY', 200000)
+
+
+class BloomFilter:
+    HEADER = struct.Struct('<II')  # bit count, hash count
+
+    def __init__(self, capacity=SEEN_URLS_CAPACITY, error_rate=0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        # Double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+    def to_bytes(self):
+        return self.HEADER.pack(self.size, self.hashes) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data, capacity=SEEN_URLS_CAPACITY):
+        bloom = cls(capacity)
+        if data and len(data) == cls.HEADER.size + len(bloom.bits):
+            size, hashes = cls.HEADER.unpack_from(data)
+            if (size, hashes) == (bloom.size, bloom.hashes):
+                bloom.bits = bytearray(data[cls.HEADER.size:])
+        # A filter sized for a different capacity is dropped; stored article URLs still count as known
+        return bloom
+
+
+class IncrementalCrawl:
+    """
+    Tracks which listing entries a site crawl has already seen.
+
+    An entry is known when its URL is stored in news_details, or when an earlier run already
+    checked it against the same keywords: it is in the persisted Bloom filter of seen URLs
+    (so articles that matched no keyword count too) or older than the site's high-water mark.
+    After `stop_after` consecutive pages of known entries, page_done() tells the crawler to
+    stop paginating. With full=True nothing is skipped and pagination never stops early.
+
+    Entries only join the filter and move the high-water mark on save(). Entries that could
+    not be fetched or stored (page_done's failed, or fail() later) are left out, and the mark
+    stops at the oldest of them, so the next run checks them again.
+
+    `keywords` is the set this run filters on, or None when it keeps every article.
+    """
+
+    def __init__(self, website, state, known_urls, keywords=None, full=False, stop_after=STOP_AFTER_KNOWN_PAGES):
+        self.website = website
+        self.state = state
+        self.known_urls = known_urls
+        self.keywords = sorted(set(keywords)) if keywords is not None else None
+        self.full = full
+        self.stop_after = stop_after
+        self.known_pages_in_a_row = 0
+        self.entries = []  # (url, published_time) handled this run, recorded by save()
+        self.checked = set()  # their URLs, known for the rest of the run
+        self.failed = set()
+        self.oldest_failure = None
+
+        # Earlier runs only vouch for articles they matched against at least these keywords
+        previous = state.seen_keywords
+        self.trust_history = previous is None or (
+            self.keywords is not None and set(self.keywords) <= set(previous)
+        )
+        if self.trust_history and state.seen_urls:
+            self.seen = BloomFilter.from_bytes(bytes(state.seen_urls))
+        else:
+            self.seen = BloomFilter()
+
+    @classmethod
+    def load(cls, website, keywords=None, full=False, stop_after=STOP_AFTER_KNOWN_PAGES):
+        state, _ = CrawlState.objects.get_or_create(website=website)
+        known_urls = set(NewsDetails.objects.filter(website=website).values_list('article_url', flat=True))
+        return cls(website, state, known_urls, keywords=keywords, full=full, stop_after=stop_after)
+
+    def is_known(self, url, published_time=None):
+        if not url:
+            return False
+        if url in self.known_urls or url in self.checked:
+            return True
+        if not self.trust_history:
+            return False
+        if url in self.seen:
+            return True
+        high_water_mark = self.state.high_water_mark
+        return bool(published_time and high_water_mark and published_time < high_water_mark)
+
+    def should_skip(self, url, published_time=None):
+        return not self.full and self.is_known(url, published_time)
+
+    def page_done(self, entries, failed=()):
+        """
+        Record a listing page's (url, published_time) entries; True means stop paginating.
+
+        failed are the entries among them that could not be fetched or stored.
+        """
+        all_known = bool(entries) and all(self.is_known(url, published_time) for url, published_time in entries)
+
+        self.entries.extend(entries)
+        self.checked.update(url for url, _ in entries if url)
+        self.fail(failed)
+
+        self.known_pages_in_a_row = self.known_pages_in_a_row + 1 if all_known else 0
+        return not self.full and self.known_pages_in_a_row >= self.stop_after
+
+    def fail(self, entries):
+        """(url, published_time) entries to check again on the next run, e.g. from a failed flush."""
+        for url, published_time in entries:
+            if url:
+                self.failed.add(url)
+                self.checked.discard(url)
+            if published_time and (self.oldest_failure is None or published_time < self.oldest_failure):
+                self.oldest_failure = published_time
+
+    def save(self):
+        newest = self.state.high_water_mark
+        for url, published_time in self.entries:
+            if url in self.failed:
+                continue
+            if url:
+                self.seen.add(url)
+            if published_time and (newest is None or published_time > newest):
+                newest = published_time
+        if self.oldest_failure is not None and newest is not None and newest > self.oldest_failure:
+            # is_known only trusts times strictly before the mark, so the failure itself stays unknown
+            newest = self.oldest_failure
+
+        self.state.high_water_mark = newest
+        self.state.seen_urls = self.seen.to_bytes()
+        self.state.seen_keywords = self.keywords
+        self.state.last_run_at = timezone.now()
+        self.state.save()
@@ -0,0 +1,129 @@
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from tamil_news.model_registry import BACKEND, get_model
+from tamil_news.models import InferenceCacheEntry
+
+# Scores of texts a model has already seen: an in-process LRU in front of the inference_cache
+# table, keyed by the model's name, backend and version and the normalized text. Re-crawls,
+# syndicated copies and lightly edited articles repeat most of their chunks.
+
+INFERENCE_CACHE = getattr(settings, 'INFERENCE_CACHE', True)
+LRU_SIZE = getattr(settings, 'INFERENCE_CACHE_LRU_SIZE', 20000)
+MAX_ROWS = getattr(settings, 'INFERENCE_CACHE_MAX_ROWS', 1000000)
+PRUNE_EVERY = 1000  # stored rows between size checks
+
+WHITESPACE = re.compile(r'\s+')
+
+_caches = {}
+_lock = threading.Lock()
+
+
+def normalize_chunk(text):
+    return WHITESPACE.sub(' ', unicodedata.normalize('NFC', text)).strip()
+
+
+def prune(max_rows=MAX_ROWS):
+    """Delete the least recently used entries beyond max_rows; returns how many went."""
+    cutoff = list(
+        InferenceCacheEntry.objects.order_by('-last_used_at').values_list('last_used_at', flat=True)[max_rows:max_rows + 1]
+    )
+    if not cutoff:
+        return 0
+    deleted, _ = InferenceCacheEntry.objects.filter(last_used_at__lte=cutoff[0]).delete()
+    return deleted
+
+
+class InferenceCache:
+    """
+    predict_proba() of a registry model, running the model only on texts it hasn't scored.
+
+    Texts are NFC-normalized with whitespace collapsed before hashing and before scoring,
+    so a hit returns exactly what the model produced for that text. stats counts distinct
+    texts per call: served from memory, from the table, or by a forward pass.
+    """
+
+    def __init__(self, model, lru_size=LRU_SIZE, max_rows=MAX_ROWS):
+        self.model = model
+        self.model_id = f"{model.name}:{type(model).__name__}:{getattr(model, 'version', '')}"
+        self.lru = OrderedDict()
+        self.lru_size = lru_size
+        self.max_rows = max_rows
+        self.stats = {'memory_hits': 0, 'db_hits': 0, 'misses': 0}
+        self._stored = 0
+
+    def key(self, text):
+        return hashlib.sha256(f"{self.model_id}\0{text}".encode()).hexdigest()
+
+    def _remember(self, key, scores):
+        self.lru[key] = scores
+        self.lru.move_to_end(key)
+        if len(self.lru) > self.lru_size:
+            self.lru.popitem(last=False)
+
+    def predict_proba(self, texts, batch_size=16):
+        """Softmax scores for each text, in input order, as an (n, num_labels) array."""
+        texts = [normalize_chunk(text) for text in texts]
+        keys = [self.key(text) for text in texts]
+        unique = dict(zip(keys, texts))
+
+        found = {}
+        for key in unique:
+            scores = self.lru.get(key)
+            if scores is not None:
+                self.lru.move_to_end(key)
+                found[key] = scores
+        self.stats['memory_hits'] += len(found)
+
+        missing = [key for key in unique if key not in found]
+        if missing:
+            stored = dict(InferenceCacheEntry.objects.filter(key__in=missing).values_list('key', 'scores'))
+            if stored:
+                InferenceCacheEntry.objects.filter(key__in=list(stored)).update(last_used_at=timezone.now())
+            for key, scores in stored.items():
+                found[key] = np.frombuffer(bytes(scores), np.float32)
+                self._remember(key, found[key])
+            self.stats['db_hits'] += len(stored)
+
+        todo = [key for key in missing if key not in found]
+        if todo:
+            scores = np.asarray(self.model.predict_proba([unique[key] for key in todo], batch_size=batch_size), np.float32)
+            entries = []
+            for key, row in zip(todo, scores):
+                found[key] = row
+                self._remember(key, row)
+                entries.append(InferenceCacheEntry(key=key, model=self.model_id, scores=row.tobytes()))
+            InferenceCacheEntry.objects.bulk_create(entries, batch_size=1000, ignore_conflicts=True)
+            self.stats['misses'] += len(todo)
+            self._stored += len(todo)
+            if self._stored >= PRUNE_EVERY:
+                self._stored = 0
+                prune(self.max_rows)
+
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+
+def get_cached_model(name, backend=None):
+    """get_model() behind an InferenceCache, one per model and process; the bare model when INFERENCE_CACHE is off."""
+    model = get_model(name, backend)
+    if not INFERENCE_CACHE:
+        return model
+    key = (name, backend or BACKEND)
+    if key not in _caches:
+        with _lock:
+            _caches.setdefault(key, InferenceCache(model))
+    return _caches[key]
+
+
+def cache_stats():
+    """{model id: stats} for the caches used in this process."""
+    return {cache.model_id: dict(cache.stats) for cache in _caches.values()}
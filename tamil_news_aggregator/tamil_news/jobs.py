@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from tamil_news.models import SentimentJob
+
+VISIBILITY_TIMEOUT = getattr(settings, 'SENTIMENT_JOB_VISIBILITY_TIMEOUT', 300)
+MAX_ATTEMPTS = getattr(settings, 'SENTIMENT_JOB_MAX_ATTEMPTS', 5)
+RETRY_DELAY = getattr(settings, 'SENTIMENT_JOB_RETRY_DELAY', 30)
+
+
+def enqueue_sentiment_jobs(news_ids):
+    jobs = [SentimentJob(news_id=news_id) for news_id in news_ids]
+    return SentimentJob.objects.bulk_create(jobs)
+
+
+def claim_jobs(worker_id, limit, visibility_timeout=VISIBILITY_TIMEOUT, max_attempts=MAX_ATTEMPTS):
+    """
+    Lease up to `limit` due jobs to this worker.
+
+    Rows are locked with SKIP LOCKED so concurrent workers never claim the same job.
+    A running job whose lease has expired (its worker died) is claimable again.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        job_ids = list(
+            SentimentJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(
+                Q(status=SentimentJob.STATUS_PENDING) | Q(status=SentimentJob.STATUS_RUNNING),
+                available_at__lte=now,
+                attempts__lt=max_attempts,
+            )
+            .order_by('available_at', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        if not job_ids:
+            return []
+
+        SentimentJob.objects.filter(id__in=job_ids).update(
+            status=SentimentJob.STATUS_RUNNING,
+            locked_by=worker_id,
+            available_at=now + timedelta(seconds=visibility_timeout),
+            attempts=F('attempts') + 1,
+        )
+
+    return list(SentimentJob.objects.filter(id__in=job_ids).select_related('news').order_by('id'))
+
+
+def complete_job(job):
+    SentimentJob.objects.filter(id=job.id, locked_by=job.locked_by).update(
+        status=SentimentJob.STATUS_DONE,
+        finished_at=timezone.now(),
+        last_error=None,
+    )
+
+
+def fail_job(job, error, max_attempts=MAX_ATTEMPTS, retry_delay=RETRY_DELAY):
+    now = timezone.now()
+    if job.attempts >= max_attempts:
+        status, available_at, finished_at = SentimentJob.STATUS_FAILED, now, now
+    else:
+        # Exponential backoff: retry_delay, 2 * retry_delay, 4 * retry_delay, ...
+        delay = retry_delay * 2 ** (job.attempts - 1)
+        status, available_at, finished_at = SentimentJob.STATUS_PENDING, now + timedelta(seconds=delay), None
+
+    SentimentJob.objects.filter(id=job.id, locked_by=job.locked_by).update(
+        status=status,
+        available_at=available_at,
+        finished_at=finished_at,
+        last_error=str(error),
+    )
+
+
+def fail_exhausted_jobs(max_attempts=MAX_ATTEMPTS):
+    # Leases that expired on their final attempt will never be claimed again
+    return SentimentJob.objects.filter(
+        status=SentimentJob.STATUS_RUNNING,
+        available_at__lte=timezone.now(),
+        attempts__gte=max_attempts,
+    ).update(
+        status=SentimentJob.STATUS_FAILED,
+        finished_at=timezone.now(),
+        last_error='Visibility timeout expired on final attempt',
+    )
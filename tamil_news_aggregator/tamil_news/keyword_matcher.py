@@ -0,0 +1,139 @@
+import threading
+import time
+import unicodedata
+from collections import deque, namedtuple
+
+from django.conf import settings
+
+# Soft hyphen, ZWSP, ZWNJ, ZWJ, word joiner and BOM: invisible, and Tamil pages use them
+# inconsistently inside words
+INVISIBLE_CHARS = dict.fromkeys(map(ord, '\u00ad\u200b\u200c\u200d\u2060\ufeff'))
+
+MATCHER_TTL = getattr(settings, 'KEYWORD_MATCHER_TTL', 60)
+
+Match = namedtuple('Match', ['keyword', 'start', 'end'])
+
+
+def normalize_tamil(text):
+    """NFC-normalize and drop invisible characters so equal-looking text compares equal."""
+    if not text:
+        return ''
+    return unicodedata.normalize('NFC', text.translate(INVISIBLE_CHARS))
+
+
+class KeywordMatcher:
+    """
+    Aho–Corasick automaton over a set of keywords.
+
+    Finds every occurrence of every keyword in a single pass over the text, so the cost
+    depends on the text length and not on how many keywords are tracked.
+    """
+
+    def __init__(self, keywords):
+        self.patterns = []
+        self.names = {}  # normalized pattern -> original keyword names that normalize to it
+        for name in keywords:
+            pattern = normalize_tamil(name)
+            if not pattern:
+                continue
+            if pattern not in self.names:
+                self.names[pattern] = []
+                self.patterns.append(pattern)
+            if name not in self.names[pattern]:
+                self.names[pattern].append(name)
+
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self._build()
+
+    def _build(self):
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = next_state
+            self._out[state].append(index)
+
+        # Breadth-first so every failure link points at an already finished state
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def find_all(self, text, normalized=False):
+        """
+        Every keyword occurrence as Match(keyword, start, end).
+
+        `keyword` is the normalized pattern and the offsets index into normalize_tamil(text);
+        pass normalized=True when the text has already been normalized.
+        """
+        if not normalized:
+            text = normalize_tamil(text)
+
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self.patterns
+        hits = []
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in out[state]:
+                pattern = patterns[index]
+                hits.append(Match(pattern, position - len(pattern) + 1, position + 1))
+        return hits
+
+    def matches(self, *texts):
+        """Original keyword names found in any of the texts, in keyword order."""
+        found = set()
+        for text in texts:
+            found.update(hit.keyword for hit in self.find_all(text))
+        return [name for pattern in self.patterns if pattern in found for name in self.names[pattern]]
+
+
+_matcher = None
+_built_at = 0.0
+_lock = threading.Lock()
+
+
+def get_keyword_matcher():
+    """
+    Process-wide matcher over every Keyword row.
+
+    Keyword saves and deletes in this process drop it immediately (see signals.py);
+    changes made by other processes are picked up after KEYWORD_MATCHER_TTL seconds.
+    """
+    global _matcher, _built_at
+
+    matcher = _matcher
+    if matcher is not None and time.monotonic() - _built_at < MATCHER_TTL:
+        return matcher
+
+    # Imported here: models imports search, which normalizes through this module
+    from tamil_news.models import Keyword
+
+    with _lock:
+        if _matcher is None or time.monotonic() - _built_at >= MATCHER_TTL:
+            _matcher = KeywordMatcher(Keyword.objects.values_list('name', flat=True))
+            _built_at = time.monotonic()
+        return _matcher
+
+
+def invalidate_keyword_matcher():
+    global _matcher
+    _matcher = None
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from tamil_news.cache import bump_data_version
+from tamil_news.dedup import assign_stories
+from tamil_news.models import NewsDetails
+import time
+
+
+class Command(BaseCommand):
+    help = "Fingerprint articles without a story and group near-duplicates (backfill for existing rows)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        processed = clustered = 0
+        while True:
+            # Oldest first, so every story is named after its first article
+            batch = list(
+                NewsDetails.objects
+                .filter(story_id__isnull=True)
+                .order_by('published_time', 'id')
+                .only('id', 'title', 'description', 'published_time')[:options['batch_size']]
+            )
+            if not batch:
+                break
+            with transaction.atomic():
+                stories = assign_stories(batch)
+            processed += len(stories)
+            clustered += sum(1 for news_id, story_id in stories.items() if news_id != story_id)
+            self.stdout.write(f"🔍 {processed} articles fingerprinted, {clustered} near-duplicates so far")
+
+        if processed:
+            bump_data_version('news')
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {processed} articles in {time.perf_counter() - started:.1f}s, {clustered} joined an earlier story"
+        ))
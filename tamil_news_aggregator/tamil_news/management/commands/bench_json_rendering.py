@@ -0,0 +1,107 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from tamil_news.fast_json import FastJSONRenderer, RowPlan
+from tamil_news.models import Keyword, NewsDetails, SentimentResults, Websites
+from tamil_news.serializers import NewsDetailsSerializer, SentimentResultsSerializer
+
+SAMPLE_DESCRIPTION = "தமிழ்நாடு அரசு புதிய திட்டத்தை அறிவித்தது. மழை காரணமாக பல மாவட்டங்களில் பள்ளிகளுக்கு விடுமுறை. " * 4
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the serializer + JSONRenderer path with the values() + orjson fast path "
+        "on list pages, and check both produce the same bytes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='100,1000,10000', help="Comma separated row counts")
+        parser.add_argument('--repeat', type=int, default=3, help="Timed passes per path")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        # Missing rows are made up inside a transaction that is rolled back at the end
+        with transaction.atomic():
+            self.seed(max(sizes))
+            for label, serializer_class, queryset in [
+                ("news", NewsDetailsSerializer, NewsDetails.objects.order_by('-published_time', '-id')),
+                ("sentiment results", SentimentResultsSerializer, SentimentResults.objects.order_by('-processed_at', '-id')),
+            ]:
+                self.stdout.write(self.style.NOTICE(f"\n🔍 {label}"))
+                for size in sizes:
+                    self.compare(serializer_class, queryset, size, options['repeat'])
+            transaction.set_rollback(True)
+
+    def compare(self, serializer_class, queryset, size, repeat):
+        def current():
+            serializer = serializer_class(context={'request': None})
+            rows = serializer_class(serializer.optimize_queryset(queryset)[:size], many=True).data
+            return JSONRenderer().render(rows)
+
+        def fast():
+            plan = RowPlan.for_serializer(serializer_class(context={'request': None}))
+            return FastJSONRenderer().render(plan.rows(plan.values(queryset)[:size]))
+
+        timings = {}
+        output = {}
+        for name, render in (('serializer', current), ('fast path', fast)):
+            best = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                output[name] = render()
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = best
+
+        same = "✅ identical" if output['serializer'] == output['fast path'] else "❌ output differs"
+        self.stdout.write(
+            f"  {size:6} rows: serializer {timings['serializer'] * 1000:8.1f} ms, "
+            f"fast path {timings['fast path'] * 1000:7.1f} ms "
+            f"({timings['serializer'] / timings['fast path']:4.1f}x), "
+            f"{len(output['fast path']) / 1024:7.0f} KiB, {same}"
+        )
+
+    def seed(self, count):
+        missing = count - min(NewsDetails.objects.count(), SentimentResults.objects.count())
+        if missing <= 0:
+            return
+        self.stdout.write(f"⚠️ Adding {missing} synthetic articles for the run (rolled back afterwards)")
+        website, _ = Websites.objects.get_or_create(name="bench.example")
+        keywords = [Keyword.objects.create(name=f"bench keyword {i}") for i in range(3)]
+        now = timezone.now()
+        articles = NewsDetails.objects.bulk_create([
+            NewsDetails(
+                website=website,
+                website_name=website.name,
+                title=f"செய்தி {i}",
+                article_url=f"https://bench.example/{i}",
+                category="Tamilnadu",
+                published_time=now - timedelta(minutes=i, microseconds=i),
+                author=None if i % 4 else "நிருபர்",
+                description=SAMPLE_DESCRIPTION,
+            )
+            for i in range(missing)
+        ])
+        links = NewsDetails.keywords.through
+        links.objects.bulk_create([
+            links(newsdetails_id=article.id, keyword_id=keyword.id)
+            for i, article in enumerate(articles) for keyword in keywords[:i % 3]
+        ])
+        SentimentResults.objects.bulk_create([
+            SentimentResults(
+                news=article,
+                keyword=keywords[i % 3],
+                sentiment_label="positive",
+                sentiment_score=0.91,
+                positive_score=0.91,
+                negative_score=3.2e-05 * (i % 5),
+                neutral_score=0.0899,
+                processed_at=now - timedelta(seconds=i),
+            )
+            for i, article in enumerate(articles)
+        ])
@@ -1,53 +1,182 @@
-from django.core.management.base import BaseCommand
-from tamil_news.models import NewsDetails, SentimentResults
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
 from django.utils import timezone
-import torch
-import torch.nn.functional as F
+
+from tamil_news.backfill import in_shard, parse_shard, pipeline, run_shards
+from tamil_news.cache import bump_data_version
+from tamil_news.inference_cache import cache_stats, get_cached_model
+from tamil_news.model_registry import BACKEND, TITLE_SENTIMENT_MODEL, set_inference_threads
+from tamil_news.models import BackfillCheckpoint, NewsDetails, SentimentResults
+
+# nlptown's five star ratings folded into the three labels used everywhere else
+LABEL_MAP = {
+    0: "negative",
+    1: "negative",
+    2: "neutral",
+    3: "positive",
+    4: "positive",
+}
 
 
 class Command(BaseCommand):
     help = "Perform sentiment analysis on existing NewsDetails and store in SentimentResults"
 
-    def handle(self, *args, **kwargs):
-        self.stdout.write(self.style.NOTICE("🔍 Loading sentiment model..."))
-        tokenizer = AutoTokenizer.from_pretrained("nlptown/bert-base-multilingual-uncased-sentiment")
-        model = AutoModelForSequenceClassification.from_pretrained("nlptown/bert-base-multilingual-uncased-sentiment")
-
-        existing_ids = set(SentimentResults.objects.values_list("news_id", flat=True))
-        news_to_process = NewsDetails.objects.exclude(id__in=existing_ids)
-
-        self.stdout.write(f"📰 {news_to_process.count()} news entries to process")
-
-        label_map = {
-            0: "negative",
-            1: "negative",
-            2: "neutral",
-            3: "positive",
-            4: "positive"
-        }
-
-        for news in news_to_process:
-            try:
-                inputs = tokenizer(news.title, return_tensors="pt", truncation=True, padding=True)
-                with torch.no_grad():
-                    outputs = model(**inputs)
-                    scores = F.softmax(outputs.logits, dim=1)[0]
-                    predicted_class = torch.argmax(scores).item()
-
-                sentiment_label = label_map.get(predicted_class, "neutral")
-                sentiment_score = round(scores[predicted_class].item(), 3)
-
-                SentimentResults.objects.create(
-                    news=news,
-                    sentiment_label=sentiment_label,
-                    sentiment_score=sentiment_score,
-                    website_name=news.website_name,
-                    category=news.category,
-                    processed_at=timezone.now()
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help="Articles read, scored and written per transaction")
+        parser.add_argument('--batch-size', type=int,
+                            default=getattr(settings, 'SENTIMENT_BATCH_SIZE', 16),
+                            help="Titles per forward pass")
+        parser.add_argument('--limit', type=int, default=None, help="Stop after this many articles (per worker)")
+        parser.add_argument('--restart', action='store_true',
+                            help="Ignore the checkpoint and scan from the first article")
+        parser.add_argument('--workers', type=int, default=1,
+                            help="Forked processes, each taking one shard of the articles")
+        parser.add_argument('--shard', default=None,
+                            help="INDEX/COUNT: only score articles whose id %% COUNT == INDEX")
+        parser.add_argument('--threads', type=int, default=None,
+                            help="Inference threads per process (default: cores divided by --workers)")
+
+    def handle(self, *args, **options):
+        try:
+            shard = parse_shard(options['shard']) if options['shard'] else None
+        except ValueError as e:
+            raise CommandError(str(e))
+        workers = options['workers']
+        if workers > 1 and shard is not None:
+            raise CommandError("Use either --workers or --shard, not both")
+        threads = options['threads'] or max(1, (os.cpu_count() or 1) // workers)
+
+        if workers == 1:
+            if options['threads'] or shard is not None:
+                set_inference_threads(threads)
+            self.stdout.write(self.style.NOTICE("🔍 Loading sentiment model..."))
+            self.run(get_cached_model(TITLE_SENTIMENT_MODEL), shard, options)
+            return
+
+        # Load the weights once here and let the children share them copy-on-write. One thread
+        # while loading: torch's OpenMP pool must not be running when the process forks.
+        set_inference_threads(1)
+        if BACKEND == 'torch':
+            self.stdout.write(self.style.NOTICE("🔍 Loading sentiment model..."))
+            get_cached_model(TITLE_SENTIMENT_MODEL)
+        # ONNX Runtime sessions don't survive a fork; each worker opens its own
+
+        def work(shard):
+            set_inference_threads(threads)
+            self.run(get_cached_model(TITLE_SENTIMENT_MODEL), shard, options)
+
+        self.stdout.write(self.style.NOTICE(f"🚀 Starting {workers} workers with {threads} threads each"))
+        started = time.perf_counter()
+        exit_codes = run_shards(workers, work)
+        if any(exit_codes):
+            raise CommandError(f"Workers exited with {exit_codes}; rerun to resume from their checkpoints")
+        self.stdout.write(self.style.SUCCESS(f"✅ All {workers} workers finished in {time.perf_counter() - started:.1f}s"))
+
+    def run(self, model, shard, options):
+        name = f"bulk_sentiment_analysis:{TITLE_SENTIMENT_MODEL}"
+        label = ""
+        if shard is not None:
+            name += f":{shard[0]}/{shard[1]}"
+            label = f"[{shard[0]}/{shard[1]}] "
+        checkpoint, _ = BackfillCheckpoint.objects.get_or_create(name=name)
+        if options['restart']:
+            checkpoint.last_news_id = checkpoint.processed = 0
+            checkpoint.save()
+        elif checkpoint.last_news_id:
+            self.stdout.write(f"{label}⏩ Resuming after news {checkpoint.last_news_id} ({checkpoint.processed} done before)")
+
+        # Anti-join instead of a list of scored ids: memory stays flat however many there are
+        pending = in_shard(
+            NewsDetails.objects.filter(~Exists(SentimentResults.objects.filter(news=OuterRef('pk')))),
+            shard,
+        ).order_by('id')
+        self.stdout.write(f"{label}📰 {pending.filter(id__gt=checkpoint.last_news_id).count()} news entries to process")
+
+        def chunks():
+            # Keyset pages on the primary key: each chunk is one short indexed query
+            last_id, remaining = checkpoint.last_news_id, options['limit']
+            while remaining is None or remaining > 0:
+                size = options['chunk_size'] if remaining is None else min(options['chunk_size'], remaining)
+                rows = list(
+                    pending.filter(id__gt=last_id).values_list('id', 'title', 'website_name', 'category')[:size]
                 )
+                if not rows:
+                    return
+                yield rows
+                last_id = rows[-1][0]
+                if remaining is not None:
+                    remaining -= len(rows)
+
+        started = time.perf_counter()
+        totals = {'processed': 0, 'failed': 0, 'first_failed': None}
+
+        def write(scored):
+            rows, results, failed_ids = scored
+            if failed_ids and totals['first_failed'] is None:
+                totals['first_failed'] = min(failed_ids)
+            with transaction.atomic():
+                SentimentResults.objects.bulk_create(results, batch_size=1000)
+                # The checkpoint stops short of the first title that failed, so a resumed run
+                # retries it; the anti-join keeps the ones scored since from being read again
+                if totals['first_failed'] is None:
+                    checkpoint.last_news_id = rows[-1][0]
+                else:
+                    checkpoint.last_news_id = totals['first_failed'] - 1
+                checkpoint.processed += len(results)
+                checkpoint.save()
+                if results:
+                    # bulk_create skips the signals that would otherwise bump the 'sentiment' version
+                    bump_data_version('sentiment')
+
+            totals['processed'] += len(results)
+            totals['failed'] += len(failed_ids)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{label}✅ {totals['processed']} processed, {totals['failed']} failed, "
+                f"up to news {checkpoint.last_news_id} ({totals['processed'] / elapsed:.1f} items/s)"
+            )
+
+        # Reading the next chunk and writing the last one overlap with inference on this one
+        pipeline(chunks(), lambda rows: (rows, *self.score(model, rows, options['batch_size'])), write)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{label}🚀 {totals['processed']} articles in {elapsed:.1f}s "
+            f"({totals['processed'] / elapsed if elapsed else 0:.1f} items/s), {totals['failed']} failed"
+        ))
+        for model_id, stats in cache_stats().items():
+            self.stdout.write(f"{label}📊 {model_id}: {stats}")
 
-                self.stdout.write(self.style.SUCCESS(f"✅ Processed: {news.title[:60]}... → {sentiment_label}"))
+    def score(self, model, rows, batch_size):
+        """SentimentResults for the rows and the ids of the articles whose titles could not be scored."""
+        try:
+            scores = model.predict_proba([title for _, title, _, _ in rows], batch_size=batch_size)
+        except Exception as e:
+            if len(rows) == 1:
+                self.stdout.write(self.style.ERROR(f"❌ Error processing: {rows[0][1][:60]}... → {e}"))
+                return [], [rows[0][0]]
+            # Halve the chunk until the title that breaks it is isolated
+            middle = len(rows) // 2
+            first, first_failed = self.score(model, rows[:middle], batch_size)
+            second, second_failed = self.score(model, rows[middle:], batch_size)
+            return first + second, first_failed + second_failed
 
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f"❌ Error processing: {news.title[:60]}... → {e}"))
+        now = timezone.now()
+        results = []
+        for (news_id, title, website_name, category), row in zip(rows, scores):
+            predicted_class = int(row.argmax())
+            results.append(SentimentResults(
+                news_id=news_id,
+                sentiment_label=LABEL_MAP.get(predicted_class, "neutral"),
+                sentiment_score=round(float(row[predicted_class]), 3),
+                website_name=website_name,
+                category=category,
+                processed_at=now,
+            ))
+        return results, []
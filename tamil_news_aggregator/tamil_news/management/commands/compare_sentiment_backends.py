@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand
+import numpy as np
+
+from tamil_news.model_registry import SENTIMENT_MODEL, get_model
+from tamil_news.models import NewsDetails
+from tamil_news.chunking import pack_windows, sentence_pieces
+from tamil_news.sentiment import labels
+
+SAMPLE_TEXTS = [
+    "தமிழ்நாடு அரசு புதிய திட்டத்தை அறிவித்தது",
+    "மழை காரணமாக பல மாவட்டங்களில் பள்ளிகளுக்கு விடுமுறை",
+    "முதல்வர் ஸ்டாலின் இன்று செய்தியாளர்களை சந்தித்தார்",
+    "விபத்தில் மூன்று பேர் உயிரிழந்தனர்",
+]
+
+
+class Command(BaseCommand):
+    help = "Check ONNX Runtime score drift against torch and compare their latency and throughput"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default=SENTIMENT_MODEL)
+        parser.add_argument('--samples', type=int, default=256, help="Description chunks to score")
+        parser.add_argument('--batch-size', type=int, default=16)
+        parser.add_argument('--repeat', type=int, default=3, help="Timed passes per backend")
+
+    def handle(self, *args, **options):
+        texts = self.load_texts(options['samples'])
+        self.stdout.write(self.style.NOTICE(f"🔍 Comparing backends on {len(texts)} texts"))
+
+        scores = {}
+        for backend in ('torch', 'onnx'):
+            model = get_model(options['model'], backend=backend)
+            model.predict_proba(texts[:options['batch_size']], batch_size=options['batch_size'])  # warm-up
+
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                scores[backend] = model.predict_proba(texts, batch_size=options['batch_size'])
+                timings.append(time.perf_counter() - started)
+
+            best = min(timings)
+            batches = -(-len(texts) // options['batch_size'])
+            self.stdout.write(
+                f"  {backend:5}: {len(texts) / best:8.1f} texts/s, "
+                f"{best / batches * 1000:7.1f} ms/batch (best of {options['repeat']})"
+            )
+
+        diff = np.abs(scores['torch'] - scores['onnx'])
+        agreement = float(np.mean(scores['torch'].argmax(axis=1) == scores['onnx'].argmax(axis=1)))
+
+        self.stdout.write("\n📊 Score drift (onnx vs torch)")
+        for i, label in enumerate(labels if diff.shape[1] == len(labels) else range(diff.shape[1])):
+            self.stdout.write(f"  {label}: mean {diff[:, i].mean():.4f}, max {diff[:, i].max():.4f}")
+        self.stdout.write(f"  label agreement: {agreement:.2%}")
+
+    def load_texts(self, limit):
+        # Full-length sentence windows over each description, as score_keywords feeds the model
+        tokenizer = get_model(SENTIMENT_MODEL).tokenizer
+        texts = []
+        descriptions = (
+            NewsDetails.objects.exclude(description__isnull=True).exclude(description='')
+            .order_by('-id').values_list('description', flat=True)
+        )
+        for description in descriptions.iterator():
+            pieces = sentence_pieces(description, tokenizer)
+            texts.extend(description[start:end] for start, end in pack_windows(pieces, range(len(pieces))))
+            if len(texts) >= limit:
+                break
+        return texts[:limit] or SAMPLE_TEXTS
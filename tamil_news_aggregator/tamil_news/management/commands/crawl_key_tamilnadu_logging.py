@@ -1,9 +1,11 @@
+import asyncio
 import logging
 import json
 import sys
 from datetime import datetime
 from django.core.management.base import BaseCommand
-from django.core.management import call_command
+from django.core.management import load_command_class
+from tamil_news.fetcher import SharedBrowser
 
 LOG_FILE = "keyword_tamilnadu_crawler_log.txt"
 logging.basicConfig(
@@ -12,8 +14,20 @@ logging.basicConfig(
     format="%(asctime)s [%(levelname)s] %(message)s"
 )
 
+CRAWLERS = [
+    "key_hindu_tamil_tamilnadu",
+    "key_bbc_tamil_tamilnadu",
+    "key_dinathanthi_tamilnadu",
+    "key_puthiyathalaimurai_tamilnadu",
+    "key_news18_tamil_tamilnadu",
+]
+
+
 class Command(BaseCommand):
-    help = "Run all Tamilnadu keyword-based news crawlers for a list of keywords via JSON argument"
+    help = (
+        "Run all Tamilnadu news crawlers once for a list of keywords via JSON argument; "
+        "every article is matched against all keywords in a single pass"
+    )
 
     def add_arguments(self, parser):
         parser.add_argument('keywords_json', type=str, help="JSON list of Tamil keywords")
@@ -25,33 +39,35 @@ class Command(BaseCommand):
             self.stderr.write(self.style.ERROR(f"Invalid JSON input: {e}"))
             return
 
+        keywords = [keyword for keyword in dict.fromkeys(keywords) if keyword]
+        if not keywords:
+            self.stderr.write(self.style.ERROR("No keywords given"))
+            return
+
         logging.info("🚀 Starting ALL Tamilnadu keyword crawlers")
+        logging.info(f"\n📌 Processing keywords: {', '.join(keywords)}")
         start_time = datetime.now()
 
         try:
-            for keyword in keywords:
-                logging.info(f"\n📌 Processing keyword: {keyword}")
-                self.run_keyword_crawlers(keyword)
+            asyncio.run(self.run_crawlers(keywords))
         except Exception as e:
             logging.error(f"❌ Unexpected error during combined keyword crawl: {str(e)}")
 
         duration = (datetime.now() - start_time).seconds
         logging.info(f"\n✅ Completed all keyword crawlers in {duration} seconds")
 
-    def run_keyword_crawlers(self, keyword):
-        scripts = [
-            "key_hindu_tamil_tamilnadu",
-            "key_bbc_tamil_tamilnadu",
-            "key_dinathanthi_tamilnadu",
-            "key_puthiyathalaimurai_tamilnadu",
-            "key_news18_tamil_tamilnadu",
-        ]
-
-        for script in scripts:
-            logging.info(f"▶ Running: {script} for keyword '{keyword}'")
-            try:
-                call_command(script, keyword=keyword)
-            except Exception as e:
-                logging.error(f"❌ Error in {script}: {str(e)}")
-                if any(word in str(e).lower() for word in ['403', 'denied', 'captcha', 'blocked']):
-                    logging.warning(f"⚠️ Possible IP block detected in {script}")
+    async def run_crawlers(self, keywords):
+        # ✅ All sites crawl concurrently in one event loop and share one Chromium
+        async with SharedBrowser() as browser:
+            await asyncio.gather(*(self.run_crawler(script, keywords, browser) for script in CRAWLERS))
+
+    async def run_crawler(self, script, keywords, browser):
+        logging.info(f"▶ Running: {script} for {len(keywords)} keywords")
+        try:
+            command = load_command_class("tamil_news", script)
+            await command.crawl(keywords=keywords, browser=browser)
+            logging.info(f"✅ Finished: {script}")
+        except Exception as e:
+            logging.error(f"❌ Error in {script}: {str(e)}")
+            if any(word in str(e).lower() for word in ['403', 'denied', 'captcha', 'blocked']):
+                logging.warning(f"⚠️ Possible IP block detected in {script}")
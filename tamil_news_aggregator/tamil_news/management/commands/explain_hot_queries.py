@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from tamil_news.models import Keyword, NewsDetails
+from tamil_news.query_plans import disable_seqscan, explain, hot_queries, unindexed_scans
+
+
+class Command(BaseCommand):
+    help = "Print PostgreSQL query plans for the hot read paths and flag full scans of large tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true', help="Run the queries (EXPLAIN ANALYZE) to show real timings")
+        parser.add_argument('--no-seqscan', action='store_true',
+                            help="Price sequential scans out, to check an index can serve each query at all")
+        parser.add_argument('--keyword', type=str, help="Keyword to use as the sample parameter (default: first keyword)")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Query plans are only meaningful on PostgreSQL")
+
+        keyword = Keyword.objects.filter(name=options['keyword']) if options['keyword'] else Keyword.objects.order_by('id')
+        keyword = keyword.first()
+        if keyword is None:
+            raise CommandError("No keyword to use as a sample parameter")
+        sample = NewsDetails.objects.exclude(category__isnull=True).order_by('-id').first()
+
+        flagged = 0
+        with transaction.atomic():
+            if options['no_seqscan']:
+                disable_seqscan()
+            queries = hot_queries(
+                keyword.id, keyword.name,
+                website_id=sample.website_id if sample else None,
+                category=sample.category if sample else 'Tamilnadu',
+            )
+            for name, queryset in queries.items():
+                plan = explain(queryset, analyze=options['analyze'])
+                scans = unindexed_scans(plan)
+                flagged += bool(scans)
+                status = f"⚠️ Full scan of {', '.join(scans)}" if scans else "✅"
+                self.stdout.write(f"\n🔍 {name}: {status}")
+                self.stdout.write(queryset.explain(analyze=options['analyze']))
+
+        if flagged:
+            self.stdout.write(self.style.WARNING(f"\n⚠️ {flagged} hot queries scan a large table in full"))
+        else:
+            self.stdout.write(self.style.SUCCESS("\n✅ Every hot query is served by an index"))
@@ -1,41 +1,64 @@
 from django.core.management.base import BaseCommand
-from playwright.async_api import async_playwright
-from tamil_news.models import Websites, NewsDetails, Keyword
+from tamil_news.models import Websites, NewsDetails
+from tamil_news.keyword_matcher import KeywordMatcher, get_keyword_matcher
+from tamil_news.crawler_utils import CRAWLER_CONCURRENCY
+from tamil_news.fetcher import Fetcher, attr_of, select_one, text_of
+from tamil_news.persistence import ArticleBuffer
+from tamil_news.incremental import STOP_AFTER_KNOWN_PAGES, IncrementalCrawl
 import asyncio
+from functools import partial
 from asgiref.sync import sync_to_async
 from datetime import datetime
 from django.utils import timezone
 
 
+async def fetch_description(fetcher, url):
+    document = await fetcher.get_document(url, expect="div.bbc-19j92fr p.bbc-iy8ud2")
+    description_parts = [text_of(el) for el in document.css("div.bbc-19j92fr p.bbc-iy8ud2")]
+    return "\n".join([text for text in description_parts if text]).strip()
+
+
 class Command(BaseCommand):
     help = "Crawl BBC Tamil Tamilnadu News and match with DB keywords"
 
-    def handle(self, *args, **kwargs):
-        asyncio.run(self.crawl())
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=CRAWLER_CONCURRENCY,
+                            help="Article pages fetched in parallel")
+        parser.add_argument('--full', action='store_true',
+                            help="Backfill: walk every page instead of stopping at already crawled articles")
+        parser.add_argument('--stop-after', type=int, default=STOP_AFTER_KNOWN_PAGES,
+                            help="Stop after this many consecutive pages with no new articles")
 
-    async def crawl(self):
+    def handle(self, *args, **options):
+        asyncio.run(self.crawl(options['concurrency'], full=options['full'], stop_after=options['stop_after']))
+
+    async def crawl(self, concurrency=CRAWLER_CONCURRENCY, full=False, stop_after=STOP_AFTER_KNOWN_PAGES,
+                    keywords=None, browser=None):
         website_name = "BBC Tamil"
         category = "Tamilnadu"
 
         website, _ = await sync_to_async(Websites.objects.get_or_create)(name=website_name)
-        keywords = await sync_to_async(list)(Keyword.objects.values_list("name", flat=True))
+        # ✅ Match the requested keywords, or every keyword in the DB
+        matcher = KeywordMatcher(keywords) if keywords else await sync_to_async(get_keyword_matcher)()
+        incremental = await sync_to_async(IncrementalCrawl.load)(
+            website, keywords=[name for names in matcher.names.values() for name in names],
+            full=full, stop_after=stop_after
+        )
 
         max_pages = 1
         page_count = 0
         total_articles = 0
         crawled_articles = 0
 
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-
+        async with Fetcher(concurrency, first_party_domains=["bbc.com", "bbci.co.uk"], browser=browser) as fetcher, \
+                ArticleBuffer() as buffer:
             for page_num in range(1, max_pages + 1):
                 page_count += 1
                 url = f"https://www.bbc.com/tamil/topics/c6vzyv6g7yrt?page={page_num}"
                 print(f"\n🌍 Scraping Page {page_count}: {url}")
-                await page.goto(url, timeout=60000)
+                document = await fetcher.get_document(url, expect="li.bbc-t44f9r")
 
-                articles = await page.query_selector_all("li.bbc-t44f9r")
+                articles = document.css("li.bbc-t44f9r")
                 num_articles = len(articles)
                 total_articles += num_articles
 
@@ -43,21 +66,20 @@ class Command(BaseCommand):
                 if num_articles == 0:
                     break
 
+                cards = []
+                entries = []
                 for article in articles:
                     try:
-                        title_el = await article.query_selector("h2")
-                        title = (await title_el.inner_text()).strip() if title_el else "N/A"
+                        title_el = select_one(article, "h2")
+                        title = text_of(title_el) or "N/A"
 
-                        link_el = await title_el.query_selector("a") if title_el else None
-                        url = await link_el.get_attribute("href") if link_el else ""
+                        link_el = select_one(title_el, "a") if title_el is not None else None
+                        url = attr_of(link_el, "href") or ""
                         if url and not url.startswith("http"):
                             url = "https://www.bbc.com" + url
 
-                        image_el = await article.query_selector("img")
-                        image_url = await image_el.get_attribute("src") if image_el else None
-
-                        time_el = await article.query_selector("time")
-                        time_text = await time_el.get_attribute("datetime") if time_el else None
+                        image_url = attr_of(select_one(article, "img"), "src")
+                        time_text = attr_of(select_one(article, "time"), "datetime")
 
                         published_time = None
                         if time_text:
@@ -67,52 +89,65 @@ class Command(BaseCommand):
                             except Exception:
                                 published_time = None
 
-                        # ✅ Open article and extract full description
-                        article_page = await browser.new_page()
-                        await article_page.goto(url, timeout=60000)
+                        entries.append((url, published_time))
+                        if incremental.should_skip(url, published_time):
+                            continue  # ✅ Already checked on an earlier run, no need to open it again
+
+                        cards.append((title, url, image_url, published_time))
+                    except Exception as e:
+                        print(f"❌ Error: {e}")
 
-                        desc_elements = await article_page.query_selector_all("div.bbc-19j92fr p.bbc-iy8ud2")
-                        description_parts = [await el.inner_text() for el in desc_elements if await el.inner_text()]
-                        description = "\n".join([text.strip() for text in description_parts]).strip()
-                        await article_page.close()
+                # ✅ Open articles concurrently and extract full descriptions
+                descriptions = await fetcher.map(partial(fetch_description, fetcher), [card[1] for card in cards])
 
+                failed = []
+                for (title, url, image_url, published_time), description in zip(cards, descriptions):
+                    try:
+                        if description is None:
+                            failed.append((url, published_time))  # didn't load
+                            continue
                         if not description:
                             continue
 
                         # ✅ Match keywords
-                        matched_keywords = [kw for kw in keywords if kw in title or kw in description]
+                        matched_keywords = matcher.matches(title, description)
                         if not matched_keywords:
                             continue
 
-                        news_obj, created = await sync_to_async(NewsDetails.objects.get_or_create)(
-                            website=website,
-                            title=title,
-                            article_url=url,
-                            defaults={
-                                'website_name': website.name,
-                                'image_url': image_url,
-                                'category': category,
-                                'published_time': published_time,
-                                'author': None,
-                                'description': description,
-                            }
+                        await buffer.add(
+                            NewsDetails(
+                                website=website,
+                                title=title,
+                                article_url=url,
+                                website_name=website.name,
+                                image_url=image_url,
+                                category=category,
+                                published_time=published_time,
+                                author=None,
+                                description=description,
+                            ),
+                            matched_keywords,
                         )
 
-                        for kw in matched_keywords:
-                            keyword_obj = await sync_to_async(Keyword.objects.get)(name=kw)
-                            await sync_to_async(news_obj.keywords.add)(keyword_obj)
-
                         crawled_articles += 1
                         print(f"✅ {title}")
 
                     except Exception as e:
+                        failed.append((url, published_time))
                         print(f"❌ Error: {e}")
 
-            await browser.close()
+                # Articles that failed to load or save are checked again on the next run
+                if incremental.page_done(entries, failed):
+                    print(f"✅ No new articles on the last {stop_after} pages. Stopping.")
+                    break
+
+        incremental.fail((article.article_url, article.published_time) for article in buffer.failed)
+        await sync_to_async(incremental.save)()
 
         print(
             f"\n✅ Crawling Finished.\n"
             f"Total Pages Crawled: {page_count}\n"
             f"Total Articles Found: {total_articles}\n"
-            f"✅ Total Articles Crawled (keyword matched): {crawled_articles}"
+            f"✅ Total Articles Crawled (keyword matched): {crawled_articles}\n"
+            f"Pages fetched over HTTP / rendered: {fetcher.http_fetches} / {fetcher.browser_fetches}"
         )
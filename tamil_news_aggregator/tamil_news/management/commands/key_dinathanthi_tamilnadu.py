@@ -1,6 +1,9 @@
 from django.core.management.base import BaseCommand
-from playwright.async_api import async_playwright
 from tamil_news.models import Websites, NewsDetails
+from tamil_news.fetcher import Fetcher, attr_of, select_one, text_of
+from tamil_news.keyword_matcher import KeywordMatcher
+from tamil_news.persistence import ArticleBuffer
+from tamil_news.incremental import STOP_AFTER_KNOWN_PAGES, IncrementalCrawl
 import asyncio
 from asgiref.sync import sync_to_async
 from datetime import datetime
@@ -12,10 +15,15 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument('--keyword', type=str, help='Filter articles by keyword (Tamil or English)')
+        parser.add_argument('--full', action='store_true',
+                            help='Backfill: walk every page instead of stopping at already crawled articles')
+        parser.add_argument('--stop-after', type=int, default=STOP_AFTER_KNOWN_PAGES,
+                            help='Stop after this many consecutive pages with no new articles')
 
     def handle(self, *args, **options):
         keyword = options.get("keyword")
-        asyncio.run(self.crawl(keyword))
+        keywords = [keyword] if keyword else None
+        asyncio.run(self.crawl(keywords, full=options['full'], stop_after=options['stop_after']))
 
     def parse_date(self, date_str):
         if not date_str:
@@ -26,27 +34,29 @@ class Command(BaseCommand):
         except Exception:
             return None
 
-    async def crawl(self, keyword=None):
+    async def crawl(self, keywords=None, full=False, stop_after=STOP_AFTER_KNOWN_PAGES, browser=None):
         website_name = "DinaThanthi"
         website, _ = await sync_to_async(Websites.objects.get_or_create)(name=website_name)
         category = "Tamilnadu"
+        incremental = await sync_to_async(IncrementalCrawl.load)(
+            website, keywords=keywords, full=full, stop_after=stop_after
+        )
+        matcher = KeywordMatcher(keywords) if keywords else None
 
         max_pages = 80
         page_count = 0
         total_articles = 0
         matched_articles = 0
 
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-
+        async with Fetcher(first_party_domains=["dailythanthi.com"], browser=browser) as fetcher, \
+                ArticleBuffer() as buffer:
             for page_num in range(1, max_pages + 1):
                 page_count += 1
                 url = f"https://www.dailythanthi.com/news/tamilnadu?page={page_num}"
                 print(f"\n🌏 Scraping Page {page_count}: {url}")
-                await page.goto(url, timeout=60000)
+                document = await fetcher.get_document(url, expect="div.ListingNewsWithMEDImage")
 
-                news_blocks = await page.query_selector_all("div.ListingNewsWithMEDImage")
+                news_blocks = document.css("div.ListingNewsWithMEDImage")
                 num_articles = len(news_blocks)
                 total_articles += num_articles
 
@@ -56,55 +66,69 @@ class Command(BaseCommand):
                     print("✅ No more articles found. Stopping.")
                     break
 
+                entries = []
+                failed = []
                 for block in news_blocks:
+                    entry = None
                     try:
-                        headline_el = await block.query_selector("h3")
-                        title = (await headline_el.inner_text()).strip() if headline_el else "N/A"
-
-                        if keyword and keyword not in title:
-                            continue  # ✅ Skip non-matching articles
+                        title = text_of(select_one(block, "h3")) or "N/A"
 
-                        link_el = await block.query_selector("a[href]")
-                        url = await link_el.get_attribute("href") if link_el else None
+                        url = attr_of(select_one(block, "a[href]"), "href")
                         if url and not url.startswith("http"):
                             url = "https://www.dailythanthi.com" + url
 
-                        img_el = await block.query_selector("img")
-                        image_url = None
-                        if img_el:
-                            image_url = await img_el.get_attribute("data-src") or await img_el.get_attribute("src")
+                        date_str = attr_of(select_one(block, "span.convert-to-localtime"), "data-datestring")
+                        published_time = self.parse_date(date_str)
+                        entry = (url, published_time)
+                        entries.append(entry)
 
-                        description_el = await block.query_selector("div")
-                        description = (await description_el.inner_text()).strip() if description_el else None
+                        if incremental.should_skip(url, published_time):
+                            continue  # ✅ Already crawled on an earlier run
 
-                        datetime_el = await block.query_selector("span.convert-to-localtime")
-                        date_str = await datetime_el.get_attribute("data-datestring") if datetime_el else None
-                        published_time = self.parse_date(date_str)
+                        matched_keywords = matcher.matches(title) if matcher is not None else []
+                        if matcher is not None and not matched_keywords:
+                            continue  # ✅ Skip non-matching articles
 
-                        await sync_to_async(NewsDetails.objects.get_or_create)(
-                            website=website,
-                            title=title,
-                            article_url=url,
-                            defaults={
-                                'website_name': website.name,
-                                'image_url': image_url,
-                                'category': category,
-                                'published_time': published_time,
-                                'author': None,
-                                'description': description,
-                            }
+                        img_el = select_one(block, "img")
+                        image_url = None
+                        if img_el is not None:
+                            image_url = attr_of(img_el, "data-src") or attr_of(img_el, "src")
+
+                        description = text_of(select_one(block, "div"))
+
+                        await buffer.add(
+                            NewsDetails(
+                                website=website,
+                                title=title,
+                                article_url=url,
+                                website_name=website.name,
+                                image_url=image_url,
+                                category=category,
+                                published_time=published_time,
+                                author=None,
+                                description=description,
+                            ),
+                            matched_keywords,
                         )
                         matched_articles += 1
                         print(f"✅ {title}")
 
                     except Exception as e:
+                        if entry is not None:
+                            failed.append(entry)  # checked again on the next run
                         print(f"❌ Error parsing article: {e}")
 
-            await browser.close()
+                if incremental.page_done(entries, failed):
+                    print(f"✅ No new articles on the last {stop_after} pages. Stopping.")
+                    break
+
+        incremental.fail((article.article_url, article.published_time) for article in buffer.failed)
+        await sync_to_async(incremental.save)()
 
         print(
             f"\n✅ Crawling Finished.\n"
             f"Total Pages Crawled: {page_count}\n"
             f"Total Articles Found: {total_articles}\n"
-            f"✅ Total Articles Crawled (Matching Keyword): {matched_articles}"
+            f"✅ Total Articles Crawled (Matching Keyword): {matched_articles}\n"
+            f"Pages fetched over HTTP / rendered: {fetcher.http_fetches} / {fetcher.browser_fetches}"
         )
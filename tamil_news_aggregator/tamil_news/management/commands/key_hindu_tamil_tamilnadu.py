@@ -1,7 +1,12 @@
 from django.core.management.base import BaseCommand
-from playwright.async_api import async_playwright
-from tamil_news.models import Websites, NewsDetails, Keyword
+from tamil_news.models import Websites, NewsDetails
+from tamil_news.keyword_matcher import KeywordMatcher, get_keyword_matcher
+from tamil_news.crawler_utils import CRAWLER_CONCURRENCY
+from tamil_news.fetcher import Fetcher, attr_of, select_one, text_of
+from tamil_news.persistence import ArticleBuffer
+from tamil_news.incremental import STOP_AFTER_KNOWN_PAGES, IncrementalCrawl
 import asyncio
+from functools import partial
 from asgiref.sync import sync_to_async
 from datetime import datetime
 from django.utils import timezone
@@ -32,37 +37,55 @@ def parse_date(text):
             return None
 
 
+async def fetch_description(fetcher, url):
+    document = await fetcher.get_document(url, expect="div#pgContentPrint p")
+    description_parts = [text_of(el) for el in document.css("div#pgContentPrint p")]
+    return "\n".join([text for text in description_parts if text]).strip()
+
+
 class Command(BaseCommand):
     help = "Crawl Hindu Tamil Tamilnadu articles and match with keywords from DB"
 
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=CRAWLER_CONCURRENCY,
+                            help="Article pages fetched in parallel")
+        parser.add_argument('--full', action='store_true',
+                            help="Backfill: walk every page instead of stopping at already crawled articles")
+        parser.add_argument('--stop-after', type=int, default=STOP_AFTER_KNOWN_PAGES,
+                            help="Stop after this many consecutive pages with no new articles")
+
     def handle(self, *args, **options):
-        asyncio.run(self.crawl())
+        asyncio.run(self.crawl(options['concurrency'], full=options['full'], stop_after=options['stop_after']))
 
-    async def crawl(self):
+    async def crawl(self, concurrency=CRAWLER_CONCURRENCY, full=False, stop_after=STOP_AFTER_KNOWN_PAGES,
+                    keywords=None, browser=None):
         website_name = "Hindu Tamil"
         category = "Tamilnadu"
 
         website, _ = await sync_to_async(Websites.objects.get_or_create)(name=website_name)
-        keywords = await sync_to_async(list)(Keyword.objects.values_list("name", flat=True))
+        # ✅ Match the requested keywords, or every keyword in the DB
+        matcher = KeywordMatcher(keywords) if keywords else await sync_to_async(get_keyword_matcher)()
+        incremental = await sync_to_async(IncrementalCrawl.load)(
+            website, keywords=[name for names in matcher.names.values() for name in names],
+            full=full, stop_after=stop_after
+        )
 
         max_pages = 3
         page_count = 0
         total_articles = 0
         crawled_articles = 0
 
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-
+        async with Fetcher(concurrency, first_party_domains=["hindutamil.in"], browser=browser) as fetcher, \
+                ArticleBuffer() as buffer:
             for page_num in range(1, max_pages + 1):
                 page_count += 1
                 url = "https://www.hindutamil.in/news/tamilnadu" if page_num == 1 \
                     else f"https://www.hindutamil.in/news/tamilnadu/{page_num}"
 
                 print(f"\n📰 Scraping Page {page_count}: {url}")
-                await page.goto(url, timeout=60000)
+                document = await fetcher.get_document(url, expect="div.card-outer._shareContainer")
 
-                articles = await page.query_selector_all("div.card-outer._shareContainer")
+                articles = document.css("div.card-outer._shareContainer")
                 num_articles = len(articles)
                 total_articles += num_articles
 
@@ -71,74 +94,81 @@ class Command(BaseCommand):
                 if num_articles == 0:
                     break
 
+                cards = []
+                entries = []
                 for article in articles:
                     try:
-                        title_el = await article.query_selector("p.card-text")
-                        title = (await title_el.inner_text()).strip() if title_el else "N/A"
+                        title = text_of(select_one(article, "p.card-text")) or "N/A"
 
-                        url_el = await article.query_selector("a[href]")
-                        url = await url_el.get_attribute("href") if url_el else ""
+                        url = attr_of(select_one(article, "a[href]"), "href") or ""
                         if url and not url.startswith("http"):
                             url = "https://www.hindutamil.in" + url
 
-                        image_el = await article.query_selector("img")
-                        image_url = await image_el.get_attribute("src") if image_el else None
-
-                        author_tag = await article.query_selector(".card-bottom span")
-                        author = (await author_tag.inner_text()).strip() if author_tag else None
-
-                        date_tag = await article.query_selector(".card-bottom .date")
-                        date_text = (await date_tag.inner_text()).strip() if date_tag else None
+                        image_url = attr_of(select_one(article, "img"), "src")
+                        author = text_of(select_one(article, ".card-bottom span"))
+                        date_text = text_of(select_one(article, ".card-bottom .date"))
 
                         published_time = parse_date(date_text) if date_text else None
 
-                        # ✅ Open article URL to extract full description
-                        article_page = await browser.new_page()
-                        await article_page.goto(url, timeout=60000)
+                        entries.append((url, published_time))
+                        if incremental.should_skip(url, published_time):
+                            continue  # ✅ Already checked on an earlier run, no need to open it again
 
-                        desc_elements = await article_page.query_selector_all("div#pgContentPrint p")
-                        description_parts = [await el.inner_text() for el in desc_elements if await el.inner_text()]
-                        description = "\n".join([text.strip() for text in description_parts]).strip()
-                        await article_page.close()
+                        cards.append((title, url, image_url, author, published_time))
+                    except Exception as e:
+                        print(f"❌ Error: {e}")
+
+                # ✅ Open article URLs concurrently to extract full descriptions
+                descriptions = await fetcher.map(partial(fetch_description, fetcher), [card[1] for card in cards])
 
+                failed = []
+                for (title, url, image_url, author, published_time), description in zip(cards, descriptions):
+                    try:
+                        if description is None:
+                            failed.append((url, published_time))  # didn't load
+                            continue
                         if not description:
                             continue
 
                         # ✅ Match keywords
-                        matched_keywords = [kw for kw in keywords if kw in title or kw in description]
+                        matched_keywords = matcher.matches(title, description)
                         if not matched_keywords:
                             continue
 
-                        news_obj, created = await sync_to_async(NewsDetails.objects.get_or_create)(
-                            website=website,
-                            title=title,
-                            article_url=url,
-                            defaults={
-                                'website_name': website.name,
-                                'image_url': image_url,
-                                'category': category,
-                                'published_time': published_time,
-                                'author': author,
-                                'description': description,
-                            }
+                        await buffer.add(
+                            NewsDetails(
+                                website=website,
+                                title=title,
+                                article_url=url,
+                                website_name=website.name,
+                                image_url=image_url,
+                                category=category,
+                                published_time=published_time,
+                                author=author,
+                                description=description,
+                            ),
+                            matched_keywords,
                         )
 
-                        # ✅ Link matched keywords
-                        for kw in matched_keywords:
-                            keyword_obj = await sync_to_async(Keyword.objects.get)(name=kw)
-                            await sync_to_async(news_obj.keywords.add)(keyword_obj)
-
                         crawled_articles += 1
                         print(f"✅ {title}")
 
                     except Exception as e:
+                        failed.append((url, published_time))
                         print(f"❌ Error: {e}")
 
-            await browser.close()
+                # Articles that failed to load or save are checked again on the next run
+                if incremental.page_done(entries, failed):
+                    print(f"✅ No new articles on the last {stop_after} pages. Stopping.")
+                    break
+
+        incremental.fail((article.article_url, article.published_time) for article in buffer.failed)
+        await sync_to_async(incremental.save)()
 
         print(
             f"\n✅ Crawling Finished.\n"
             f"Total Pages Crawled: {page_count}\n"
             f"Total Articles Found: {total_articles}\n"
-            f"✅ Total Articles Crawled (keyword matched): {crawled_articles}"
+            f"✅ Total Articles Crawled (keyword matched): {crawled_articles}\n"
+            f"Pages fetched over HTTP / rendered: {fetcher.http_fetches} / {fetcher.browser_fetches}"
         )
@@ -1,6 +1,9 @@
 from django.core.management.base import BaseCommand
-from playwright.async_api import async_playwright
 from tamil_news.models import Websites, NewsDetails
+from tamil_news.fetcher import Fetcher, attr_of, select_one, text_of
+from tamil_news.keyword_matcher import KeywordMatcher
+from tamil_news.persistence import ArticleBuffer
+from tamil_news.incremental import STOP_AFTER_KNOWN_PAGES, IncrementalCrawl
 import asyncio
 from asgiref.sync import sync_to_async
 
@@ -10,24 +13,30 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("--keyword", type=str, required=True, help="Keyword to filter Tamil news titles")
+        parser.add_argument("--full", action="store_true",
+                            help="Backfill: walk every page instead of stopping at already crawled articles")
+        parser.add_argument("--stop-after", type=int, default=STOP_AFTER_KNOWN_PAGES,
+                            help="Stop after this many consecutive pages with no new articles")
 
     def handle(self, *args, **options):
         keyword = options["keyword"]
-        asyncio.run(self.crawl(keyword))
+        asyncio.run(self.crawl([keyword], full=options["full"], stop_after=options["stop_after"]))
 
-    async def crawl(self, keyword):
+    async def crawl(self, keywords=None, full=False, stop_after=STOP_AFTER_KNOWN_PAGES, browser=None):
         website_name = "News18 Tamil"
         website, _ = await sync_to_async(Websites.objects.get_or_create)(name=website_name)
         category = "Tamilnadu"
+        incremental = await sync_to_async(IncrementalCrawl.load)(
+            website, keywords=keywords, full=full, stop_after=stop_after
+        )
+        matcher = KeywordMatcher(keywords) if keywords else None
 
         max_pages = 25
         total_articles = 0
         total_matching = 0
 
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-
+        async with Fetcher(first_party_domains=["news18.com"], browser=browser) as fetcher, \
+                ArticleBuffer() as buffer:
             for page_num in range(1, max_pages + 1):
                 if page_num == 1:
                     url = "https://tamil.news18.com/tamil-nadu/"
@@ -35,56 +44,74 @@ class Command(BaseCommand):
                     url = f"https://tamil.news18.com/tamil-nadu/page-{page_num}/"
 
                 print(f"\n🌐 Scraping Page {page_num}: {url}")
-                await page.goto(url, timeout=60000)
+                document = await fetcher.get_document(url, expect="li.jsx-d0e08582aab1ee73")
 
-                news_items = await page.query_selector_all("li.jsx-d0e08582aab1ee73")
+                news_items = document.css("li.jsx-d0e08582aab1ee73")
                 print(f"🔎 Found {len(news_items)} articles on page {page_num}")
 
                 if not news_items:
                     print("✅ No more articles found. Stopping.")
                     break
 
+                entries = []
+                failed = []
                 for item in news_items:
+                    entry = None
                     try:
                         # Title
-                        title_el = await item.query_selector("figcaption")
-                        title = (await title_el.inner_text()).strip() if title_el else None
-
-                        if not title or keyword not in title:
-                            continue
+                        title = text_of(select_one(item, "figcaption"))
 
                         # URL
-                        link_el = await item.query_selector("a[href]")
-                        relative_url = await link_el.get_attribute("href") if link_el else None
+                        relative_url = attr_of(select_one(item, "a[href]"), "href")
                         full_url = f"https://tamil.news18.com{relative_url}" if relative_url else None
+                        entry = (full_url, None)
+                        entries.append(entry)
+
+                        if incremental.should_skip(full_url):
+                            continue
+
+                        if not title:
+                            continue
+
+                        matched_keywords = matcher.matches(title) if matcher is not None else []
+                        if matcher is not None and not matched_keywords:
+                            continue
 
                         # Image
-                        img_el = await item.query_selector("img")
-                        image_url = await img_el.get_attribute("src") if img_el else None
-
-                        await sync_to_async(NewsDetails.objects.get_or_create)(
-                            website=website,
-                            title=title,
-                            article_url=full_url,
-                            defaults={
-                                'website_name': website.name,
-                                'image_url': image_url,
-                                'category': category,
-                                'published_time': None,
-                                'author': None,
-                                'description': None,
-                            }
+                        image_url = attr_of(select_one(item, "img"), "src")
+
+                        await buffer.add(
+                            NewsDetails(
+                                website=website,
+                                title=title,
+                                article_url=full_url,
+                                website_name=website.name,
+                                image_url=image_url,
+                                category=category,
+                                published_time=None,
+                                author=None,
+                                description=None,
+                            ),
+                            matched_keywords,
                         )
                         print(f"✅ {title}")
                         total_matching += 1
 
                     except Exception as e:
+                        if entry is not None:
+                            failed.append(entry)  # checked again on the next run
                         print(f"❌ Error parsing article: {e}")
 
                 total_articles += len(news_items)
 
-            await browser.close()
+                if incremental.page_done(entries, failed):
+                    print(f"✅ No new articles on the last {stop_after} pages. Stopping.")
+                    break
+
+        incremental.fail((article.article_url, article.published_time) for article in buffer.failed)
+        await sync_to_async(incremental.save)()
 
         print(
-            f"\n✅ Crawling Finished.\nTotal Pages Crawled: {max_pages}\nTotal Articles Found: {total_articles}\n✅ Total Articles Crawled (Matching Keyword): {total_matching}"
+            f"\n✅ Crawling Finished.\nTotal Pages Crawled: {max_pages}\nTotal Articles Found: {total_articles}\n✅ Total Articles Crawled (Matching Keyword): {total_matching}\n"
+            f"Pages fetched over HTTP / rendered: {fetcher.http_fetches} / {fetcher.browser_fetches}"
         )
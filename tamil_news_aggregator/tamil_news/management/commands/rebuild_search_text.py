@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from tamil_news.cache import bump_data_version
+from tamil_news.search import rebuild_search_text
+import time
+
+
+class Command(BaseCommand):
+    help = "Recompute the normalized search text of every article (after changing how text is normalized)"
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_search_text()
+        if count:
+            bump_data_version('news')  # ?search= results may have changed
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Updated search text of {count} articles in {time.perf_counter() - started:.1f}s"
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from tamil_news.rollups import rebuild_rollups
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the daily sentiment rollups from SentimentResults "
+        "(after bulk imports, edits to news published_time/category, or to backfill)"
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Rebuilt {count} rollup rows in {time.perf_counter() - started:.1f}s"
+        ))
@@ -0,0 +1,107 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tamil_news.jobs import (
+    MAX_ATTEMPTS,
+    RETRY_DELAY,
+    VISIBILITY_TIMEOUT,
+    claim_jobs,
+    complete_job,
+    fail_exhausted_jobs,
+    fail_job,
+)
+from tamil_news.inference_cache import cache_stats
+from tamil_news.model_registry import SENTIMENT_MODEL, get_model
+from tamil_news.sentiment import analyze_news
+
+
+class Command(BaseCommand):
+    help = "Process queued sentiment jobs with a pool of worker processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int,
+                            default=getattr(settings, 'SENTIMENT_WORKER_CONCURRENCY', 1),
+                            help="Number of worker processes")
+        parser.add_argument('--batch-size', type=int, default=10, help="Jobs claimed per round trip")
+        parser.add_argument('--visibility-timeout', type=int, default=VISIBILITY_TIMEOUT,
+                            help="Seconds a claimed job stays hidden from other workers")
+        parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS)
+        parser.add_argument('--retry-delay', type=int, default=RETRY_DELAY,
+                            help="Base retry backoff in seconds")
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help="Seconds to sleep when the queue is empty")
+        parser.add_argument('--once', action='store_true', help="Exit once the queue is drained")
+
+    def handle(self, *args, **options):
+        if options['concurrency'] > 1:
+            self.run_pool(options)
+        else:
+            self.run_worker(options)
+
+    def run_pool(self, options):
+        # Each child is an independent single-process worker with its own model and DB connection
+        child_args = [
+            sys.executable, sys.argv[0], 'sentiment_worker',
+            '--concurrency', '1',
+            '--batch-size', str(options['batch_size']),
+            '--visibility-timeout', str(options['visibility_timeout']),
+            '--max-attempts', str(options['max_attempts']),
+            '--retry-delay', str(options['retry_delay']),
+            '--poll-interval', str(options['poll_interval']),
+        ]
+        if options['once']:
+            child_args.append('--once')
+
+        self.stdout.write(self.style.NOTICE(f"🚀 Starting {options['concurrency']} sentiment workers"))
+        children = [subprocess.Popen(child_args) for _ in range(options['concurrency'])]
+        try:
+            for child in children:
+                child.wait()
+        except KeyboardInterrupt:
+            for child in children:
+                child.terminate()
+            for child in children:
+                child.wait()
+
+    def run_worker(self, options):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        processed = 0
+        self.stdout.write(self.style.NOTICE(f"👷 Sentiment worker {worker_id} started"))
+        get_model(SENTIMENT_MODEL)  # load once up front rather than inside the first job
+
+        while True:
+            fail_exhausted_jobs(options['max_attempts'])
+            jobs = claim_jobs(
+                worker_id,
+                options['batch_size'],
+                visibility_timeout=options['visibility_timeout'],
+                max_attempts=options['max_attempts'],
+            )
+
+            if not jobs:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            for job in jobs:
+                try:
+                    analyze_news(job.news)
+                    complete_job(job)
+                    processed += 1
+                except Exception as e:
+                    fail_job(job, e, max_attempts=options['max_attempts'], retry_delay=options['retry_delay'])
+                    self.stdout.write(self.style.ERROR(f"❌ Job {job.id} (news {job.news_id}) failed: {e}"))
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Worker {worker_id} finished, {processed} jobs processed"))
+        for model_id, stats in cache_stats().items():
+            self.stdout.write(
+                f"📊 {model_id}: {stats['memory_hits']} chunks from memory, "
+                f"{stats['db_hits']} from the inference cache, {stats['misses']} scored by the model"
+            )
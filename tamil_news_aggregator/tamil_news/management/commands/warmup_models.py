@@ -0,0 +1,44 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from tamil_news.model_registry import (
+    BACKEND,
+    SENTIMENT_MODEL,
+    TITLE_SENTIMENT_MODEL,
+    get_model,
+    load_report,
+)
+
+
+class Command(BaseCommand):
+    help = "Load the sentiment models into this process and report load time and memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', default=[SENTIMENT_MODEL, TITLE_SENTIMENT_MODEL],
+                            help="Model names to load (defaults to every model the app uses)")
+        parser.add_argument('--backend', default=BACKEND, help="Inference backend: torch or onnx")
+
+    def handle(self, *args, **options):
+        # Django setup finishes before handle() runs; nothing heavy should be loaded yet
+        heavy = [name for name in ('torch', 'transformers') if name in sys.modules]
+        if heavy:
+            self.stdout.write(self.style.WARNING(f"⚠️ Imported during startup: {', '.join(heavy)}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("✅ Startup imported no model libraries"))
+
+        started = time.perf_counter()
+        for name in options['models']:
+            self.stdout.write(self.style.NOTICE(f"🔍 Loading {name}..."))
+            model = get_model(name, backend=options['backend'])
+            # One tiny inference so lazy kernels and allocations happen now, not on the first real request
+            model.predict_proba(["warmup"])
+
+        report = load_report()
+        self.stdout.write("\n📊 Model load report")
+        for name in options['models']:
+            stats = report.get((name, options['backend']), {})
+            rss = f"{stats['rss_mb']:.0f} MB" if stats.get('rss_mb') is not None else "n/a"
+            self.stdout.write(f"  {name}: {stats.get('seconds', 0):.2f}s, peak RSS +{rss}")
+        self.stdout.write(self.style.SUCCESS(f"✅ Warm-up finished in {time.perf_counter() - started:.2f}s"))
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.23 on 2026-10-18 14:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tamil_news', '0006_sentimentjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CrawlState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('high_water_mark', models.DateTimeField(blank=True, null=True)),
+                ('seen_urls', models.BinaryField(blank=True, null=True)),
+                ('seen_keywords', models.JSONField(blank=True, null=True)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+                ('website', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='crawl_state', to='tamil_news.websites')),
+            ],
+            options={
+                'db_table': 'crawl_state',
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.23 on 2026-10-18 14:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tamil_news', '0007_crawlstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SentimentDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(blank=True, max_length=100, null=True)),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('positive_sum', models.FloatField(default=0)),
+                ('negative_sum', models.FloatField(default=0)),
+                ('neutral_sum', models.FloatField(default=0)),
+                ('keyword', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='tamil_news.keyword')),
+                ('website', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='tamil_news.websites')),
+            ],
+            options={
+                'db_table': 'sentiment_daily_rollups',
+                'indexes': [models.Index(fields=['keyword', 'day'], name='rollup_keyword_day_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='sentimentdailyrollup',
+            constraint=models.UniqueConstraint(fields=('keyword', 'website', 'category', 'day'), name='unique_keyword_website_category_day'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.23 on 2026-10-18 14:25
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY keeps news_details and sentiment_results writable while it runs
+    atomic = False
+
+    dependencies = [
+        ('tamil_news', '0008_sentimentdailyrollup'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='newsdetails',
+            index=models.Index(fields=['-published_time', '-id'], name='news_published_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='newsdetails',
+            index=models.Index(fields=['website', '-published_time', '-id'], name='news_website_published_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='newsdetails',
+            index=models.Index(django.db.models.functions.text.Upper('category'), models.OrderBy(models.F('published_time'), descending=True), models.OrderBy(models.F('id'), descending=True), name='news_category_published_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='sentimentresults',
+            index=models.Index(fields=['sentiment_label', 'news'], name='sentiment_label_news_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.23 on 2026-10-18 14:31
+
+import re
+import unicodedata
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations, models
+
+# Frozen copy of search.normalize_text as this migration shipped it, so later changes to the
+# app's normalizer can't change what the backfill writes (rebuild_search_text catches up)
+INVISIBLE_CHARS = re.compile('[\u00ad\u200b-\u200d\u2060\ufeff]')
+WHITESPACE = re.compile(r'\s+')
+BATCH_SIZE = 1000
+
+
+def normalize_text(text):
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFC', text)
+    text = INVISIBLE_CHARS.sub('', text)
+    return WHITESPACE.sub(' ', text).strip().casefold()
+
+
+def backfill_search_text(apps, schema_editor):
+    # Each batch is its own UPDATE, so no long transaction is held open
+    NewsDetails = apps.get_model('tamil_news', 'NewsDetails')
+    last_id = 0
+    while True:
+        batch = list(
+            NewsDetails.objects
+            .filter(id__gt=last_id)
+            .order_by('id')
+            .only('id', 'title', 'description', 'author', 'website_name', 'category')[:BATCH_SIZE]
+        )
+        if not batch:
+            return
+        for article in batch:
+            article.search_text = normalize_text(' '.join(filter(None, (
+                article.title, article.description, article.author, article.website_name, article.category,
+            ))))
+        NewsDetails.objects.bulk_update(batch, ['search_text'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+    # The backfill updates in batches and the index is built concurrently, so news_details stays writable
+    atomic = False
+
+    dependencies = [
+        ('tamil_news', '0009_hot_path_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='newsdetails',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='newsdetails',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='news_search_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.23 on 2026-10-18 14:52
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY keeps sentiment_results writable while it runs
+    atomic = False
+
+    dependencies = [
+        ('tamil_news', '0010_news_search_text'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='sentimentresults',
+            index=models.Index(fields=['-processed_at', '-id'], name='sentiment_processed_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.23 on 2026-10-18 15:04
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY keeps news_details writable while it runs
+    atomic = False
+
+    dependencies = [
+        ('tamil_news', '0011_sentiment_processed_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoryBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField()),
+                ('published_time', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'story_bands',
+            },
+        ),
+        migrations.CreateModel(
+            name='StoryFingerprint',
+            fields=[
+                ('news', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fingerprint', serialize=False, to='tamil_news.newsdetails')),
+                ('signature', models.BinaryField()),
+            ],
+            options={
+                'db_table': 'story_fingerprints',
+            },
+        ),
+        migrations.AddField(
+            model_name='newsdetails',
+            name='story_id',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        AddIndexConcurrently(
+            model_name='newsdetails',
+            index=models.Index(fields=['story_id'], name='news_story_idx'),
+        ),
+        migrations.AddField(
+            model_name='storyband',
+            name='news',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='story_bands', to='tamil_news.newsdetails'),
+        ),
+        migrations.AddIndex(
+            model_name='storyband',
+            index=models.Index(fields=['key', 'published_time'], name='story_band_key_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.23 on 2026-10-18 15:08
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tamil_news', '0012_story_clusters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InferenceCacheEntry',
+            fields=[
+                ('key', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('model', models.CharField(max_length=255)),
+                ('scores', models.BinaryField()),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'inference_cache',
+                'indexes': [models.Index(fields=['last_used_at'], name='inference_cache_used_idx')],
+            },
+        ),
+    ]
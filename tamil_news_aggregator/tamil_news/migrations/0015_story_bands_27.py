@@ -0,0 +1,61 @@
+import hashlib
+
+from django.db import migrations, models
+import numpy as np
+
+# Frozen copy of dedup.band_keys for 80-permutation signatures in 27 bands, so later changes to
+# the app or its settings can't change what this migration writes
+NUM_PERM = 80
+BANDS = 27
+BATCH_SIZE = 1000
+
+
+def band_keys(signature):
+    if len(signature) != NUM_PERM:
+        return []  # not a signature this banding was made for
+    keys = []
+    for band, rows in enumerate(np.array_split(signature, BANDS)):
+        digest = hashlib.blake2b(rows.tobytes(), digest_size=8, salt=band.to_bytes(2, 'little')).digest()
+        keys.append(int.from_bytes(digest, 'little', signed=True))
+    return keys
+
+
+def rebuild_bands(apps, schema_editor):
+    # Band keys depend on how the signature is cut into bands; recompute them for the new banding
+    StoryBand = apps.get_model('tamil_news', 'StoryBand')
+    StoryFingerprint = apps.get_model('tamil_news', 'StoryFingerprint')
+
+    last_id = 0
+    while True:
+        batch = list(
+            StoryFingerprint.objects.filter(news_id__gt=last_id).order_by('news_id')
+            .values_list('news_id', 'signature')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        news_ids = [news_id for news_id, _ in batch]
+        published = dict(
+            StoryBand.objects.filter(news_id__in=news_ids).order_by()
+            .values_list('news_id').annotate(published=models.Min('published_time'))
+        )
+        StoryBand.objects.filter(news_id__in=news_ids).delete()
+        StoryBand.objects.bulk_create(
+            [
+                StoryBand(key=key, news_id=news_id, published_time=published[news_id])
+                for news_id, signature in batch if news_id in published
+                for key in band_keys(np.frombuffer(bytes(signature), np.uint32))
+            ],
+            batch_size=2000,
+        )
+        last_id = news_ids[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tamil_news', '0014_backfill_checkpoint'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_bands, migrations.RunPython.noop),
+    ]
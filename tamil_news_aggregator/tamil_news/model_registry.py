@@ -0,0 +1,206 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Models are loaded on first use, once per process, and shared by every caller.
+# Nothing here imports torch or transformers until a model is actually requested,
+# so web workers and management commands that never score text stay small.
+
+SENTIMENT_MODEL = "cardiffnlp/twitter-xlm-roberta-base-sentiment"
+TITLE_SENTIMENT_MODEL = "nlptown/bert-base-multilingual-uncased-sentiment"
+MAX_TOKENS = 512
+
+BACKEND = getattr(settings, 'SENTIMENT_BACKEND', 'torch')
+ONNX_DIR = Path(getattr(settings, 'SENTIMENT_ONNX_DIR', 'onnx_models'))
+ONNX_THREADS = getattr(settings, 'SENTIMENT_ONNX_THREADS', 0)  # 0 lets ONNX Runtime pick
+
+_models = {}
+_load_stats = {}
+_lock = threading.Lock()
+
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is reported in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class TorchSentimentModel:
+    def __init__(self, name):
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+        self.name = name
+        self.torch = torch
+        self.tokenizer = AutoTokenizer.from_pretrained(name)
+        self.model = AutoModelForSequenceClassification.from_pretrained(name)
+        self.model.eval()
+        # The Hub revision the weights came from; cached scores are keyed on it
+        self.version = getattr(self.model.config, '_commit_hash', None) or ''
+
+    def predict_proba(self, texts, batch_size=16, max_length=MAX_TOKENS):
+        """Softmax scores for each text, in input order, as an (n, num_labels) array."""
+        scores = np.zeros((len(texts), self.model.config.num_labels), dtype=np.float32)
+        # Group texts of similar length so each padded batch wastes little compute
+        order = sorted(range(len(texts)), key=lambda idx: len(texts[idx]))
+
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            inputs = self.tokenizer(
+                [texts[idx] for idx in batch],
+                return_tensors="pt",
+                truncation=True,
+                max_length=max_length,
+                padding=True,
+            )
+            with self.torch.inference_mode():
+                logits = self.model(**inputs).logits
+            scores[batch] = self.torch.nn.functional.softmax(logits, dim=1).numpy()
+
+        return scores
+
+
+class OnnxSentimentModel:
+    """
+    Dynamic int8 quantized export of a Hugging Face classifier, served by ONNX Runtime.
+
+    The export runs once per model and is reused from SENTIMENT_ONNX_DIR afterwards.
+    """
+
+    def __init__(self, name, threads=None):
+        try:
+            import onnxruntime
+        except ImportError:
+            raise ImproperlyConfigured(
+                "SENTIMENT_BACKEND='onnx' needs onnxruntime and onnx: pip install onnxruntime onnx"
+            )
+        from transformers import AutoTokenizer
+
+        self.name = name
+        self.export_dir = ONNX_DIR / name.replace('/', '__')
+        self.model_path = self.export_dir / 'model.int8.onnx'
+        if not self.model_path.exists():
+            self.export(name, self.export_dir)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(self.export_dir)
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = ONNX_THREADS if threads is None else threads
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(
+            str(self.model_path), options, providers=['CPUExecutionProvider']
+        )
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+        # A re-export writes a new file, and may quantize differently
+        self.version = f"int8-{int(self.model_path.stat().st_mtime)}"
+
+    @staticmethod
+    def export(name, export_dir):
+        import torch
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+        export_dir.mkdir(parents=True, exist_ok=True)
+        tokenizer = AutoTokenizer.from_pretrained(name)
+        model = AutoModelForSequenceClassification.from_pretrained(name)
+        model.eval()
+
+        sample = dict(tokenizer(["warmup", "warmup text"], return_tensors="pt", padding=True))
+        input_names = list(sample)
+        fp32_path = export_dir / 'model.fp32.onnx'
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                (),
+                str(fp32_path),
+                kwargs=sample,
+                input_names=input_names,
+                output_names=['logits'],
+                dynamic_axes={**{key: {0: 'batch', 1: 'sequence'} for key in input_names},
+                              'logits': {0: 'batch'}},
+                opset_version=14,
+                dynamo=False,
+            )
+        quantize_dynamic(str(fp32_path), str(export_dir / 'model.int8.onnx'), weight_type=QuantType.QInt8)
+        fp32_path.unlink()
+        tokenizer.save_pretrained(export_dir)
+
+    def predict_proba(self, texts, batch_size=16, max_length=MAX_TOKENS):
+        """Softmax scores for each text, in input order, as an (n, num_labels) array."""
+        scores = None
+        order = sorted(range(len(texts)), key=lambda idx: len(texts[idx]))
+
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            encoded = self.tokenizer(
+                [texts[idx] for idx in batch],
+                return_tensors="np",
+                truncation=True,
+                max_length=max_length,
+                padding=True,
+            )
+            feed = {key: encoded[key].astype(np.int64) for key in self.input_names}
+            logits = self.session.run(['logits'], feed)[0]
+            logits = logits - logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+
+            if scores is None:
+                scores = np.zeros((len(texts), probs.shape[1]), dtype=np.float32)
+            scores[batch] = probs
+
+        return scores if scores is not None else np.zeros((0, 0), dtype=np.float32)
+
+
+BACKENDS = {
+    'torch': TorchSentimentModel,
+    'onnx': OnnxSentimentModel,
+}
+
+
+def set_inference_threads(threads):
+    """Intra-op threads for torch in this process, and for ONNX sessions created from now on."""
+    global ONNX_THREADS
+    ONNX_THREADS = threads
+    if BACKEND == 'torch' or 'torch' in sys.modules:
+        import torch
+        torch.set_num_threads(threads)
+
+
+def get_model(name=SENTIMENT_MODEL, backend=None):
+    backend = backend or BACKEND
+    key = (name, backend)
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    if backend not in BACKENDS:
+        raise ImproperlyConfigured(f"Unknown SENTIMENT_BACKEND '{backend}', use one of {sorted(BACKENDS)}")
+
+    with _lock:
+        if key not in _models:
+            rss_before = _max_rss_mb()
+            started = time.perf_counter()
+            _models[key] = BACKENDS[backend](name)
+            rss_after = _max_rss_mb()
+            _load_stats[key] = {
+                'seconds': time.perf_counter() - started,
+                'rss_mb': rss_after - rss_before if rss_before is not None else None,
+            }
+    return _models[key]
+
+
+def load_report():
+    """{(model name, backend): {'seconds': load time, 'rss_mb': peak RSS growth}} for models loaded in this process."""
+    return dict(_load_stats)
@@ -1,6 +1,11 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Upper
 from django.utils import timezone
 
+from tamil_news.search import news_search_text
+
 
 class Websites(models.Model):
     name = models.CharField(max_length=255, unique=True)
@@ -36,6 +41,10 @@ class NewsDetails(models.Model):
     author = models.CharField(max_length=255, blank=True, null=True)
     description = models.TextField(blank=True, null=True)
     keywords = models.ManyToManyField(Keyword, related_name='news')
+    # Normalized title, description, author, website and category (see tamil_news/search.py)
+    search_text = models.TextField(blank=True, default='', editable=False)
+    # Near-duplicate cluster: the id of the story's first article (see tamil_news/dedup.py)
+    story_id = models.BigIntegerField(blank=True, null=True, editable=False)
 
     class Meta:
         db_table = 'news_details'
@@ -45,10 +54,31 @@ class NewsDetails(models.Model):
                 name='unique_website_category_url'
             )
         ]
+        indexes = [
+            # news_list's "-published_time, -id" order, unfiltered, per website and per category
+            models.Index(fields=['-published_time', '-id'], name='news_published_idx'),
+            models.Index(fields=['website', '-published_time', '-id'], name='news_website_published_idx'),
+            models.Index(
+                Upper('category'), F('published_time').desc(), F('id').desc(),
+                name='news_category_published_idx'
+            ),
+            GinIndex(fields=['search_text'], opclasses=['gin_trgm_ops'], name='news_search_trgm_idx'),
+            models.Index(fields=['story_id'], name='news_story_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    def refresh_search_text(self):
+        self.search_text = news_search_text(self)
+
+    def save(self, *args, **kwargs):
+        self.refresh_search_text()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'search_text' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'search_text']
+        super().save(*args, **kwargs)
+
 
 class SentimentResults(models.Model):
     news = models.ForeignKey(NewsDetails, on_delete=models.CASCADE)
@@ -73,6 +103,158 @@ class SentimentResults(models.Model):
         constraints = [
         models.UniqueConstraint(fields=['news', 'keyword'], name='unique_news_keyword')
     ]
+        indexes = [
+            # news_list's sentiment filter: articles with a result carrying this label
+            models.Index(fields=['sentiment_label', 'news'], name='sentiment_label_news_idx'),
+            # /api/sentiment-results/ keyset pages, newest first
+            models.Index(fields=['-processed_at', '-id'], name='sentiment_processed_idx'),
+        ]
 
     def __str__(self):
         return f"{self.news.title[:50]}... → {self.sentiment_label} ({self.sentiment_score})"
+
+
+class SentimentJob(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    news = models.ForeignKey(NewsDetails, on_delete=models.CASCADE, related_name='sentiment_jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    # Earliest time a worker may claim the job: retry backoff, or lease expiry while running
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=255, blank=True, null=True)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'sentiment_jobs'
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='sentiment_job_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f"Job {self.id} for news {self.news_id} ({self.status})"
+
+
+class CrawlState(models.Model):
+    website = models.OneToOneField(Websites, on_delete=models.CASCADE, related_name='crawl_state')
+    # Newest published_time seen on the site so far
+    high_water_mark = models.DateTimeField(blank=True, null=True)
+    # Bloom filter of every listing URL seen, including articles that matched no keyword
+    seen_urls = models.BinaryField(blank=True, null=True)
+    # Keywords those URLs were matched against; null when the crawl kept every article
+    seen_keywords = models.JSONField(blank=True, null=True)
+    last_run_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'crawl_state'
+
+    def __str__(self):
+        return f"{self.website.name} (high water mark {self.high_water_mark})"
+
+
+class SentimentDailyRollup(models.Model):
+    """
+    Per (keyword, website, category, day) sums of SentimentResults scores.
+
+    Kept current by signals on SentimentResults (see tamil_news/rollups.py);
+    `manage.py rebuild_sentiment_rollups` recomputes it from scratch.
+    """
+    keyword = models.ForeignKey(Keyword, on_delete=models.CASCADE, related_name='daily_rollups')
+    website = models.ForeignKey(Websites, on_delete=models.CASCADE, blank=True, null=True, related_name='daily_rollups')
+    category = models.CharField(max_length=100, blank=True, null=True)
+    # news.published_time's date in TIME_ZONE, the same day `published_time__date` filters on
+    day = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+    positive_sum = models.FloatField(default=0)
+    negative_sum = models.FloatField(default=0)
+    neutral_sum = models.FloatField(default=0)
+
+    class Meta:
+        db_table = 'sentiment_daily_rollups'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['keyword', 'website', 'category', 'day'],
+                name='unique_keyword_website_category_day'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['keyword', 'day'], name='rollup_keyword_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.keyword} / {self.website} / {self.category} on {self.day}: {self.count}"
+
+
+class StoryFingerprint(models.Model):
+    """MinHash signature of an article, compared against candidates to find near-duplicates."""
+    news = models.OneToOneField(NewsDetails, on_delete=models.CASCADE, primary_key=True, related_name='fingerprint')
+    signature = models.BinaryField()
+
+    class Meta:
+        db_table = 'story_fingerprints'
+
+    def __str__(self):
+        return f"Fingerprint of news {self.news_id}"
+
+
+class StoryBand(models.Model):
+    """One LSH band key of an article: articles sharing a key are near-duplicate candidates."""
+    key = models.BigIntegerField()
+    news = models.ForeignKey(NewsDetails, on_delete=models.CASCADE, related_name='story_bands')
+    # news.published_time (or the time it was stored), so the lookup window needs no join
+    published_time = models.DateTimeField()
+
+    class Meta:
+        db_table = 'story_bands'
+        indexes = [
+            models.Index(fields=['key', 'published_time'], name='story_band_key_idx'),
+        ]
+
+    def __str__(self):
+        return f"Band {self.key} of news {self.news_id}"
+
+
+class InferenceCacheEntry(models.Model):
+    """Softmax scores of one text under one model version (see tamil_news/inference_cache.py)."""
+    # sha256 of the model id and the normalized text
+    key = models.CharField(max_length=64, primary_key=True)
+    model = models.CharField(max_length=255)
+    # float32 scores in the model's label order
+    scores = models.BinaryField()
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'inference_cache'
+        indexes = [
+            models.Index(fields=['last_used_at'], name='inference_cache_used_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model}: {self.key[:12]}"
+
+
+class BackfillCheckpoint(models.Model):
+    """How far a resumable backfill command has got, so a killed run picks up where it stopped."""
+    # Command and model, e.g. "bulk_sentiment_analysis:nlptown/bert-base-multilingual-uncased-sentiment"
+    name = models.CharField(max_length=255, primary_key=True)
+    # Highest NewsDetails id handled so far
+    last_news_id = models.BigIntegerField(default=0)
+    processed = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'backfill_checkpoints'
+
+    def __str__(self):
+        return f"{self.name} at news {self.last_news_id}"
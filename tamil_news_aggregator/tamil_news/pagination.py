@@ -0,0 +1,231 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+PAGE_SIZE = getattr(settings, 'API_PAGE_SIZE', 50)
+MAX_PAGE_SIZE = getattr(settings, 'API_MAX_PAGE_SIZE', 200)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass
+class KeysetPage:
+    items: list
+    next_cursor: str = None
+    previous_cursor: str = None
+
+
+def page_size_from(value, default=PAGE_SIZE):
+    try:
+        return max(1, min(int(value), MAX_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return default
+
+
+def _json_default(value):
+    # Full precision: DjangoJSONEncoder would cut datetimes to milliseconds and break ties
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Cannot put {type(value).__name__} in a cursor")
+
+
+def encode_cursor(position, reverse=False):
+    data = json.dumps({'p': position, 'r': reverse}, default=_json_default, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return list(data['p']), bool(data['r'])
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidCursor(cursor)
+
+
+def keyset_ordering(queryset):
+    """
+    [(field, descending)] for the queryset's order_by, cut at (or completed with) the primary key.
+
+    Only plain field names are supported; the primary key makes every position unique.
+    """
+    pk_names = ('pk', queryset.model._meta.pk.name)
+    ordering = []
+    for item in queryset.query.order_by or queryset.model._meta.ordering:
+        if not isinstance(item, str) or item == '?':
+            raise ValueError(f"Keyset pagination needs field name ordering, got {item!r}")
+        name = item.lstrip('-')
+        ordering.append((name, item.startswith('-')))
+        if name in pk_names:
+            return ordering
+    ordering.append(('pk', ordering[-1][1] if ordering else False))
+    return ordering
+
+
+def _nullable(model, name):
+    try:
+        for part in name.split('__'):
+            field = model._meta.get_field(part)
+            model = field.related_model
+    except FieldDoesNotExist:
+        return False  # an annotation such as search_rank
+    return field.null
+
+
+def _value(obj, name):
+    if isinstance(obj, dict):  # values() rows
+        return obj[name]
+    for part in name.split('__'):
+        if obj is None:
+            return None
+        obj = getattr(obj, part)
+    return obj
+
+
+def _equal(name, value):
+    return Q(**{f'{name}__isnull': True}) if value is None else Q(**{name: value})
+
+
+def _past(model, name, descending, value):
+    """Rows strictly past value on one field in this scan direction, or None; NULL sorts as the largest value."""
+    if descending:
+        return Q(**{f'{name}__isnull': False}) if value is None else Q(**{f'{name}__lt': value})
+    if value is None:
+        return None
+    past = Q(**{f'{name}__gt': value})
+    return past | Q(**{f'{name}__isnull': True}) if _nullable(model, name) else past
+
+
+def _after(model, scan, position):
+    (name, descending), value = scan[0], position[0]
+    past = _past(model, name, descending, value)
+    if len(scan) == 1:
+        return past
+    tied = _equal(name, value) & _after(model, scan[1:], position[1:])
+    return tied if past is None else past | tied
+
+
+def _segments(model, scan, position):
+    """
+    Disjoint filters, in scan order, that together select the rows after position.
+
+    Each bounds the leading field to one range (or to NULL) so PostgreSQL can start an index
+    scan at the cursor instead of walking from the first row.
+    """
+    (name, descending), value = scan[0], position[0]
+    if len(scan) == 1:
+        past = _past(model, name, descending, value)
+        return [past] if past is not None else []
+
+    tied = _equal(name, value) & _after(model, scan[1:], position[1:])
+    if value is None:
+        return [tied, Q(**{f'{name}__isnull': False})] if descending else [tied]
+    if descending:
+        return [Q(**{f'{name}__lte': value}) & (Q(**{f'{name}__lt': value}) | tied)]
+    segments = [Q(**{f'{name}__gte': value}) & (Q(**{f'{name}__gt': value}) | tied)]
+    if _nullable(model, name):
+        segments.append(Q(**{f'{name}__isnull': True}))
+    return segments
+
+
+def keyset_querysets(queryset, position=None, reverse=False):
+    """The ordered querysets to read, one after another, for the rows after position."""
+    ordering = keyset_ordering(queryset)
+    if position is not None and len(position) != len(ordering):
+        raise InvalidCursor(position)
+
+    scan = [(name, descending != reverse) for name, descending in ordering]
+    queryset = queryset.order_by(*[f"{'-' if descending else ''}{name}" for name, descending in scan])
+    if position is None:
+        return [queryset]
+    return [queryset.filter(segment) for segment in _segments(queryset.model, scan, position)]
+
+
+def keyset_page(queryset, cursor=None, page_size=PAGE_SIZE):
+    """
+    One page of queryset in its own ordering, starting at cursor.
+
+    A page is page_size + 1 rows read from the cursor's position: no COUNT(*) and no OFFSET,
+    so the 5,000th page costs what the first does.
+    """
+    ordering = keyset_ordering(queryset)
+    position, reverse = decode_cursor(cursor) if cursor else (None, False)
+
+    rows = []
+    try:
+        for segment in keyset_querysets(queryset, position, reverse):
+            rows += segment[:page_size + 1 - len(rows)]
+            if len(rows) > page_size:
+                break
+    except (ValidationError, ValueError, TypeError) as e:
+        raise InvalidCursor(cursor) from e
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if reverse:
+        rows.reverse()
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, position is not None
+    if not rows:
+        return KeysetPage(rows)
+
+    def position_of(obj):
+        return [_value(obj, name) for name, _ in ordering]
+
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor(position_of(rows[-1])) if has_next else None,
+        previous_cursor=encode_cursor(position_of(rows[0]), reverse=True) if has_previous else None,
+    )
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over the view's ordering, e.g. (-published_time, -id).
+
+    ?page_size= is capped at API_MAX_PAGE_SIZE; responses are {"next", "previous", "results"}.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        size = page_size_from(request.query_params.get(self.page_size_query_param))
+        try:
+            self.page = keyset_page(queryset, request.query_params.get(self.cursor_query_param), size)
+        except InvalidCursor:
+            raise NotFound("Invalid cursor")
+        return self.page.items
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.link(self.page.next_cursor),
+            'previous': self.link(self.page.previous_cursor),
+            'results': data,
+        })
+
+    def link(self, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
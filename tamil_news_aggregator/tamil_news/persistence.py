@@ -0,0 +1,124 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from tamil_news.cache import bump_data_version
+from tamil_news.dedup import assign_stories
+from tamil_news.jobs import enqueue_sentiment_jobs
+from tamil_news.models import Keyword, NewsDetails
+
+PERSIST_BATCH_SIZE = getattr(settings, 'CRAWLER_PERSIST_BATCH_SIZE', 200)
+
+NewsKeyword = NewsDetails.keywords.through
+
+
+class ArticleBuffer:
+    """
+    Buffers crawled articles and writes them in batches.
+
+    A flush is one transaction: a bulk INSERT ... ON CONFLICT DO NOTHING against
+    unique_website_category_url, one SELECT for the row ids, story assignment for the new
+    rows (tamil_news/dedup.py), one bulk insert into the keyword through table and one bulk
+    enqueue of sentiment jobs. bulk_create skips
+    post_save, so the jobs the signal would have queued for new articles are queued here.
+
+        async with ArticleBuffer() as buffer:
+            await buffer.add(NewsDetails(...), matched_keywords)
+    """
+
+    def __init__(self, batch_size=PERSIST_BATCH_SIZE):
+        self.batch_size = max(1, batch_size)
+        self.pending = {}  # (website_id, category, article_url) -> (article, keyword names)
+        self.created = 0
+        self.failed = []  # articles whose flush raised
+        self.keyword_ids = {}  # keyword name -> ids of the Keyword rows with that name
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aflush()
+
+    async def add(self, article, keywords=()):
+        article.refresh_search_text()
+        key = (article.website_id, article.category, article.article_url)
+        if key in self.pending:
+            self.pending[key][1].update(keywords)
+        else:
+            self.pending[key] = (article, set(keywords))
+        if len(self.pending) >= self.batch_size:
+            await self.aflush()
+
+    async def aflush(self):
+        if self.pending:
+            await sync_to_async(self.flush)()
+
+    def flush(self):
+        """Write the buffered articles; returns the ids of the ones that were new."""
+        batch, self.pending = self.pending, {}
+        if not batch:
+            return []
+
+        try:
+            new_ids = self._write(batch)
+        except Exception:
+            # The transaction stored none of them; crawlers hand these to IncrementalCrawl.fail()
+            self.failed.extend(article for article, _ in batch.values())
+            raise
+        self.created += len(new_ids)
+        return new_ids
+
+    def _write(self, batch):
+        with transaction.atomic():
+            existing = self._ids_for(batch)
+            NewsDetails.objects.bulk_create(
+                [article for key, (article, _) in batch.items() if key not in existing],
+                batch_size=self.batch_size,
+                ignore_conflicts=True,
+            )
+            ids = self._ids_for(batch)
+            new_ids = [news_id for key, news_id in ids.items() if key not in existing]
+
+            new_articles = []
+            for key, (article, _) in batch.items():
+                if key in ids and key not in existing:
+                    article.id = ids[key]
+                    new_articles.append(article)
+            assign_stories(new_articles)
+
+            links = [
+                NewsKeyword(newsdetails_id=ids[key], keyword_id=keyword_id)
+                for key, (_, names) in batch.items() if key in ids
+                for keyword_id in self._keyword_ids(names)
+            ]
+            NewsKeyword.objects.bulk_create(links, batch_size=1000, ignore_conflicts=True)
+
+            with_description = {ids[key] for key, (article, _) in batch.items() if key in ids and article.description}
+            enqueue_sentiment_jobs([news_id for news_id in new_ids if news_id in with_description])
+            # bulk_create sends no signals; API responses over these rows are now stale
+            bump_data_version('news')
+
+        return new_ids
+
+    def _ids_for(self, batch):
+        # Rows are only addressable by their unique key: ignore_conflicts leaves pk unset
+        groups = {}
+        for website_id, category, article_url in batch:
+            groups.setdefault((website_id, category), []).append(article_url)
+
+        condition = Q()
+        for (website_id, category), urls in groups.items():
+            condition |= Q(website_id=website_id, category=category, article_url__in=urls)
+
+        rows = NewsDetails.objects.filter(condition).values_list('website_id', 'category', 'article_url', 'id')
+        return {(website_id, category, url): news_id for website_id, category, url, news_id in rows}
+
+    def _keyword_ids(self, names):
+        missing = [name for name in names if name not in self.keyword_ids]
+        if missing:
+            for name in missing:
+                self.keyword_ids[name] = []
+            for keyword_id, name in Keyword.objects.filter(name__in=missing).values_list('id', 'name'):
+                self.keyword_ids[name].append(keyword_id)
+        return [keyword_id for name in names for keyword_id in self.keyword_ids[name]]
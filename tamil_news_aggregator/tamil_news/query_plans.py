@@ -0,0 +1,88 @@
+import json
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from tamil_news.analytics import (
+    compare_keywords_rows,
+    filter_news,
+    keyword_rollups,
+    sentiment_series_rows,
+)
+from tamil_news.models import NewsDetails, SentimentResults
+from tamil_news.pagination import keyset_querysets
+
+# Tables large enough that a sequential scan on a hot path is a regression
+HOT_TABLES = {'news_details', 'sentiment_results', 'sentiment_daily_rollups'}
+
+
+def hot_queries(keyword_id, keyword_name, website_id, category):
+    """
+    The read paths that run on every page view or API call, built by the same code the views use.
+
+    Returns {name: queryset}; sample parameters come from the caller.
+    """
+    now = timezone.now()
+    today = timezone.localdate()
+    latest = NewsDetails.objects.order_by('-published_time', '-id')
+    results = SentimentResults.objects.order_by('-processed_at', '-id')
+    cursor = [now - timedelta(days=30), 0]
+    return {
+        'news_list': latest[:10],
+        'news_list_next_page': keyset_querysets(latest, cursor)[0][:11],
+        'news_list_previous_page': keyset_querysets(latest, cursor, reverse=True)[0][:11],
+        'news_list_by_website': filter_news(latest, website_id=website_id)[:10],
+        'news_list_by_category': filter_news(latest, category=category)[:10],
+        'news_list_by_date_range': filter_news(latest, start_day=today - timedelta(days=7), end_day=today)[:10],
+        'news_list_by_sentiment': filter_news(latest, sentiment_label='positive')[:10],
+        'keyword_sentiment': keyword_rollups(keyword_id, today - timedelta(days=30)),
+        'keyword_series_hourly': sentiment_series_rows(keyword_id, 'hour', now - timedelta(days=2), now),
+        'keyword_series_daily': sentiment_series_rows(keyword_id, 'day', now - timedelta(days=90), now),
+        'keyword_compare': compare_keywords_rows([keyword_name], today - timedelta(days=30), by_website=True),
+        'sentiment_results_next_page': keyset_querysets(results, cursor)[0][:51],
+    }
+
+
+def explain(queryset, analyze=False):
+    """PostgreSQL's JSON plan for a queryset, as the top plan node."""
+    options = {'format': 'json'}
+    if analyze:
+        options['analyze'] = True
+    plan = queryset.explain(**options)
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]['Plan']
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+def unindexed_scans(plan, tables=HOT_TABLES):
+    """
+    Relations in `tables` that the plan reads in full.
+
+    That is a Seq Scan, or an index walked end to end to filter rows (no Index Cond but a
+    Filter), which is what the planner falls back to when sequential scans are disabled.
+    """
+    found = set()
+    for node in plan_nodes(plan):
+        if node.get('Relation Name') not in tables:
+            continue
+        if node['Node Type'] == 'Seq Scan':
+            found.add(node['Relation Name'])
+        elif node['Node Type'] in ('Index Scan', 'Index Only Scan') and 'Filter' in node and 'Index Cond' not in node:
+            found.add(node['Relation Name'])
+    return sorted(found)
+
+
+def disable_seqscan():
+    """
+    Make the planner pick any usable index for the rest of the transaction.
+
+    On a small or freshly seeded database sequential scans are often legitimately cheaper;
+    with them priced out, a full scan left in a plan means no index can serve the query.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
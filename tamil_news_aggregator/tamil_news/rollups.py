@@ -0,0 +1,111 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, FloatField, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from tamil_news.cache import bump_data_version
+from tamil_news.models import SentimentDailyRollup, SentimentResults
+
+SCORE_FIELDS = ('positive_score', 'negative_score', 'neutral_score')
+
+
+def rollup_key(keyword_id, website_id, category, published_time):
+    """(keyword_id, website_id, category, day) for a result, or None when it has no place in a rollup."""
+    if keyword_id is None or published_time is None:
+        return None
+    if timezone.is_aware(published_time):
+        published_time = timezone.localtime(published_time)
+    return keyword_id, website_id, category, published_time.date()
+
+
+def result_key(result, news=None):
+    news = news or result.news
+    return rollup_key(result.keyword_id, news.website_id, news.category, news.published_time)
+
+
+def result_scores(result):
+    return tuple(getattr(result, field) or 0 for field in SCORE_FIELDS)
+
+
+def stored_result(pk):
+    """Rollup key and scores of a SentimentResults row as currently stored, or None."""
+    row = (
+        SentimentResults.objects
+        .filter(pk=pk)
+        .values_list('keyword_id', 'news__website_id', 'news__category', 'news__published_time', *SCORE_FIELDS)
+        .first()
+    )
+    if row is None:
+        return None
+    key = rollup_key(*row[:4])
+    return (key, tuple(score or 0 for score in row[4:])) if key else None
+
+
+def apply_rollup_delta(key, count, scores):
+    """Add `count` results with summed `scores` to the rollup row for `key` (negative to remove)."""
+    if key is None or not count:
+        return
+    keyword_id, website_id, category, day = key
+    positive, negative, neutral = scores
+    lookup = dict(keyword_id=keyword_id, website_id=website_id, category=category, day=day)
+    changes = dict(
+        count=F('count') + count,
+        positive_sum=F('positive_sum') + positive,
+        negative_sum=F('negative_sum') + negative,
+        neutral_sum=F('neutral_sum') + neutral,
+    )
+
+    with transaction.atomic():
+        if SentimentDailyRollup.objects.filter(**lookup).update(**changes) or count < 0:
+            return
+        try:
+            with transaction.atomic():
+                SentimentDailyRollup.objects.create(
+                    **lookup, count=count, positive_sum=positive, negative_sum=negative, neutral_sum=neutral
+                )
+        except IntegrityError:
+            # Another writer created the row first
+            SentimentDailyRollup.objects.filter(**lookup).update(**changes)
+
+
+def score_sum(field):
+    """Sum of a score column, 0.0 rather than NULL for an empty group."""
+    return Coalesce(Sum(field), Value(0.0), output_field=FloatField())
+
+
+def rebuild_rollups():
+    """Recompute every rollup row from SentimentResults; returns the number of rows written."""
+    grouped = (
+        SentimentResults.objects
+        .filter(keyword__isnull=False, news__published_time__isnull=False)
+        .annotate(day=TruncDate('news__published_time'))
+        .values('keyword_id', 'news__website_id', 'news__category', 'day')
+        .annotate(
+            count=Count('id'),
+            positive_sum=score_sum('positive_score'),
+            negative_sum=score_sum('negative_score'),
+            neutral_sum=score_sum('neutral_score'),
+        )
+        .order_by()
+    )
+
+    rows = [
+        SentimentDailyRollup(
+            keyword_id=group['keyword_id'],
+            website_id=group['news__website_id'],
+            category=group['news__category'],
+            day=group['day'],
+            count=group['count'],
+            positive_sum=group['positive_sum'],
+            negative_sum=group['negative_sum'],
+            neutral_sum=group['neutral_sum'],
+        )
+        for group in grouped.iterator()
+    ]
+
+    with transaction.atomic():
+        SentimentDailyRollup.objects.all().delete()
+        SentimentDailyRollup.objects.bulk_create(rows, batch_size=1000)
+        keyword_ids = {row.keyword_id for row in rows}
+        bump_data_version('sentiment', *(f'sentiment:{keyword_id}' for keyword_id in keyword_ids))
+    return len(rows)
@@ -0,0 +1,116 @@
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Case, FloatField, Value, When
+from django.db.models.functions import Cast
+from rest_framework import filters
+
+from tamil_news.keyword_matcher import normalize_tamil
+
+SEARCH_MAX_CANDIDATES = getattr(settings, 'SEARCH_MAX_CANDIDATES', 1000)
+SEARCH_REBUILD_BATCH_SIZE = 1000
+
+WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """
+    The form both stored search text and queries are reduced to.
+
+    normalize_tamil, as keyword matching uses, drops invisible characters and composes split
+    Tamil vowel signs (e.g. ெ + ா into ொ) so both encodings of a word match; whitespace is
+    then collapsed and Latin text casefolded.
+    """
+    return WHITESPACE.sub(' ', normalize_tamil(text)).strip().casefold()
+
+
+def news_search_text(article):
+    return normalize_text(' '.join(filter(None, (
+        article.title,
+        article.description,
+        article.author,
+        article.website_name,
+        article.category,
+    ))))
+
+
+def search_news(queryset, query, prefix=''):
+    """
+    Narrow a queryset to rows whose article contains every word of query, best matches first.
+
+    prefix is the path to NewsDetails ('news__' for SentimentResults). Words are matched with
+    LIKE against the normalized search_text, which its trigram GIN index serves. Every match
+    is returned, but only the newest SEARCH_MAX_CANDIDATES are ranked by similarity: they
+    come first, best first, and the older matches follow newest first with a search_rank
+    of -1, so a very common word costs no more similarity work than a rare one.
+    """
+    normalized = normalize_text(query)
+    if not normalized:
+        return queryset
+
+    field = f'{prefix}search_text'
+    matches = queryset
+    for word in normalized.split():
+        matches = matches.filter(**{f'{field}__contains': word})
+    candidates = matches.order_by(f'-{prefix}published_time', '-pk').values('pk')[:SEARCH_MAX_CANDIDATES]
+
+    return (
+        matches
+        .annotate(search_rank=Case(
+            # word_similarity returns a float4; as a float8 the rank survives the round trip
+            # through a cursor, so rows tied on it are neither skipped nor repeated
+            When(pk__in=candidates, then=Cast(TrigramWordSimilarity(normalized, field), FloatField())),
+            default=Value(-1.0),
+            output_field=FloatField(),
+        ))
+        .order_by('-search_rank', f'-{prefix}published_time', '-pk')
+    )
+
+
+def rebuild_search_text(news_model=None, batch_size=SEARCH_REBUILD_BATCH_SIZE):
+    """
+    Recompute search_text for every article (backfill, or after changing normalize_text).
+
+    Each batch is its own UPDATE, so a migration running this keeps no long transaction open.
+    """
+    if news_model is None:
+        from tamil_news.models import NewsDetails as news_model
+
+    updated = 0
+    last_id = 0
+    while True:
+        batch = list(
+            news_model.objects
+            .filter(id__gt=last_id)
+            .order_by('id')
+            .only('id', 'title', 'description', 'author', 'website_name', 'category', 'search_text')[:batch_size]
+        )
+        if not batch:
+            return updated
+        changed = []
+        for article in batch:
+            text = news_search_text(article)
+            if text != article.search_text:
+                article.search_text = text
+                changed.append(article)
+        news_model.objects.bulk_update(changed, ['search_text'])
+        updated += len(changed)
+        last_id = batch[-1].id
+
+
+class NewsSearchFilter(filters.SearchFilter):
+    """DRF ?search= backed by search_news; a view sets news_search_prefix when it lists SentimentResults."""
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        return search_news(queryset, query, prefix=getattr(view, 'news_search_prefix', ''))
+
+
+class SearchRankOrderingFilter(filters.OrderingFilter):
+    """OrderingFilter that keeps search_news' best-first order unless ?ordering= asks for another."""
+
+    def get_ordering(self, request, queryset, view):
+        if 'search_rank' in queryset.query.annotations and not request.query_params.get(self.ordering_param):
+            return None
+        return super().get_ordering(request, queryset, view)
@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.utils import timezone
+
+from tamil_news.chunking import pack_windows, piece_indexes, sentence_pieces
+from tamil_news.dedup import DEDUP_REUSE_SENTIMENT, story_scores
+from tamil_news.keyword_matcher import get_keyword_matcher, normalize_tamil
+from tamil_news.inference_cache import get_cached_model
+from tamil_news.model_registry import SENTIMENT_MODEL, get_model
+from tamil_news.models import Keyword, SentimentResults
+
+labels = ['negative', 'neutral', 'positive']
+
+# Constants
+BATCH_SIZE = getattr(settings, 'SENTIMENT_BATCH_SIZE', 16)
+
+
+def predict_proba(texts, batch_size=BATCH_SIZE):
+    """Softmax scores (negative, neutral, positive) for each text, in input order; seen chunks come from the cache."""
+    return get_cached_model(SENTIMENT_MODEL).predict_proba(texts, batch_size=batch_size)
+
+
+def score_keywords(description, matcher, known=None):
+    """
+    Average window scores for every keyword the matcher finds in the description.
+
+    The description is tokenized once and cut into whole sentences; each keyword is scored on
+    the fewest full-length windows that hold all its occurrences (see chunking.py). A window
+    shared by several keywords goes through the model once, and keywords with scores in
+    known ({keyword_name: scores}) take those instead.
+    Returns {keyword_name: {'negative': .., 'neutral': .., 'positive': ..}}.
+    """
+    text = normalize_tamil(description)
+
+    keyword_hits = {}
+    for hit in matcher.find_all(text, normalized=True):
+        keyword_hits.setdefault(hit.keyword, []).append(hit.start)
+
+    results = {}
+    pending = {}
+    for pattern, starts in keyword_hits.items():
+        names = matcher.names[pattern]
+        if known and all(name in known for name in names):
+            results.update((name, known[name]) for name in names)
+        else:
+            pending[pattern] = starts
+
+    if not pending:
+        return results
+
+    pieces = sentence_pieces(text, get_model(SENTIMENT_MODEL).tokenizer)
+    chunk_ids = {}  # window text -> row in the inference batch
+    keyword_rows = {}
+    for pattern, starts in pending.items():
+        windows = pack_windows(pieces, piece_indexes(pieces, starts))
+        keyword_rows[pattern] = [chunk_ids.setdefault(text[start:end], len(chunk_ids)) for start, end in windows]
+
+    scores = predict_proba(list(chunk_ids))
+
+    for pattern, rows in keyword_rows.items():
+        avg = scores[rows].mean(axis=0)
+        score_dict = {label: float(avg[i]) for i, label in enumerate(labels)}
+        for name in matcher.names[pattern]:
+            results[name] = score_dict
+    return results
+
+
+def analyze_news(news):
+    """Score a NewsDetails row against every Keyword and store one SentimentResults row per match."""
+    if not news.description:
+        return
+
+    # A near-duplicate of an article already scored can take its scores (DEDUP_REUSE_SENTIMENT)
+    known = story_scores(news) if DEDUP_REUSE_SENTIMENT else None
+    keyword_scores = score_keywords(news.description, get_keyword_matcher(), known)
+    if not keyword_scores:
+        return
+
+    for keyword in Keyword.objects.filter(name__in=keyword_scores):
+        score_dict = keyword_scores.get(keyword.name)
+        if score_dict is None:
+            continue
+
+        final_label = max(score_dict, key=score_dict.get)
+        final_score = score_dict[final_label]
+
+        # Save to DB
+        try:
+            SentimentResults.objects.update_or_create(
+                news=news,
+                keyword=keyword,
+                defaults={
+                    'title': news.title or "",
+                    'website_name': news.website_name,
+                    'category': news.category,
+                    'processed_at': timezone.now(),
+                    'sentiment_label': final_label,
+                    'sentiment_score': final_score,
+                    'positive_score': score_dict['positive'],
+                    'negative_score': score_dict['negative'],
+                    'neutral_score': score_dict['neutral'],
+                }
+            )
+            print(f"✅ Saved sentiment for keyword '{keyword.name}' → {final_label} ({final_score:.3f})")
+        except Exception as e:
+            print(f"❌ DB save failed for keyword '{keyword.name}': {e}")
+            raise  # the worker retries the job; saved keywords are updated in place
@@ -1,24 +1,103 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import Websites, NewsDetails, Keyword, SentimentResults
 
-class WebsiteSerializer(serializers.ModelSerializer):
+
+def _param_list(request, name):
+    if request is None or request.method not in ('GET', 'HEAD', 'OPTIONS'):
+        return None
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+class SparseFieldsMixin:
+    """
+    ?fields=a,b limits a read to those fields; ?expand=x renders the relation x with the
+    serializer in Meta.expandable instead of its id. optimize_queryset() then loads exactly
+    what the remaining fields need: only(), select_related() for expanded foreign keys and
+    one prefetch per many-to-many, so a page costs the same number of queries at any size.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        fields = _param_list(request, 'fields')
+        expand = _param_list(request, 'expand') or []
+        expandable = getattr(self.Meta, 'expandable', {})
+
+        unknown = [name for name in fields or [] if name not in self.fields]
+        unknown += [name for name in expand if name not in expandable]
+        if unknown:
+            raise serializers.ValidationError({'fields': f"Unknown or non-expandable field(s): {', '.join(unknown)}"})
+
+        if fields is not None:
+            keep = set(fields) | set(expand)
+            for name in list(self.fields):
+                if name not in keep:
+                    self.fields.pop(name)
+        for name in expand:
+            serializer_class, many = expandable[name]
+            self.fields[name] = serializer_class(many=many, read_only=True)
+
+    def optimize_queryset(self, queryset):
+        model = self.Meta.model
+        only, select, prefetch = [], [], []
+        for name in queryset.query.order_by:
+            name = name.lstrip('-')
+            if '__' not in name and name not in queryset.query.annotations:
+                only.append(name)
+
+        for field in self.fields.values():
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                continue
+            nested = getattr(field, 'child', field)
+            nested_fields = list(nested.fields) if isinstance(nested, serializers.Serializer) else ['pk']
+            if model_field.many_to_many:
+                related = model_field.related_model.objects.only(*nested_fields).order_by('pk')
+                prefetch.append(Prefetch(field.source, queryset=related))
+            elif model_field.many_to_one and isinstance(field, serializers.Serializer):
+                select.append(field.source)
+                only += [f'{field.source}__{name}' for name in nested_fields]
+            else:
+                only.append(field.source)
+
+        return queryset.select_related(*select).prefetch_related(*prefetch).only(*only)
+
+class WebsiteSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Websites
         fields = '__all__'
 
-class NewsDetailsSerializer(serializers.ModelSerializer):
-    #website = serializers.StringRelatedField()
+class KeywordSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
-        model = NewsDetails
+        model = Keyword
         fields = '__all__'
 
-class KeywordSerializer(serializers.ModelSerializer):
+class NewsSummarySerializer(serializers.ModelSerializer):
     class Meta:
-        model = Keyword
-        fields = '__all__'
+        model = NewsDetails
+        fields = ['id', 'title', 'article_url', 'website_name', 'published_time']
 
-class SentimentResultsSerializer(serializers.ModelSerializer):
+class NewsDetailsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    #website = serializers.StringRelatedField()
+    class Meta:
+        model = NewsDetails
+        exclude = ['search_text']
+        expandable = {
+            'website': (WebsiteSerializer, False),
+            'keywords': (KeywordSerializer, True),
+        }
+
+class SentimentResultsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = SentimentResults
         fields = '__all__'
-
+        expandable = {
+            'news': (NewsSummarySerializer, False),
+            'keyword': (KeywordSerializer, False),
+        }
@@ -1,90 +1,83 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
 from django.dispatch import receiver
-from tamil_news.models import NewsDetails, Keyword, SentimentResults
-from transformers import pipeline
-from django.utils import timezone
-import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import numpy as np
-
-# Load model and tokenizer
-MODEL_NAME = "cardiffnlp/twitter-xlm-roberta-base-sentiment"
-tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
-labels = ['negative', 'neutral', 'positive']
-
-# Constants
-MAX_TOKENS = 512
-CHUNK_CHAR_SIZE = 400  # safe size for tokenizer to avoid token overflow
-OVERLAP = 100
+from tamil_news.models import NewsDetails, Keyword, SentimentResults, Websites
+from tamil_news.jobs import enqueue_sentiment_jobs
+from tamil_news.keyword_matcher import invalidate_keyword_matcher
+from tamil_news.cache import bump_data_version
+from tamil_news.dedup import assign_stories
+from tamil_news.rollups import apply_rollup_delta, result_key, result_scores, stored_result
+
+
+@receiver(post_save, sender=NewsDetails)
+def assign_story(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        assign_stories([instance])
+
 
 @receiver(post_save, sender=NewsDetails)
 def analyze_sentiment_per_keyword(sender, instance, created, **kwargs):
     if not created or not instance.description:
         return
 
-    description = instance.description
-    title = instance.title or ""
-    keywords = Keyword.objects.all()
-
-    for keyword in keywords:
-        keyword_text = keyword.name
-
-        if keyword_text not in description:
-            continue
-
-        # Split the description into chunks with overlap
-        chunks = []
-        text_len = len(description)
-        i = 0
-        while i < text_len:
-            chunk = description[i:i+CHUNK_CHAR_SIZE]
-            if keyword_text in chunk:
-                chunks.append(chunk)
-            i += CHUNK_CHAR_SIZE - OVERLAP
-
-        if not chunks:
-            print(f"⚠️ Skipped '{keyword_text}' — not found in any chunk")
-            continue
-
-        # Collect scores across chunks
-        pos_scores, neg_scores, neu_scores = [], [], []
-
-        for chunk in chunks:
-            inputs = tokenizer(chunk, return_tensors="pt", truncation=True, max_length=MAX_TOKENS)
-            with torch.no_grad():
-                outputs = model(**inputs)
-                scores = torch.nn.functional.softmax(outputs.logits, dim=1).numpy()[0]
-                neg_scores.append(scores[0])
-                neu_scores.append(scores[1])
-                pos_scores.append(scores[2])
-
-        # Average all scores
-        avg_neg = float(np.mean(neg_scores))
-        avg_neu = float(np.mean(neu_scores))
-        avg_pos = float(np.mean(pos_scores))
-
-        score_dict = {'negative': avg_neg, 'neutral': avg_neu, 'positive': avg_pos}
-        final_label = max(score_dict, key=score_dict.get)
-        final_score = score_dict[final_label]
-
-        # Save to DB
-        try:
-            SentimentResults.objects.update_or_create(
-                news=instance,
-                keyword=keyword,
-                defaults={
-                    'title': title,
-                    'website_name': instance.website_name,
-                    'category': instance.category,
-                    'processed_at': timezone.now(),
-                    'sentiment_label': final_label,
-                    'sentiment_score': final_score,
-                    'positive_score': avg_pos,
-                    'negative_score': avg_neg,
-                    'neutral_score': avg_neu,
-                }
-            )
-            print(f"✅ Saved sentiment for keyword '{keyword_text}' → {final_label} ({final_score:.3f})")
-        except Exception as e:
-            print(f"❌ DB save failed for keyword '{keyword_text}': {e}")
+    # Scoring runs in `manage.py sentiment_worker`; saving an article only queues it
+    enqueue_sentiment_jobs([instance.id])
+
+
+@receiver(post_save, sender=Keyword)
+@receiver(post_delete, sender=Keyword)
+def refresh_keyword_matcher(sender, **kwargs):
+    invalidate_keyword_matcher()
+
+
+@receiver(pre_save, sender=SentimentResults)
+def remember_replaced_result(sender, instance, **kwargs):
+    # update_or_create replaces scores in place; the old ones must come out of the rollup
+    instance._rollup_previous = stored_result(instance.pk) if instance.pk else None
+
+
+@receiver(post_save, sender=SentimentResults)
+def update_sentiment_rollup(sender, instance, **kwargs):
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous:
+        key, scores = previous
+        apply_rollup_delta(key, -1, tuple(-score for score in scores))
+    apply_rollup_delta(result_key(instance), 1, result_scores(instance))
+    instance._rollup_previous = None
+
+
+@receiver(post_delete, sender=SentimentResults)
+def remove_from_sentiment_rollup(sender, instance, **kwargs):
+    try:
+        key = result_key(instance)
+    except NewsDetails.DoesNotExist:
+        return  # Cascading from a deleted article; `rebuild_sentiment_rollups` covers it
+    apply_rollup_delta(key, -1, tuple(-score for score in result_scores(instance)))
+
+
+@receiver(post_save, sender=SentimentResults)
+@receiver(post_delete, sender=SentimentResults)
+def invalidate_sentiment_cache(sender, instance, **kwargs):
+    bump_data_version('sentiment', f'sentiment:{instance.keyword_id}')
+
+
+@receiver(post_save, sender=NewsDetails)
+@receiver(post_delete, sender=NewsDetails)
+def invalidate_news_cache(sender, instance, **kwargs):
+    bump_data_version('news', f'news:{instance.pk}')  # the second one keys the article's /news/ card
+
+
+@receiver(m2m_changed, sender=NewsDetails.keywords.through)
+def invalidate_news_keywords_cache(sender, **kwargs):
+    bump_data_version('news')
+
+
+@receiver(post_save, sender=Websites)
+@receiver(post_delete, sender=Websites)
+def invalidate_websites_cache(sender, **kwargs):
+    bump_data_version('websites')
+
+
+@receiver(post_save, sender=Keyword)
+@receiver(post_delete, sender=Keyword)
+def invalidate_keywords_cache(sender, **kwargs):
+    bump_data_version('keywords')
@@ -1,3 +1,734 @@
-from django.test import TestCase
+import re
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import numpy as np
+from asgiref.sync import async_to_sync
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from selectolax.lexbor import LexborHTMLParser
+from django.utils import timezone
+
+from tamil_news.chunking import pack_windows, piece_indexes, sentence_pieces, sentence_spans
+from tamil_news.fast_json import FastJSONRenderer
+from tamil_news.fetcher import text_of
+from tamil_news.incremental import IncrementalCrawl
+from tamil_news.inference_cache import InferenceCache, prune
+from tamil_news.models import (
+    BackfillCheckpoint, CrawlState, InferenceCacheEntry, Keyword, NewsDetails, SentimentDailyRollup, SentimentJob, SentimentResults, Websites,
+)
+from tamil_news.persistence import ArticleBuffer, NewsKeyword
+from tamil_news.query_plans import disable_seqscan, explain, hot_queries, unindexed_scans
+from tamil_news.keyword_matcher import KeywordMatcher, get_keyword_matcher, invalidate_keyword_matcher, normalize_tamil
+from tamil_news.rollups import rebuild_rollups
+from tamil_news.search import normalize_text, search_news
+
+
+@skipUnless(connection.vendor == 'postgresql', "query plans are PostgreSQL specific")
+class HotQueryPlanTests(TestCase):
+    """Fails when a hot read path can no longer be served by an index."""
+
+    @classmethod
+    def setUpTestData(cls):
+        websites = [Websites.objects.create(name=f"Site {i}") for i in range(3)]
+        keywords = [Keyword.objects.create(name=f"keyword {i}") for i in range(5)]
+        now = timezone.now()
+
+        # The sample website, category and label cover 1% of rows, so only their own
+        # indexes make those filters cheap
+        def pick(i, rare, common):
+            return rare if i % 100 == 0 else common[i % len(common)]
+
+        news = NewsDetails.objects.bulk_create([
+            NewsDetails(
+                website=pick(i, websites[0], websites[1:]),
+                website_name=pick(i, websites[0], websites[1:]).name,
+                title=f"Title {i}",
+                article_url=f"https://example.com/{i}",
+                category=pick(i, "Tamilnadu", ["India", "World"]),
+                published_time=now - timedelta(hours=i),
+                description=f"Description {i}",
+            )
+            for i in range(2000)
+        ])
+        SentimentResults.objects.bulk_create([
+            SentimentResults(
+                news=article,
+                keyword=keywords[i % 5],
+                sentiment_label=pick(i, "positive", ["neutral", "negative"]),
+                sentiment_score=0.5,
+                positive_score=0.5,
+                negative_score=0.25,
+                neutral_score=0.25,
+            )
+            for i, article in enumerate(news)
+        ])
+        SentimentDailyRollup.objects.bulk_create([
+            SentimentDailyRollup(
+                keyword=keyword,
+                website=website,
+                category="Tamilnadu",
+                day=(now - timedelta(days=day)).date(),
+                count=1,
+                positive_sum=0.5,
+            )
+            for keyword in keywords for website in websites for day in range(120)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE news_details, sentiment_results, sentiment_daily_rollups")
+
+        cls.keyword = keywords[0]
+        cls.website = websites[0]
+
+    def test_hot_queries_use_indexes(self):
+        disable_seqscan()
+        queries = hot_queries(self.keyword.id, self.keyword.name, self.website.id, "tamilnadu")
+        for name, queryset in queries.items():
+            with self.subTest(query=name):
+                plan = explain(queryset)
+                self.assertEqual(unindexed_scans(plan), [], f"{name} plan:\n{queryset.explain()}")
+
+
+class KeywordMatcherTests(TestCase):
+    def test_overlapping_and_nested_keywords(self):
+        matcher = KeywordMatcher(["சென்னை மழை", "மழை வெள்ளம்", "மழை", "வெள்ளம்"])
+        hits = matcher.find_all("சென்னை மழை வெள்ளம்")
+        self.assertEqual(
+            sorted((hit.start, hit.end, hit.keyword) for hit in hits),
+            [(0, 10, "சென்னை மழை"), (7, 10, "மழை"), (7, 18, "மழை வெள்ளம்"), (11, 18, "வெள்ளம்")],
+        )
+        self.assertEqual(matcher.matches("மழை"), ["மழை"])
+
+    def test_composed_and_decomposed_tamil_match(self):
+        composed, decomposed = "கொரோனா", "க\u0bc6\u0bbeரோனா"  # ொ as one code point, and as ெ + ா
+        for keyword, text in [(composed, decomposed), (decomposed, composed), (composed, "கொ\u200dரோனா தொற்று")]:
+            with self.subTest(keyword=ascii(keyword), text=ascii(text)):
+                self.assertEqual(KeywordMatcher([keyword]).matches(text), [keyword])
+        # Names that differ only in encoding share a pattern and are all reported
+        self.assertEqual(KeywordMatcher([composed, decomposed]).matches(composed), [composed, decomposed])
+
+    @mock.patch("tamil_news.keyword_matcher.MATCHER_TTL", 3600)
+    def test_keyword_changes_rebuild_the_shared_matcher(self):
+        invalidate_keyword_matcher()
+        self.assertEqual(get_keyword_matcher().matches("மழை தொடர்கிறது"), [])
+        keyword = Keyword.objects.create(name="மழை")
+        self.assertEqual(get_keyword_matcher().matches("மழை தொடர்கிறது"), ["மழை"])
+        keyword.name = "வெள்ளம்"
+        keyword.save()
+        self.assertEqual(get_keyword_matcher().matches("மழை வெள்ளம்"), ["வெள்ளம்"])
+        keyword.delete()
+        self.assertEqual(len(get_keyword_matcher()), 0)
+
+
+class NormalizeTextTests(SimpleTestCase):
+    def test_tamil_encodings_normalize_alike(self):
+        # ொ typed as ெ + ா, and a zero-width non-joiner inside a word
+        self.assertEqual(normalize_text("க\u0bc6\u0bbeரோனா"), normalize_text("கொரோனா"))
+        self.assertEqual(normalize_text("தடு\u200cப்பூசி"), "தடுப்பூசி")
+
+    def test_case_and_whitespace(self):
+        self.assertEqual(normalize_text("  Chennai\n\tRAIN "), "chennai rain")
+        self.assertEqual(normalize_text(None), "")
+
+    def test_matches_keyword_normalization(self):
+        text = "ஸ்டா\u00adலின் \u2060மழை\u200d"
+        self.assertEqual(normalize_text(text), normalize_tamil(text))
+
+
+class SearchTests(TestCase):
+    @mock.patch("tamil_news.search.SEARCH_MAX_CANDIDATES", 2)
+    def test_matches_past_the_ranked_candidates_are_kept(self):
+        now = timezone.now()
+        news = [
+            NewsDetails.objects.create(
+                title=title, article_url=f"https://example.com/{i}", published_time=now - timedelta(days=i),
+            )
+            for i, title in enumerate(["மழை", "சென்னை மழை வெள்ளம் பாதிப்பு", "மழை", "மழை செய்தி", "வெயில்"])
+        ]
+        found = list(search_news(NewsDetails.objects.all(), "மழை").values_list("id", "search_rank"))
+        self.assertEqual([news_id for news_id, _ in found], [news[0].id, news[1].id, news[2].id, news[3].id])
+        self.assertEqual([rank for _, rank in found[2:]], [-1.0, -1.0])
+
+    @mock.patch("tamil_news.http_cache.API_CACHE_TTL", 0)
+    def test_api_lists_search_results_best_first(self):
+        now = timezone.now()
+        best, undated, newest = [
+            NewsDetails.objects.create(title=title, article_url=f"https://example.com/{i}", published_time=published_time)
+            for i, (title, published_time) in enumerate([
+                ("மழை வெள்ளம்", now - timedelta(days=2)),
+                ("வெள்ளம் வந்தது, மழை நின்றது", None),
+                ("சென்னை மழை வெள்ளம் பாதிப்பு", now),
+            ])
+        ]
+        article = NewsDetails.objects.create(title="வெயில்", article_url="https://example.com/3", published_time=now)
+        for target in (best, undated, newest, article):
+            SentimentResults.objects.create(news=target, sentiment_label="neutral", sentiment_score=0.5)
+
+        client = APIClient()
+        for url, id_of, ordering in [
+            ("/api/news/", lambda row: row["id"], "-id"),
+            ("/api/sentiment-results/", lambda row: row["news"], "-processed_at"),
+        ]:
+            with self.subTest(url=url):
+                ranked = client.get(url, {"search": "மழை வெள்ளம்"}).data["results"]
+                self.assertEqual([id_of(row) for row in ranked], [newest.id, best.id, undated.id])
+                by_date = client.get(url, {"search": "மழை வெள்ளம்", "ordering": ordering}).data["results"]
+                self.assertEqual([id_of(row) for row in by_date], [newest.id, undated.id, best.id])
+
+    @mock.patch("tamil_news.http_cache.API_CACHE_TTL", 0)
+    def test_cursor_walks_tied_ranks(self):
+        # word_similarity is a float4; every article here ties on the same inexact rank
+        now = timezone.now()
+        news = [
+            NewsDetails.objects.create(
+                title="chennai rainfall", article_url=f"https://example.com/{i}", published_time=now - timedelta(hours=i % 5),
+            )
+            for i in range(25)
+        ]
+        client = APIClient()
+        response = client.get("/api/news/", {"search": "chennai rain", "page_size": 10, "fields": "id"})
+        seen = [row["id"] for row in response.data["results"]]
+        while response.data["next"] and len(seen) < 50:
+            response = client.get(response.data["next"])
+            seen += [row["id"] for row in response.data["results"]]
+        self.assertEqual(sorted(seen), sorted(article.id for article in news))
+
+
+class ApiQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        website = Websites.objects.create(name="Site")
+        keywords = [Keyword.objects.create(name=f"keyword {i}") for i in range(3)]
+        for i in range(30):
+            article = NewsDetails.objects.create(
+                website=website, title=f"Title {i}", article_url=f"https://example.com/{i}",
+                published_time=timezone.now() - timedelta(hours=i),
+            )
+            article.keywords.set(keywords[:i % 3])
+            SentimentResults.objects.create(news=article, keyword=keywords[i % 3], sentiment_label="positive", sentiment_score=0.5)
+
+    @mock.patch("tamil_news.http_cache.API_CACHE_TTL", 0)
+    def test_list_queries_do_not_grow_with_page_size(self):
+        client = APIClient()
+        for url, queries in [
+            ("/api/news/?expand=keywords,website", 2),
+            ("/api/sentiment-results/?expand=news,keyword", 1),
+        ]:
+            for page_size in (5, 30):
+                with self.subTest(url=url, page_size=page_size), self.assertNumQueries(queries):
+                    response = client.get(url, {"page_size": page_size})
+                self.assertEqual(len(response.data["results"]), page_size)
+
+    def test_sparse_fields(self):
+        response = APIClient().get("/api/sentiment-results/", {"fields": "id,sentiment_label", "expand": "news"})
+        self.assertEqual(set(response.data["results"][0]), {"id", "sentiment_label", "news"})
+        self.assertEqual(APIClient().get("/api/news/", {"fields": "nope"}).status_code, 400)
+
+    @mock.patch("tamil_news.http_cache.API_CACHE_TTL", 0)
+    def test_compare_keeps_request_order(self):
+        client = APIClient()
+        for keywords in (["keyword 0", "keyword 1"], ["keyword 1", "keyword 0"]):
+            response = client.get("/api/keyword-sentiment/compare/", {"keywords": ",".join(keywords)})
+            self.assertEqual([entry["keyword"] for entry in response.data["results"]], keywords)
+
+
+@mock.patch("tamil_news.views.FAST_JSON", True)
+@mock.patch("tamil_news.fast_json.FAST_JSON", True)
+class FastJsonTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        website = Websites.objects.create(name="Site")
+        keyword = Keyword.objects.create(name="keyword")
+        for i, title in enumerate(["செய்தி", "line\u2028break", "plain"]):
+            article = NewsDetails.objects.create(
+                website=website, title=title, article_url=f"https://example.com/{i}",
+                published_time=None if i == 2 else timezone.now() - timedelta(microseconds=i),
+                description="விவரம்",
+            )
+            article.keywords.add(keyword)
+            SentimentResults.objects.create(
+                news=article, keyword=keyword, sentiment_label="positive", sentiment_score=0.9,
+                positive_score=0.9, negative_score=3.2e-05, neutral_score=1e16 if i else 0.0999,
+            )
+
+    @mock.patch("tamil_news.http_cache.API_CACHE_TTL", 0)
+    def test_fast_path_output_matches_serializers(self):
+        client = APIClient()
+        for url in [
+            "/api/news/",
+            "/api/news/?expand=keywords,website&fields=id,title,keywords,website",
+            "/api/sentiment-results/?expand=news,keyword",
+        ]:
+            with self.subTest(url=url):
+                fast = client.get(url).content
+                with mock.patch("tamil_news.views.FAST_JSON", False), mock.patch("tamil_news.fast_json.FAST_JSON", False):
+                    regular = client.get(url).content
+                self.assertEqual(fast, regular)
+
+    def test_fallback_sees_the_original_data(self):
+        data = {"a": 1e-5, "b": 2 ** 70, "c": [{"d": 1e20}]}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(data, {"a": 1e-5, "b": 2 ** 70, "c": [{"d": 1e20}]})
+        self.assertEqual(type(data["c"][0]["d"]), float)
+
+
+class ResponseCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.website = Websites.objects.create(name="Site")
+        cls.article = NewsDetails.objects.create(
+            website=cls.website, title="Title", article_url="https://example.com/1", published_time=timezone.now(),
+        )
+
+    def setUp(self):
+        caches["api"].clear()
+
+    def test_etag_and_invalidation(self):
+        client = APIClient()
+        first = client.get("/api/news/")
+        etag = first["ETag"]
+        self.assertEqual(first.status_code, 200)
+
+        with self.assertNumQueries(0):
+            cached = client.get("/api/news/")
+            not_modified = client.get("/api/news/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((cached.content, cached["ETag"]), (first.content, etag))
+        self.assertEqual((not_modified.status_code, not_modified.content), (304, b""))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            NewsDetails.objects.create(
+                website=self.website, title="Newer", article_url="https://example.com/2", published_time=timezone.now(),
+            )
+        changed = client.get("/api/news/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+        self.assertEqual(len(changed.data["results"]), 2)
+
+
+class NewsPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        website = Websites.objects.create(name="Site")
+        keyword = Keyword.objects.create(name="keyword")
+        for i in range(3):
+            article = NewsDetails.objects.create(
+                website=website, title=f"Title {i}", article_url=f"https://example.com/{i}",
+                category="Tamilnadu", published_time=timezone.now() - timedelta(hours=i),
+            )
+            SentimentResults.objects.create(news=article, keyword=keyword, sentiment_label="negative", sentiment_score=0.5)
+        cls.article = article
+
+    def setUp(self):
+        caches["default"].clear()
+
+    def test_cached_render_and_card_invalidation(self):
+        first = self.client.get("/news/")
+        self.assertContains(first, "Tamilnadu (3)")
+        self.assertContains(first, "3\n        article")
+        self.assertContains(first, "Negative", count=4)  # dropdown + three cards
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get("/news/").content, first.content)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article.title = "Edited title"
+            self.article.save()
+            SentimentResults.objects.create(news=self.article, sentiment_label="positive", sentiment_score=0.9)
+        response = self.client.get("/news/")
+        self.assertContains(response, "Edited title")
+        self.assertContains(response, "Positive (1)")
+
+
+class RollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.website = Websites.objects.create(name="Site")
+        cls.rain, cls.flood = Keyword.objects.create(name="மழை"), Keyword.objects.create(name="வெள்ளம்")
+
+    def result(self, keyword, positive, days_ago=0):
+        news = NewsDetails.objects.create(
+            website=self.website, title="Title", article_url=f"https://example.com/{NewsDetails.objects.count()}",
+            category="Tamilnadu", published_time=timezone.now() - timedelta(days=days_ago),
+        )
+        return SentimentResults.objects.create(
+            news=news, keyword=keyword, sentiment_label="positive", sentiment_score=positive,
+            positive_score=positive, negative_score=1 - positive, neutral_score=0.0,
+        )
+
+    def rollups(self):
+        return {
+            (row.keyword_id, row.day): (row.count, round(row.positive_sum, 6), round(row.negative_sum, 6))
+            for row in SentimentDailyRollup.objects.all() if row.count
+        }
+
+    def test_results_move_between_rollups(self):
+        day = timezone.localdate()
+        result = self.result(self.rain, 0.75)
+        self.result(self.rain, 0.25)
+        self.assertEqual(self.rollups(), {(self.rain.id, day): (2, 1.0, 1.0)})
+
+        result.keyword = self.flood
+        result.positive_score, result.negative_score = 0.5, 0.5
+        result.save()
+        self.assertEqual(self.rollups(), {(self.rain.id, day): (1, 0.25, 0.75), (self.flood.id, day): (1, 0.5, 0.5)})
+
+        result.delete()
+        self.assertEqual(self.rollups(), {(self.rain.id, day): (1, 0.25, 0.75)})
+
+    @mock.patch("tamil_news.http_cache.API_CACHE_TTL", 0)
+    def test_sentiment_endpoint_agrees_with_a_rebuild(self):
+        self.result(self.rain, 0.9)
+        self.result(self.flood, 0.2)
+        self.result(self.rain, 0.4, days_ago=6)
+        moved = self.result(self.flood, 0.6, days_ago=6)
+        moved.keyword = self.rain
+        moved.save()
+        self.result(self.rain, 0.1).delete()
+
+        def sentiment():
+            client = APIClient()
+            return [
+                client.get("/api/keyword-sentiment/sentiment/", {"keyword": keyword.name, "range_type": range_type}).data
+                for keyword in (self.rain, self.flood) for range_type in ("daily", "weekly")
+            ]
+
+        incremental, rollups = sentiment(), self.rollups()
+        rebuild_rollups()
+        self.assertEqual(self.rollups(), rollups)
+        self.assertEqual(sentiment(), incremental)
+        self.assertEqual(
+            [(data["match_count"], data["avg_positive_score"]) for data in incremental],
+            [(1, 0.9), (3, 0.6333), (1, 0.2), (1, 0.2)],
+        )
+
+
+class SentimentSeriesTests(TestCase):
+    MIDNIGHT = datetime(2026, 1, 5, tzinfo=dt_timezone.utc)  # a Monday; TIME_ZONE is UTC
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.website = Websites.objects.create(name="Site")
+        cls.keyword = Keyword.objects.create(name="keyword")
+        for i, offset in enumerate([
+            -timedelta(microseconds=1),  # Sunday, the previous week
+            timedelta(0),
+            timedelta(minutes=59, seconds=59),
+            timedelta(hours=1),
+            timedelta(hours=3),  # the end of the hour range, excluded there
+        ]):
+            cls.add_result(i, cls.MIDNIGHT + offset, positive=i / 10)
+
+    @classmethod
+    def add_result(cls, i, published_time, positive):
+        article = NewsDetails.objects.create(
+            website=cls.website, title=f"Title {i}", article_url=f"https://example.com/{i}", published_time=published_time,
+        )
+        SentimentResults.objects.create(
+            news=article, keyword=cls.keyword, sentiment_label="positive", sentiment_score=positive,
+            positive_score=positive, negative_score=0.0, neutral_score=0.0,
+        )
+
+    def setUp(self):
+        caches["default"].clear()
+
+    def series(self, **params):
+        response = APIClient().get("/api/keyword-sentiment/series/", {"keyword": "keyword", **params})
+        self.assertEqual(response.status_code, 200)
+        return [(row["bucket"], row["count"], row["avg_positive_score"]) for row in response.data["series"]]
+
+    @mock.patch("tamil_news.http_cache.API_CACHE_TTL", 0)
+    def test_bucket_boundaries(self):
+        self.assertEqual(
+            self.series(bucket="hour", start=self.MIDNIGHT.isoformat(), end=(self.MIDNIGHT + timedelta(hours=3)).isoformat()),
+            [
+                ("2026-01-05T00:00:00+00:00", 2, 0.15),
+                ("2026-01-05T01:00:00+00:00", 1, 0.3),
+                ("2026-01-05T02:00:00+00:00", 0, None),
+            ],
+        )
+        # A date 'end' takes in that whole day
+        self.assertEqual(
+            self.series(bucket="day", start="2026-01-04", end="2026-01-05"),
+            [("2026-01-04", 1, 0.0), ("2026-01-05", 4, 0.25)],
+        )
+        self.assertEqual(
+            self.series(bucket="week", start="2026-01-04", end="2026-01-05"),
+            [("2025-12-29", 1, 0.0), ("2026-01-05", 4, 0.25)],
+        )
+
+    @mock.patch("tamil_news.http_cache.API_CACHE_TTL", 0)
+    def test_new_results_invalidate_the_cached_series(self):
+        params = {"bucket": "day", "start": "2026-01-05", "end": "2026-01-05"}
+        self.assertEqual(self.series(**params), [("2026-01-05", 4, 0.25)])
+        with self.assertNumQueries(1):  # just the keyword lookup
+            self.assertEqual(self.series(**params), [("2026-01-05", 4, 0.25)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_result(5, self.MIDNIGHT + timedelta(hours=12), positive=0.5)
+        self.assertEqual(self.series(**params), [("2026-01-05", 5, 0.3)])
+
+
+class StoryClusterTests(TestCase):
+    STORY = (
+        "சென்னையில் கனமழை காரணமாக பல்வேறு இடங்களில் வெள்ளம் சூழ்ந்துள்ளது. பள்ளி, கல்லூரிகளுக்கு "
+        "இன்று விடுமுறை அறிவிக்கப்பட்டுள்ளது. வானிலை ஆய்வு மையம் அடுத்த மூன்று நாட்களுக்கு மழை தொடரும் என தெரிவித்துள்ளது."
+    )
+    OTHER = (
+        "மதுரையில் ஜல்லிக்கட்டு போட்டி கோலாகலமாக நடைபெற்றது. ஆயிரக்கணக்கான காளைகள் பங்கேற்றன. "
+        "வீரர்கள் காளைகளை அடக்கி பரிசுகளை வென்றனர்."
+    )
+
+    def test_near_duplicates_share_a_story(self):
+        sites = [Websites.objects.create(name=f"Site {i}") for i in range(3)]
+        now = timezone.now()
+        articles = [
+            NewsDetails.objects.create(
+                website=site, title=title, article_url=f"https://example.com/{i}",
+                published_time=now - timedelta(hours=3 - i), description=description,
+            )
+            for i, (site, title, description) in enumerate([
+                (sites[0], "சென்னையில் கனமழை", self.STORY),
+                (sites[1], "சென்னை கனமழை: பள்ளிகளுக்கு விடுமுறை", self.STORY.replace("இன்று", "நாளை") + " மக்கள் கவனமாக இருக்க வேண்டும்."),
+                (sites[2], "ஜல்லிக்கட்டு", self.OTHER),
+            ])
+        ]
+        self.assertEqual([article.story_id for article in articles], [articles[0].id, articles[0].id, articles[2].id])
+
+        response = APIClient().get("/api/news/", {"distinct_stories": "true", "fields": "id"})
+        self.assertEqual({row["id"] for row in response.data["results"]}, {articles[0].id, articles[2].id})
+
+
+class InferenceCacheTests(TestCase):
+    class Model:
+        name, version = "test/model", "1"
+
+        def __init__(self):
+            self.scored = []
+
+        def predict_proba(self, texts, batch_size=16):
+            self.scored += texts
+            return np.array([[len(text) / 100, 0.5, 1 - len(text) / 100] for text in texts], dtype=np.float32)
+
+    def test_each_text_reaches_the_model_once(self):
+        model = self.Model()
+        cache = InferenceCache(model)
+        first = cache.predict_proba(["மழை  செய்தி", "விடுமுறை"])
+        again = cache.predict_proba(["விடுமுறை", "மழை செய்தி", "புதிது"])
+        self.assertEqual(model.scored, ["மழை செய்தி", "விடுமுறை", "புதிது"])
+        np.testing.assert_array_equal(again[:2], first[::-1])
+        self.assertEqual(cache.stats, {"memory_hits": 2, "db_hits": 0, "misses": 3})
+
+        restarted = InferenceCache(self.Model())
+        np.testing.assert_array_equal(restarted.predict_proba(["விடுமுறை"]), first[1:])
+        self.assertEqual((restarted.model.scored, restarted.stats["db_hits"]), ([], 1))
+
+        self.assertEqual(prune(max_rows=1), 2)
+        self.assertEqual(InferenceCacheEntry.objects.count(), 1)
+
+
+class ChunkingTests(SimpleTestCase):
+    @staticmethod
+    def tokenizer(text, **kwargs):
+        # One token per word, with character offsets like a fast tokenizer's
+        return {'offset_mapping': [match.span() for match in re.finditer(r'\S+', text)]}
+
+    def test_sentences_skip_initials(self):
+        text = "மு.க. ஸ்டாலின் இன்று பேசினார். மழை தொடர்கிறது!\nபள்ளிகள் மூடல்"
+        self.assertEqual(
+            [text[start:end] for start, end in sentence_spans(text)],
+            ["மு.க. ஸ்டாலின் இன்று பேசினார்.", "மழை தொடர்கிறது!", "பள்ளிகள் மூடல்"],
+        )
+
+    def test_windows_pack_whole_sentences_around_the_focus(self):
+        text = "ஒன்று இரண்டு. மூன்று நான்கு ஐந்து. ஆறு. ஏழு எட்டு ஒன்பது பத்து பதினொன்று."
+        pieces = sentence_pieces(text, self.tokenizer, budget=4)
+        self.assertEqual([tokens for _, _, tokens in pieces], [2, 3, 1, 4, 1])
+        self.assertEqual(piece_indexes(pieces, [text.index("ஆறு")]), [2])
+        self.assertEqual(
+            [text[start:end] for start, end in pack_windows(pieces, [1, 2], budget=4)],
+            ["மூன்று நான்கு ஐந்து. ஆறு."],
+        )
+        self.assertEqual(
+            [text[start:end] for start, end in pack_windows(pieces, range(len(pieces)), budget=4)],
+            ["ஒன்று இரண்டு.", "மூன்று நான்கு ஐந்து. ஆறு.", "ஏழு எட்டு ஒன்பது பத்து", "பதினொன்று."],
+        )
+
+
+class BulkSentimentTests(TransactionTestCase):
+    # The command reads and writes on its own threads' connections, which can't see a test transaction
+
+    class Model:
+        broken = "உடைந்த"
+
+        def predict_proba(self, texts, batch_size=16):
+            if self.broken in texts:
+                raise ValueError("bad title")
+            return np.array([[0, 0, 0, 0.2, 0.8] if "வெற்றி" in text else [0.9, 0.1, 0, 0, 0] for text in texts])
+
+    def test_backfill_resumes_and_retries_broken_titles(self):
+        site = Websites.objects.create(name="Site")
+        titles = ["வெற்றி விழா", "விபத்து", "உடைந்த", "வெற்றி", "வெள்ளம்"]
+        news = [
+            NewsDetails.objects.create(website=site, title=title, article_url=f"https://example.com/{i}")
+            for i, title in enumerate(titles)
+        ]
+        SentimentResults.objects.create(news=news[1], sentiment_label="negative", sentiment_score=0.9)
+
+        model = self.Model()
+        with mock.patch("tamil_news.management.commands.bulk_sentiment_analysis.get_cached_model", return_value=model):
+            call_command("bulk_sentiment_analysis", chunk_size=2, limit=2, stdout=StringIO())
+            self.assertEqual(SentimentResults.objects.filter(news=news[2]).count(), 0)
+            call_command("bulk_sentiment_analysis", chunk_size=2, stdout=StringIO())
+
+            labels = dict(SentimentResults.objects.values_list("news_id", "sentiment_label"))
+            self.assertEqual(labels, {news[0].id: "positive", news[1].id: "negative", news[3].id: "positive", news[4].id: "negative"})
+            self.assertEqual(BackfillCheckpoint.objects.get().last_news_id, news[2].id - 1)
+
+            model.broken = None
+            call_command("bulk_sentiment_analysis", chunk_size=2, stdout=StringIO())
+
+        self.assertEqual(SentimentResults.objects.get(news=news[2]).sentiment_label, "negative")
+        self.assertEqual(SentimentResults.objects.count(), 5)
+        self.assertEqual(BackfillCheckpoint.objects.get().last_news_id, news[2].id)  # the only row left to read
+
+    def test_shards_split_the_articles(self):
+        site = Websites.objects.create(name="Site")
+        news = [
+            NewsDetails.objects.create(website=site, title="வெற்றி", article_url=f"https://example.com/{i}")
+            for i in range(6)
+        ]
+        with mock.patch("tamil_news.management.commands.bulk_sentiment_analysis.get_cached_model", return_value=self.Model()):
+            call_command("bulk_sentiment_analysis", shard="1/3", threads=1, stdout=StringIO())
+
+        self.assertEqual(
+            set(SentimentResults.objects.values_list("news_id", flat=True)),
+            {article.id for article in news if article.id % 3 == 1},
+        )
+        self.assertEqual(BackfillCheckpoint.objects.get().name, "bulk_sentiment_analysis:nlptown/bert-base-multilingual-uncased-sentiment:1/3")
+
+
+class SentimentWorkerTests(TestCase):
+    def test_failed_save_leaves_the_job_for_a_retry(self):
+        Keyword.objects.create(name="மழை")
+        news = NewsDetails.objects.create(title="மழை", article_url="https://example.com/1", description="மழை தொடர்கிறது")
+        scores = {"மழை": {"negative": 0.1, "neutral": 0.2, "positive": 0.7}}
+        with mock.patch("tamil_news.management.commands.sentiment_worker.get_model"), \
+                mock.patch("tamil_news.sentiment.score_keywords", return_value=scores), \
+                mock.patch.object(SentimentResults.objects, "update_or_create", side_effect=RuntimeError("db down")), \
+                mock.patch("builtins.print"):
+            call_command("sentiment_worker", once=True, concurrency=1, stdout=StringIO())
+
+        job = SentimentJob.objects.get(news=news)
+        self.assertEqual((job.status, job.attempts, job.last_error), (SentimentJob.STATUS_PENDING, 1, "db down"))
+
+
+class FetcherTextTests(SimpleTestCase):
+    def test_block_children_keep_their_word_breaks(self):
+        node = LexborHTMLParser("<div><p>மழை</p><p>தொடர்கிறது  </p>\n<span>இன்று</span></div>").css_first("div")
+        self.assertEqual(text_of(node), "மழை தொடர்கிறது இன்று")
+        self.assertIsNone(text_of(None))
+
+
+class ArticleBufferTests(TestCase):
+    def setUp(self):
+        self.site = Websites.objects.create(name="Site")
+        self.rain = [Keyword.objects.create(name="மழை"), Keyword.objects.create(name="மழை")]  # names aren't unique
+        self.flood = Keyword.objects.create(name="வெள்ளம்")
+
+    def article(self, i, description=None):
+        return NewsDetails(
+            website=self.site, category="Tamilnadu", title=f"Title {i}", article_url=f"https://example.com/{i}",
+            description=description, published_time=timezone.now(),
+        )
+
+    def test_flush_writes_links_and_jobs(self):
+        known = NewsDetails.objects.create(
+            website=self.site, category="Tamilnadu", title="Known", article_url="https://example.com/0",
+        )
+        buffer = ArticleBuffer()
+        add = async_to_sync(buffer.add)
+        add(self.article(0, "மழை"), ["மழை"])  # already stored
+        add(self.article(1, "மழை வெள்ளம்"), ["மழை"])
+        add(self.article(1, "மழை வெள்ளம்"), ["வெள்ளம்"])  # the same URL again in this batch
+        add(self.article(2), ["unknown"])
+
+        new_ids = buffer.flush()
+        ids = buffer._ids_for({(self.site.id, "Tamilnadu", f"https://example.com/{i}"): None for i in range(3)})
+        self.assertEqual(sorted(ids.values())[0], known.id)
+        self.assertEqual(sorted(new_ids), sorted(ids.values())[1:])
+        self.assertEqual(NewsDetails.objects.count(), 3)
+
+        links = {(news_id, keyword_id) for news_id, keyword_id in NewsKeyword.objects.values_list("newsdetails_id", "keyword_id")}
+        article_id = ids[(self.site.id, "Tamilnadu", "https://example.com/1")]
+        self.assertEqual(links, {
+            (known.id, self.rain[0].id), (known.id, self.rain[1].id),
+            (article_id, self.rain[0].id), (article_id, self.rain[1].id), (article_id, self.flood.id),
+        })
+        # Only new articles with a description are scored
+        self.assertEqual(list(SentimentJob.objects.values_list("news_id", flat=True)), [article_id])
+
+        # A second crawl of the same pages adds nothing
+        add(self.article(1, "மழை வெள்ளம்"), ["மழை"])
+        self.assertEqual(buffer.flush(), [])
+        self.assertEqual((NewsDetails.objects.count(), SentimentJob.objects.count(), buffer.created), (3, 1, 2))
+
+        # Stored by another crawler after the lookup: the insert skips the row instead of failing
+        lookup, misses = buffer._ids_for, [{}]
+
+        def racing_lookup(batch):
+            return misses.pop() if misses else lookup(batch)
+
+        with mock.patch.object(buffer, "_ids_for", side_effect=racing_lookup) as ids_for:
+            add(self.article(2), ["மழை"])
+            buffer.flush()
+        self.assertEqual((ids_for.call_count, misses), (2, []))
+        self.assertEqual(NewsDetails.objects.count(), 3)
+        self.assertEqual(NewsKeyword.objects.filter(newsdetails__article_url="https://example.com/2").count(), 2)
+
+
+class IncrementalCrawlTests(TestCase):
+    def setUp(self):
+        self.site = Websites.objects.create(name="Site")
+        self.now = timezone.now()
+
+    def entry(self, i):
+        return f"https://example.com/{i}", self.now - timedelta(hours=i)
+
+    def test_stops_after_known_pages(self):
+        NewsDetails.objects.create(website=self.site, title="t", article_url=self.entry(0)[0])
+        crawl = IncrementalCrawl.load(self.site, stop_after=2)
+        self.assertTrue(crawl.should_skip(*self.entry(0)))
+        self.assertFalse(crawl.page_done([self.entry(0), self.entry(1)]))
+        self.assertFalse(crawl.page_done([self.entry(0), self.entry(1)]))
+        self.assertTrue(crawl.page_done([self.entry(1)]))
+
+        full = IncrementalCrawl.load(self.site, full=True, stop_after=1)
+        self.assertFalse(full.should_skip(*self.entry(0)))
+        self.assertFalse(full.page_done([self.entry(0)]))
+
+    def test_failed_entries_are_retried_on_the_next_run(self):
+        crawl = IncrementalCrawl.load(self.site)
+        crawl.page_done([self.entry(1), self.entry(3), self.entry(5)], failed=[self.entry(3)])
+        crawl.fail([self.entry(5)])  # e.g. its buffer flush raised
+        crawl.save()
+
+        again = IncrementalCrawl.load(self.site)
+        self.assertEqual(CrawlState.objects.get(website=self.site).high_water_mark, self.entry(5)[1])
+        self.assertTrue(again.should_skip(*self.entry(1)))
+        self.assertFalse(again.should_skip(*self.entry(3)))
+        self.assertFalse(again.should_skip(*self.entry(5)))
+        # Older than the mark and never seen: trusted as checked by an earlier run
+        self.assertTrue(again.should_skip(*self.entry(9)))
+
+    def test_keywords_outside_the_history_reset_trust(self):
+        crawl = IncrementalCrawl.load(self.site, keywords=["மழை"])
+        crawl.page_done([self.entry(1)])
+        crawl.save()
+        self.assertTrue(IncrementalCrawl.load(self.site, keywords=["மழை"]).should_skip(*self.entry(1)))
+        self.assertFalse(IncrementalCrawl.load(self.site, keywords=["மழை", "வெயில்"]).should_skip(*self.entry(1)))
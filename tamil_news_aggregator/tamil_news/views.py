@@ -1,15 +1,16 @@
 from django.shortcuts import render
-from django.core.paginator import Paginator
-from django.db.models import Q, Count, Avg
-from django.utils.dateparse import parse_date
-from datetime import timedelta, date
+from django.db.models import Sum
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime, time, timedelta, date
 import subprocess
 import json
 
 from rest_framework import viewsets, filters, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, SAFE_METHODS
 from rest_framework.decorators import action
 
 from .serializers import (
@@ -19,42 +20,104 @@ from .serializers import (
     SentimentResultsSerializer
 )
 from .models import NewsDetails, Websites, SentimentResults, Keyword
+from .analytics import (
+    BUCKET_STEPS,
+    MAX_COMPARE_KEYWORDS,
+    MAX_SERIES_BUCKETS,
+    compare_keywords,
+    filter_news,
+    keyword_rollups,
+    sentiment_series,
+)
+from .cache import data_version, get_or_compute
+from .facets import count_news, news_facets, set_card_versions, with_latest_sentiment
+from .http_cache import CachedResponseMixin
+from .pagination import InvalidCursor, keyset_page
+from .search import NewsSearchFilter, SearchRankOrderingFilter
+from .dedup import StoryFilter
+from .fast_json import FAST_JSON, RowPlan
+
+SENTIMENT_SERIES_CACHE_TTL = getattr(settings, 'SENTIMENT_SERIES_CACHE_TTL', 300)
+NEWS_PAGE_SIZE = 10
+NEWS_CARD_CACHE_TTL = getattr(settings, 'NEWS_CARD_CACHE_TTL', 86400)
+
+
+class OptimizedQuerysetMixin:
+    """Loads only what the serializer will render (honouring ?fields= and ?expand=) on reads."""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method in SAFE_METHODS:
+            queryset = self.get_serializer().optimize_queryset(queryset)
+        return queryset
+
+
+class FastListMixin:
+    """
+    JSON list pages built from values() rows instead of one serializer call per object.
+
+    The rows match the serializer's output exactly; when a field can't be reproduced
+    (see RowPlan) or another format is requested, list() runs as usual.
+    """
+
+    def list(self, request, *args, **kwargs):
+        plan = None
+        if FAST_JSON and request.accepted_renderer.format == 'json':
+            plan = RowPlan.for_serializer(self.get_serializer())
+        if plan is None:
+            return super().list(request, *args, **kwargs)
 
+        queryset = plan.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(plan.rows(queryset))
+        return self.get_paginated_response(plan.rows(page))
 
-class KeywordsViewSet(viewsets.ModelViewSet):
+
+class KeywordsViewSet(CachedResponseMixin, FastListMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet):
+    cache_scopes = ('keywords',)
     queryset = Keyword.objects.all()
     serializer_class = KeywordSerializer
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name']
     ordering_fields = ['id', 'name']
+    ordering = ['id']
 
 
-class SentimentResultsViewSet(viewsets.ModelViewSet):
+class SentimentResultsViewSet(CachedResponseMixin, FastListMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet):
+    cache_scopes = ('sentiment', 'news', 'keywords')
     queryset = SentimentResults.objects.all()
     serializer_class = SentimentResultsSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['sentiment_label', 'news__title', 'news__description']
+    filter_backends = [NewsSearchFilter, StoryFilter, SearchRankOrderingFilter]
+    search_fields = ['news__search_text']
+    news_search_prefix = 'news__'
     ordering_fields = ['processed_at', 'positive_score', 'negative_score', 'neutral_score']
+    ordering = ['-processed_at', '-id']
 
 
-class WebsiteViewSet(viewsets.ModelViewSet):
+class WebsiteViewSet(CachedResponseMixin, FastListMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet):
+    cache_scopes = ('websites',)
     queryset = Websites.objects.all()
     serializer_class = WebsiteSerializer
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name']
     ordering_fields = ['id', 'name']
+    ordering = ['id']
 
 
-class NewsDetailsViewSet(viewsets.ModelViewSet):
+class NewsDetailsViewSet(CachedResponseMixin, FastListMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet):
+    cache_scopes = ('news', 'websites', 'keywords')
     queryset = NewsDetails.objects.all()
     serializer_class = NewsDetailsSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'category', 'author', 'website__name']
+    filter_backends = [NewsSearchFilter, StoryFilter, SearchRankOrderingFilter]
+    search_fields = ['search_text']
     ordering_fields = ['published_time', 'id']
+    ordering = ['-published_time', '-id']
 
 
-class KeywordSentimentViewSet(viewsets.ViewSet):
+class KeywordSentimentViewSet(CachedResponseMixin, viewsets.ViewSet):
     permission_classes = [AllowAny]
+    cache_scopes = ('sentiment', 'keywords')
 
     @action(detail=False, methods=["get"])
     def sentiment(self, request):
@@ -74,35 +137,27 @@ class KeywordSentimentViewSet(viewsets.ViewSet):
         today = date.today()
 
         # Define date range
-        if range_type == "daily":
-            start_date = today
-        elif range_type == "weekly":
-            start_date = today - timedelta(days=7)
-        elif range_type == "monthly":
-            start_date = today - timedelta(days=30)
-        else:
+        start_date = range_start(range_type, today)
+        if start_date is None:
             return Response({"error": "Invalid 'range_type'. Use 'daily', 'weekly', or 'monthly'."},
                             status=status.HTTP_400_BAD_REQUEST)
 
-        # Base queryset
-        sentiment_qs = SentimentResults.objects.filter(
-            keyword=keyword,
-            news__published_time__date__gte=start_date
-        )
+        # Pre-aggregated per-day sums: a few rows per day instead of every result
+        rollups = keyword_rollups(keyword.id, start_date, website=website, category=category)
 
-        # Apply filters using AND logic
-        if website:
-            sentiment_qs = sentiment_qs.filter(news__website__name__iexact=website)
-
-        if category:
-            sentiment_qs = sentiment_qs.filter(news__category__iexact=category)
-
-        aggregate = sentiment_qs.aggregate(
-            avg_positive=Avg("positive_score"),
-            avg_negative=Avg("negative_score"),
-            avg_neutral=Avg("neutral_score"),
-            match_count=Count("id")
+        totals = rollups.aggregate(
+            count=Sum("count"),
+            positive=Sum("positive_sum"),
+            negative=Sum("negative_sum"),
+            neutral=Sum("neutral_sum"),
         )
+        match_count = totals["count"] or 0
+        aggregate = {
+            "avg_positive": totals["positive"] / match_count if match_count else None,
+            "avg_negative": totals["negative"] / match_count if match_count else None,
+            "avg_neutral": totals["neutral"] / match_count if match_count else None,
+            "match_count": match_count,
+        }
 
         return Response({
             "keyword": keyword.name,
@@ -119,6 +174,138 @@ class KeywordSentimentViewSet(viewsets.ViewSet):
             }
         })
 
+    @action(detail=False, methods=["get"])
+    def series(self, request):
+        keyword_name = request.query_params.get("keyword")
+        bucket = request.query_params.get("bucket", "day")  # hour, day, week
+        website = request.query_params.get("website")
+        category = request.query_params.get("category")
+
+        if not keyword_name:
+            return Response({"error": "Missing 'keyword' parameter."}, status=status.HTTP_400_BAD_REQUEST)
+        if bucket not in BUCKET_STEPS:
+            return Response({"error": "Invalid 'bucket'. Use 'hour', 'day', or 'week'."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            start, end = parse_time_range(request.query_params, default_days=30)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if (end - start) / BUCKET_STEPS[bucket] > MAX_SERIES_BUCKETS:
+            return Response({"error": f"Range too long for '{bucket}' buckets (max {MAX_SERIES_BUCKETS})."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        keyword = Keyword.objects.filter(name=keyword_name).first()
+        if keyword is None:
+            return Response({"error": f"Keyword '{keyword_name}' not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        params = [keyword.id, bucket, start, end, (website or "").lower(), (category or "").lower()]
+        series = get_or_compute(
+            "sentiment-series",
+            params,
+            lambda: sentiment_series(keyword.id, bucket, start, end, website, category),
+            timeout=SENTIMENT_SERIES_CACHE_TTL,
+            scopes=[f"sentiment:{keyword.id}"],
+        )
+
+        return Response({
+            "keyword": keyword.name,
+            "bucket": bucket,
+            "start": start,
+            "end": end,
+            "series": series,
+            "filtered_by": {
+                "website": website or "N/A",
+                "category": category or "N/A"
+            }
+        })
+
+
+    @action(detail=False, methods=["get"])
+    def compare(self, request):
+        # ?keywords=a,b,c or repeated ?keyword=a&keyword=b
+        keyword_names = request.query_params.getlist("keyword")
+        for value in request.query_params.getlist("keywords"):
+            keyword_names.extend(name.strip() for name in value.split(","))
+        keyword_names = [name for name in dict.fromkeys(keyword_names) if name]
+        range_type = request.query_params.get("range_type", "daily")  # daily, weekly, monthly
+        website = request.query_params.get("website")
+        category = request.query_params.get("category")
+        by_website = request.query_params.get("by_website", "").lower() in ("1", "true", "yes")
+
+        if not keyword_names:
+            return Response({"error": "Missing 'keywords' parameter."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(keyword_names) > MAX_COMPARE_KEYWORDS:
+            return Response({"error": f"At most {MAX_COMPARE_KEYWORDS} keywords can be compared."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        today = date.today()
+        start_date = range_start(range_type, today)
+        if start_date is None:
+            return Response({"error": "Invalid 'range_type'. Use 'daily', 'weekly', or 'monthly'."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        params = [keyword_names, start_date, (website or "").lower(), (category or "").lower(), by_website]
+        results = get_or_compute(
+            "sentiment-compare",
+            params,
+            lambda: compare_keywords(keyword_names, start_date, website, category, by_website),
+            timeout=SENTIMENT_SERIES_CACHE_TTL,
+            scopes=["sentiment"],
+        )
+
+        return Response({
+            "range_type": range_type,
+            "start_date": start_date,
+            "end_date": today,
+            "results": results,
+            "filtered_by": {
+                "website": website or "N/A",
+                "category": category or "N/A"
+            }
+        })
+
+
+def range_start(range_type, today):
+    """First day covered by a 'daily', 'weekly' or 'monthly' range, or None for anything else."""
+    if range_type == "daily":
+        return today
+    if range_type == "weekly":
+        return today - timedelta(days=7)
+    if range_type == "monthly":
+        return today - timedelta(days=30)
+    return None
+
+
+def parse_time_range(params, default_days):
+    """
+    Half-open [start, end) from the 'start' and 'end' query parameters.
+
+    Each takes an ISO date or datetime; a date 'end' includes that whole day.
+    Without 'end' the range runs to now, without 'start' it covers `default_days`.
+    """
+    def parse(name, is_end):
+        value = params.get(name)
+        if not value:
+            return None
+        # Dates first: parse_datetime also accepts a bare date, as midnight
+        day = parse_date(value)
+        if day is not None:
+            moment = datetime.combine(day + timedelta(days=1) if is_end else day, time.min)
+        else:
+            moment = parse_datetime(value)
+            if moment is None:
+                raise ValueError(f"Invalid '{name}'. Use YYYY-MM-DD or an ISO datetime.")
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
+    end = parse("end", True) or timezone.now()
+    start = parse("start", False) or end - timedelta(days=default_days)
+    if start >= end:
+        raise ValueError("'start' must be before 'end'.")
+    return start, end
+
 
 
 class CrawlKeywordTriggerView(APIView):
@@ -143,9 +330,6 @@ class CrawlKeywordTriggerView(APIView):
 
 
 def news_list(request):
-    news = NewsDetails.objects.select_related("sentiment").order_by('-published_time', '-id')
-    websites = Websites.objects.all()
-
     website_id = request.GET.get('website')
     category = request.GET.get('category')
     sentiment_label = request.GET.get('sentiment')
@@ -153,37 +337,43 @@ def news_list(request):
     start_date = request.GET.get('start_date')
     end_date = request.GET.get('end_date')
 
-    if website_id:
-        news = news.filter(website_id=website_id)
-    if category:
-        news = news.filter(category__icontains=category)
-    if sentiment_label:
-        news = news.filter(sentiment__sentiment_label=sentiment_label)
-    if search_query and search_query.lower() != 'none':
-        news = news.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(author__icontains=search_query)
-        )
+    start = end = None
     if start_date and end_date:
         start = parse_date(start_date)
         end = parse_date(end_date)
-        if start and end:
-            news = news.filter(published_time__isnull=False)
-            news = news.filter(published_time__date__range=(start, end))
-
-    paginator = Paginator(news, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-
-    categories = NewsDetails.objects.values_list('category', flat=True).distinct()
-    sentiments = SentimentResults.objects.values_list('sentiment_label', flat=True).distinct()
 
+    filters = dict(
+        website_id=website_id,
+        category=category,
+        sentiment_label=sentiment_label,
+        search=search_query if search_query and search_query.lower() != 'none' else None,
+        start_day=start if start and end else None,
+        end_day=end if start and end else None,
+    )
+    news = filter_news(NewsDetails.objects.order_by('-published_time', '-id'), **filters)
+
+    # Keyset pages: ?cursor= marks where the page starts, so deep pages cost no more than the first
+    articles = with_latest_sentiment(news.select_related('website'))
+    try:
+        page = keyset_page(articles, request.GET.get('cursor'), NEWS_PAGE_SIZE)
+    except InvalidCursor:
+        page = keyset_page(articles, None, NEWS_PAGE_SIZE)
+    filter_params = request.GET.copy()
+    filter_params.pop('cursor', None)
+    filter_params.pop('page', None)
+
+    facets = news_facets()
     context = {
-        'news_list': page_obj,
-        'websites': websites,
-        'categories': categories,
-        'sentiments': sentiments,
+        'news_list': set_card_versions(page.items),
+        'news_count': count_news(news, filters),
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+        'filter_query': filter_params.urlencode(),
+        'websites': facets['websites'],
+        'categories': facets['categories'],
+        'sentiments': facets['sentiments'],
+        'websites_version': data_version('websites'),
+        'card_cache_ttl': NEWS_CARD_CACHE_TTL,
         'website_id': website_id,
         'category': category,
         'sentiment_label': sentiment_label,
@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.humanize',
     'tamil_news',
     'rest_framework',
     'corsheaders',
@@ -138,3 +139,105 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Sentiment analysis
+# Chunks scored per padded forward pass of the sentiment model
+
+SENTIMENT_BATCH_SIZE = config('SENTIMENT_BATCH_SIZE', default=16, cast=int)
+# Tokens per sentence window around a keyword (tamil_news/chunking.py); leave room under the
+# model's 512 for special tokens
+SENTIMENT_WINDOW_TOKENS = config('SENTIMENT_WINDOW_TOKENS', default=504, cast=int)
+
+# Sentiment job queue (see `manage.py sentiment_worker`)
+
+SENTIMENT_WORKER_CONCURRENCY = config('SENTIMENT_WORKER_CONCURRENCY', default=1, cast=int)
+SENTIMENT_JOB_VISIBILITY_TIMEOUT = config('SENTIMENT_JOB_VISIBILITY_TIMEOUT', default=300, cast=int)
+SENTIMENT_JOB_MAX_ATTEMPTS = config('SENTIMENT_JOB_MAX_ATTEMPTS', default=5, cast=int)
+SENTIMENT_JOB_RETRY_DELAY = config('SENTIMENT_JOB_RETRY_DELAY', default=30, cast=int)
+
+# Sentiment inference backend: 'torch' (eager fp32) or 'onnx' (int8 ONNX Runtime,
+# needs `pip install onnxruntime onnx`; compare with `manage.py compare_sentiment_backends`)
+
+SENTIMENT_BACKEND = config('SENTIMENT_BACKEND', default='torch')
+SENTIMENT_ONNX_DIR = config('SENTIMENT_ONNX_DIR', default=str(BASE_DIR / 'onnx_models'))
+SENTIMENT_ONNX_THREADS = config('SENTIMENT_ONNX_THREADS', default=0, cast=int)
+
+# Seconds a process keeps its compiled keyword matcher before reloading Keyword rows
+
+KEYWORD_MATCHER_TTL = config('KEYWORD_MATCHER_TTL', default=60, cast=int)
+
+# Crawlers: article pages fetched in parallel per site
+
+CRAWLER_CONCURRENCY = config('CRAWLER_CONCURRENCY', default=8, cast=int)
+
+# Sites whose pages need a real browser; everything else is fetched over plain HTTP first
+CRAWLER_JS_SITES = config('CRAWLER_JS_SITES', default='puthiyathalaimurai.com', cast=Csv())
+CRAWLER_HTTP_TIMEOUT = config('CRAWLER_HTTP_TIMEOUT', default=30, cast=int)
+
+# Incremental crawling: stop paginating after this many consecutive pages with nothing new
+CRAWLER_STOP_AFTER_KNOWN_PAGES = config('CRAWLER_STOP_AFTER_KNOWN_PAGES', default=2, cast=int)
+# Sizing of the per-site Bloom filter of seen URLs (1% false positives at capacity)
+CRAWLER_SEEN_URLS_CAPACITY = config('CRAWLER_SEEN_URLS_CAPACITY', default=200000, cast=int)
+
+# Crawled articles written per bulk INSERT (see tamil_news/persistence.py)
+CRAWLER_PERSIST_BATCH_SIZE = config('CRAWLER_PERSIST_BATCH_SIZE', default=200, cast=int)
+
+# Cache for API results. Article and sentiment writes bump version keys in it, so every web and worker
+# process must share one backend (e.g. django.core.cache.backends.redis.RedisCache) for those
+# bumps to reach the API; with the per-process default, entries only expire after their TTL.
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    },
+    # Rendered API responses (tamil_news/http_cache.py): any backend works, e.g.
+    # django.core.cache.backends.filebased.FileBasedCache with a directory as location
+    'api': {
+        'BACKEND': config('API_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('API_CACHE_LOCATION', default='api-responses'),
+    },
+}
+SENTIMENT_SERIES_CACHE_TTL = config('SENTIMENT_SERIES_CACHE_TTL', default=300, cast=int)
+
+# Search: newest matches ranked by similarity per query; older matches follow by date (bounds the
+# ranking cost of very common words)
+SEARCH_MAX_CANDIDATES = config('SEARCH_MAX_CANDIDATES', default=1000, cast=int)
+
+# API lists are keyset-paginated on their ordering (see tamil_news/pagination.py)
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'tamil_news.pagination.KeysetPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'tamil_news.fast_json.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+API_PAGE_SIZE = config('API_PAGE_SIZE', default=50, cast=int)
+API_MAX_PAGE_SIZE = config('API_MAX_PAGE_SIZE', default=200, cast=int)
+
+# Opt-in: JSON lists built from values() rows and encoded with orjson (same bytes as the serializers)
+API_FAST_JSON = config('API_FAST_JSON', default=False, cast=bool)
+
+# API response cache: seconds an unused response is kept (0 turns the cache off)
+API_CACHE_TTL = config('API_CACHE_TTL', default=600, cast=int)
+
+# /news/ page: filter facets and result counts are cached until ingest changes them; counts
+# past NEWS_COUNT_EXACT_LIMIT show the planner's estimate. Article cards are cached per article.
+NEWS_FACETS_CACHE_TTL = config('NEWS_FACETS_CACHE_TTL', default=3600, cast=int)
+NEWS_COUNT_EXACT_LIMIT = config('NEWS_COUNT_EXACT_LIMIT', default=10000, cast=int)
+NEWS_CARD_CACHE_TTL = config('NEWS_CARD_CACHE_TTL', default=86400, cast=int)
+
+# Near-duplicate stories across outlets (tamil_news/dedup.py): articles at least DEDUP_THRESHOLD
+# alike (estimated Jaccard of their shingles) within DEDUP_WINDOW_HOURS share a story_id.
+# With DEDUP_REUSE_SENTIMENT the worker copies a story's scores instead of running the model again.
+DEDUP_THRESHOLD = config('DEDUP_THRESHOLD', default=0.5, cast=float)
+DEDUP_WINDOW_HOURS = config('DEDUP_WINDOW_HOURS', default=72, cast=int)
+DEDUP_REUSE_SENTIMENT = config('DEDUP_REUSE_SENTIMENT', default=False, cast=bool)
+
+# Inference cache (tamil_news/inference_cache.py): scores of every chunk a model version has seen,
+# kept in process (LRU of INFERENCE_CACHE_LRU_SIZE) and in the inference_cache table, whose
+# least recently used rows beyond INFERENCE_CACHE_MAX_ROWS are deleted
+INFERENCE_CACHE = config('INFERENCE_CACHE', default=True, cast=bool)
+INFERENCE_CACHE_LRU_SIZE = config('INFERENCE_CACHE_LRU_SIZE', default=20000, cast=int)
+INFERENCE_CACHE_MAX_ROWS = config('INFERENCE_CACHE_MAX_ROWS', default=1000000, cast=int)